@@ -1,5 +1,7 @@
 from AlgorithmImports import *
 from collections import deque
+from plotting import PlotBuffer
+from rolling import RollingMax, RollingMin
 
 class Trading_Strategy(QCAlgorithm):
     def initialize(self):
@@ -20,8 +22,8 @@ class Trading_Strategy(QCAlgorithm):
         self._macd_daily = self.macd(self.symbol, 12, 30, 9, Resolution.Daily)
 
         # Price storage
-        self._high_prices = deque(maxlen=100)
-        self._low_prices = deque(maxlen=100)
+        self._high_prices = RollingMax(20)
+        self._low_prices = RollingMin(20)
         self._close_prices = deque(maxlen=5)
 
         # Fibonacci levels
@@ -33,11 +35,12 @@ class Trading_Strategy(QCAlgorithm):
         self.stop_loss_price = 0
         self.take_profit_price = 0
 
+        self.plotter = PlotBuffer(self)
         self.create_charts()
 
     def create_charts(self):
         price_chart = Chart("Price and Signals")
-        self.add_chart(price_chart)
+        self.plotter.add_chart(price_chart)
         price_chart.add_series(Series("Price", SeriesType.LINE, "$", Color.Black))
         price_chart.add_series(Series("SMA", SeriesType.LINE, "$", Color.Blue))
         price_chart.add_series(Series("Long", SeriesType.SCATTER, "$", Color.Green, ScatterMarkerSymbol.TRIANGLE))
@@ -46,12 +49,12 @@ class Trading_Strategy(QCAlgorithm):
         price_chart.add_series(Series("SL", SeriesType.SCATTER, "$", Color.Red, ScatterMarkerSymbol.CIRCLE))
 
         fib_chart = Chart("Fibonacci Levels")
-        self.add_chart(fib_chart)
+        self.plotter.add_chart(fib_chart)
         for level in self.fib_levels:
             fib_chart.add_series(Series(f"Fib_{level}", SeriesType.LINE, "$", Color.Purple))
 
         indicators_chart = Chart("Indicators")
-        self.add_chart(indicators_chart)
+        self.plotter.add_chart(indicators_chart)
         indicators_chart.add_series(Series("MACD", SeriesType.LINE, "$", Color.Blue))
         indicators_chart.add_series(Series("MACD Signal", SeriesType.LINE, "$", Color.Red))
         indicators_chart.add_series(Series("ADX", SeriesType.LINE, "$", Color.Green))
@@ -84,13 +87,13 @@ class Trading_Strategy(QCAlgorithm):
         if len(self._high_prices) < 2 or len(self._low_prices) < 2:
             return
 
-        recent_high = max(list(self._high_prices)[-20:])
-        recent_low = min(list(self._low_prices)[-20:])
+        recent_high = self._high_prices.value
+        recent_low = self._low_prices.value
         price_range = recent_high - recent_low
 
         for level in self.fib_levels:
             self.fib_values[level] = recent_low + (price_range * level)
-            self.plot("Fibonacci Levels", f"Fib_{level}", self.fib_values[level])
+            self.plotter.plot("Fibonacci Levels", f"Fib_{level}", self.fib_values[level])
 
     def on_data(self, data: Slice):
         if not data.ContainsKey(self.symbol):
@@ -149,7 +152,7 @@ class Trading_Strategy(QCAlgorithm):
         if allow_entry_long and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, position_size, tag="long entry")
-            self.plot("Price and Signals", "Long", close)
+            self.plotter.plot("Price and Signals", "Long", close)
             self.entry_price = close
             self.stop_loss_price = close - atr_value * 1.5
             self.take_profit_price = self.calculate_take_profit(close, True)
@@ -157,7 +160,7 @@ class Trading_Strategy(QCAlgorithm):
         elif allow_entry_short and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, -position_size, tag="short entry")
-            self.plot("Price and Signals", "Short", close)
+            self.plotter.plot("Price and Signals", "Short", close)
             self.entry_price = close
             self.stop_loss_price = close + atr_value * 1.5
             self.take_profit_price = self.calculate_take_profit(close, False)
@@ -169,17 +172,20 @@ class Trading_Strategy(QCAlgorithm):
             if (curr_qty > 0 and (close >= self.take_profit_price or rsi > 80)) or \
                (curr_qty < 0 and (close <= self.take_profit_price or rsi < 20)):
                 self.liquidate(tag="tp")
-                self.plot("Price and Signals", "TP", close)
+                self.plotter.plot("Price and Signals", "TP", close)
             elif (curr_qty > 0 and close <= self.stop_loss_price) or \
                  (curr_qty < 0 and close >= self.stop_loss_price):
                 self.liquidate(tag="sl")
-                self.plot("Price and Signals", "SL", close)
+                self.plotter.plot("Price and Signals", "SL", close)
 
         # Plot indicators
-        self.plot("Price and Signals", "Price", close)
-        self.plot("Price and Signals", "SMA", sma_value)
-        self.plot("Indicators", "MACD", macd_value)
-        self.plot("Indicators", "MACD Signal", macd_signal)
-        self.plot("Indicators", "ADX", adx)
-        self.plot("Indicators", "RSI", rsi)
-        self.plot("Indicators", "ATR", atr_value)
\ No newline at end of file
+        self.plotter.plot("Price and Signals", "Price", close)
+        self.plotter.plot("Price and Signals", "SMA", sma_value)
+        self.plotter.plot("Indicators", "MACD", macd_value)
+        self.plotter.plot("Indicators", "MACD Signal", macd_signal)
+        self.plotter.plot("Indicators", "ADX", adx)
+        self.plotter.plot("Indicators", "RSI", rsi)
+        self.plotter.plot("Indicators", "ATR", atr_value)
+
+    def on_end_of_algorithm(self):
+        self.plotter.flush()
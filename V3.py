@@ -1,5 +1,7 @@
 from AlgorithmImports import *
 from collections import deque
+from plotting import PlotBuffer
+from rolling import RollingMax, RollingMin
 
 class V3(QCAlgorithm):
     def initialize(self):
@@ -17,8 +19,8 @@ class V3(QCAlgorithm):
         self._sma_daily = self.sma(self.symbol, 30, Resolution.DAILY)
         self._macd_daily = self.macd(self.symbol, 12, 26, 9, Resolution.DAILY)
 
-        self._high_prices = deque(maxlen=100)
-        self._low_prices = deque(maxlen=100)
+        self._high_prices = RollingMax(100)
+        self._low_prices = RollingMin(100)
         self._close_prices = deque(maxlen=5)
 
         self.fib_levels = [0.236, 0.382, 0.5, 0.618, 0.786]
@@ -30,6 +32,7 @@ class V3(QCAlgorithm):
         self.entry_bar = 0
         self.bar_count = 0
 
+        self.plotter = PlotBuffer(self)
         self.create_charts()
 
     def create_charts(self):
@@ -40,12 +43,12 @@ class V3(QCAlgorithm):
         price_chart.add_series(Series("Short", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
         price_chart.add_series(Series("TP", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.CIRCLE))
         price_chart.add_series(Series("SL", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.CIRCLE))
-        self.add_chart(price_chart)
+        self.plotter.add_chart(price_chart)
 
         fib_chart = Chart("Fibonacci Levels")
         for level in self.fib_levels:
             fib_chart.add_series(Series(f"Fib_{level}", SeriesType.LINE, "$", Color.PURPLE))
-        self.add_chart(fib_chart)
+        self.plotter.add_chart(fib_chart)
 
         indicators_chart = Chart("Indicators")
         indicators_chart.add_series(Series("MACD", SeriesType.LINE, "$", Color.BLUE))
@@ -53,7 +56,7 @@ class V3(QCAlgorithm):
         indicators_chart.add_series(Series("ADX", SeriesType.LINE, "$", Color.GREEN))
         indicators_chart.add_series(Series("RSI", SeriesType.LINE, "$", Color.ORANGE))
         indicators_chart.add_series(Series("ATR", SeriesType.LINE, "$", Color.PURPLE))
-        self.add_chart(indicators_chart)
+        self.plotter.add_chart(indicators_chart)
 
     def calculate_position_size(self):
         account_value = self.portfolio.total_portfolio_value
@@ -91,8 +94,8 @@ class V3(QCAlgorithm):
         if not self._high_prices or not self._low_prices:
             return
 
-        recent_high = max(self._high_prices)
-        recent_low = min(self._low_prices)
+        recent_high = self._high_prices.value
+        recent_low = self._low_prices.value
         price_range = recent_high - recent_low
 
         # Determine trend using daily SMA slope
@@ -104,7 +107,7 @@ class V3(QCAlgorithm):
                 self.fib_values[level] = recent_high - (price_range * level)
 
         for level in self.fib_levels:
-            self.plot("Fibonacci Levels", f"Fib_{level}", self.fib_values[level])
+            self.plotter.plot("Fibonacci Levels", f"Fib_{level}", self.fib_values[level])
 
     def on_data(self, data: Slice):
         self.bar_count += 1
@@ -166,7 +169,7 @@ class V3(QCAlgorithm):
         if allow_entry_long and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, position_size, tag="Long Entry")
-            self.plot("Price and Signals", "Long", close)
+            self.plotter.plot("Price and Signals", "Long", close)
             self.entry_price = close
             self.stop_loss_price = close - atr_val * 1.5
             self.take_profit_price = self.calculate_take_profit(close, True)
@@ -175,7 +178,7 @@ class V3(QCAlgorithm):
         elif allow_entry_short and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, -position_size, tag="Short Entry")
-            self.plot("Price and Signals", "Short", close)
+            self.plotter.plot("Price and Signals", "Short", close)
             self.entry_price = close
             self.stop_loss_price = close + atr_val * 1.5
             self.take_profit_price = self.calculate_take_profit(close, False)
@@ -194,17 +197,20 @@ class V3(QCAlgorithm):
             if (curr_qty > 0 and (close >= self.take_profit_price or rsi < 70)) or \
                (curr_qty < 0 and (close <= self.take_profit_price or rsi > 30)):
                 self.liquidate(tag="Take Profit")
-                self.plot("Price and Signals", "TP", close)
+                self.plotter.plot("Price and Signals", "TP", close)
             # Stop loss
             elif (curr_qty > 0 and close <= self.stop_loss_price) or \
                  (curr_qty < 0 and close >= self.stop_loss_price):
                 self.liquidate(tag="Stop Loss")
-                self.plot("Price and Signals", "SL", close)
-
-        self.plot("Price and Signals", "Price", close)
-        self.plot("Price and Signals", "SMA", sma_val)
-        self.plot("Indicators", "MACD", macd_val)
-        self.plot("Indicators", "MACD Signal", macd_sig)
-        self.plot("Indicators", "ADX", adx)
-        self.plot("Indicators", "RSI", rsi)
-        self.plot("Indicators", "ATR", atr_val)
\ No newline at end of file
+                self.plotter.plot("Price and Signals", "SL", close)
+
+        self.plotter.plot("Price and Signals", "Price", close)
+        self.plotter.plot("Price and Signals", "SMA", sma_val)
+        self.plotter.plot("Indicators", "MACD", macd_val)
+        self.plotter.plot("Indicators", "MACD Signal", macd_sig)
+        self.plotter.plot("Indicators", "ADX", adx)
+        self.plotter.plot("Indicators", "RSI", rsi)
+        self.plotter.plot("Indicators", "ATR", atr_val)
+
+    def on_end_of_algorithm(self):
+        self.plotter.flush()
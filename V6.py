@@ -1,8 +1,9 @@
 from AlgorithmImports import *
 from collections import deque
+from plotting import PlotBuffer
 
 class V6(QCAlgorithm):
-    # I removed ALL plot cause they eat lots of resource
+    # Plots go through PlotBuffer: line series are decimated to a point budget at the end of the run
     def initialize(self):
         self.set_start_date(2020, 1, 1)
         self.set_end_date(2020, 12, 31)
@@ -30,6 +31,27 @@ class V6(QCAlgorithm):
         self.take_profit_price = 0
         self.entry_bar = 0
         self.bar_count = 0
+
+        self.plotter = PlotBuffer(self)
+        self.create_charts()
+
+    def create_charts(self):
+        price_chart = Chart("Price and Signals")
+        price_chart.add_series(Series("Price", SeriesType.LINE, "$", Color.BLACK))
+        price_chart.add_series(Series("SMA", SeriesType.LINE, "$", Color.BLUE))
+        price_chart.add_series(Series("Long", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+        price_chart.add_series(Series("Short", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+        price_chart.add_series(Series("TP", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.CIRCLE))
+        price_chart.add_series(Series("SL", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.CIRCLE))
+        self.plotter.add_chart(price_chart)
+
+        indicators_chart = Chart("Indicators")
+        indicators_chart.add_series(Series("MACD", SeriesType.LINE, "$", Color.BLUE))
+        indicators_chart.add_series(Series("MACD Signal", SeriesType.LINE, "$", Color.RED))
+        indicators_chart.add_series(Series("ADX", SeriesType.LINE, "$", Color.GREEN))
+        indicators_chart.add_series(Series("RSI", SeriesType.LINE, "$", Color.ORANGE))
+        indicators_chart.add_series(Series("ATR", SeriesType.LINE, "$", Color.PURPLE))
+        self.plotter.add_chart(indicators_chart)
     
     def calculate_position_size(self):
         account_value = self.portfolio.total_portfolio_value
@@ -82,6 +104,7 @@ class V6(QCAlgorithm):
         if allow_entry_long and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, position_size, tag="Long Entry")
+            self.plotter.plot("Price and Signals", "Long", close)
             self.entry_price = close
             self.stop_loss_price = close - atr_val * 2.0
             self.take_profit_price = self.calculate_take_profit(close, True)
@@ -90,6 +113,7 @@ class V6(QCAlgorithm):
         elif allow_entry_short and curr_qty == 0:
             position_size = self.calculate_position_size()
             self.market_order(self.symbol, -position_size, tag="Short Entry")
+            self.plotter.plot("Price and Signals", "Short", close)
             self.entry_price = close
             self.stop_loss_price = close + atr_val * 2.0
             self.take_profit_price = self.calculate_take_profit(close, False)
@@ -108,6 +132,19 @@ class V6(QCAlgorithm):
             if (curr_qty > 0 and close >= self.take_profit_price) or \
                (curr_qty < 0 and close <= self.take_profit_price):
                 self.liquidate(tag="Take Profit")
+                self.plotter.plot("Price and Signals", "TP", close)
             elif (curr_qty > 0 and close <= self.stop_loss_price) or \
                  (curr_qty < 0 and close >= self.stop_loss_price):
                 self.liquidate(tag="Stop Loss")
+                self.plotter.plot("Price and Signals", "SL", close)
+
+        self.plotter.plot("Price and Signals", "Price", close)
+        self.plotter.plot("Price and Signals", "SMA", sma_val)
+        self.plotter.plot("Indicators", "MACD", macd_val)
+        self.plotter.plot("Indicators", "MACD Signal", macd_sig)
+        self.plotter.plot("Indicators", "ADX", adx)
+        self.plotter.plot("Indicators", "RSI", rsi)
+        self.plotter.plot("Indicators", "ATR", atr_val)
+
+    def on_end_of_algorithm(self):
+        self.plotter.flush()
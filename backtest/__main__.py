@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from backtest.consolidators import SessionCalendar
+from backtest.data import load_bars, parse_time
+from backtest.engine import load_algorithm, run
+from backtest.intrabar import IntrabarIndex
+from backtest.snapshot import Snapshot
+from backtest.vector import PRESETS, backtest
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest",
+                                     description="Replay local hourly bars through a V*.py strategy offline")
+    parser.add_argument("strategy", help="path to the strategy file, e.g. V4.py")
+    parser.add_argument("--data", required=True,
+                        help="bar store directory (python -m backtest.store ingest) or a CSV with "
+                             "time,open,high,low,close[,volume] columns")
+    parser.add_argument("--vector", action="store_true",
+                        help="use the vectorized engine with the strategy's preset constants (V3-V6)")
+    parser.add_argument("--minutes", metavar="PATH",
+                        help="with --vector: minute bars (store or CSV) to resolve stops and targets inside each hour")
+    parser.add_argument("--session-start", type=float, default=0.0, metavar="HOUR",
+                        help="hour of day the trading session rolls over (17 for New York CFD hours); "
+                             "daily and weekly bars are cut there instead of at midnight")
+    parser.add_argument("--resume", metavar="SNAPSHOT",
+                        help="start from a saved snapshot instead of warming up the indicators")
+    parser.add_argument("--start", type=parse_time, help="override the strategy's start date")
+    parser.add_argument("--end", type=parse_time,
+                        help="override the strategy's end date (inclusive, like set_end_date)")
+    parser.add_argument("--checkpoints", metavar="DIR",
+                        help="resume from the last run of the same code and start date, simulating only new bars")
+    parser.add_argument("--snapshot-at", type=parse_time, metavar="TIME",
+                        help="capture the full indicator/strategy state at TIME (written to --snapshot-out)")
+    parser.add_argument("--snapshot-out", default="snapshot.bin", metavar="PATH")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="attribute time to sections; writes PREFIX.json histograms and PREFIX.folded stacks")
+    parser.add_argument("--results", metavar="DIR", help="store the run's orders, equity and charts in a results store")
+    args = parser.parse_args()
+    if args.checkpoints and (args.resume or args.snapshot_at or args.profile):
+        parser.error("--checkpoints manages its own snapshots; drop --resume/--snapshot-at/--profile")
+
+    profiler = None
+    if args.profile:
+        # Enabled before the strategy is imported so its @profiled decorators are live
+        from profiler import PROFILER
+        profiler = PROFILER
+        profiler.enabled = True
+
+    bars = load_bars(args.data)
+    algorithm_cls = load_algorithm(args.strategy)
+    if args.vector:
+        name = Path(args.strategy).stem
+        if name not in PRESETS:
+            parser.error(f"no vectorized preset for {name}; available: {', '.join(PRESETS)}")
+        # Only initialize() is needed, for the date range
+        algorithm = algorithm_cls()
+        algorithm.initialize()
+        window = bars.between(algorithm.start_date, algorithm.end_date + timedelta(days=1))
+        intrabar = IntrabarIndex(window, load_bars(args.minutes)) if args.minutes else None
+        summary = backtest(window, PRESETS[name], intrabar=intrabar).summary()
+    else:
+        session = SessionCalendar(day_start=timedelta(hours=args.session_start))
+        end = args.end + timedelta(days=1) if args.end else None
+        if args.checkpoints:
+            from backtest.incremental import run_incremental
+            result, resumed = run_incremental(algorithm_cls, bars, args.checkpoints, start=args.start, end=end,
+                                              session=session)
+            if resumed is not None:
+                print(f"resumed from checkpoint at {resumed}", file=sys.stderr)
+        else:
+            snapshot = Snapshot.load(args.resume) if args.resume else None
+            result = run(algorithm_cls, bars, start=args.start, end=end, session=session, snapshot=snapshot,
+                         snapshot_at=args.snapshot_at, profiler=profiler)
+        if profiler is not None:
+            profiler.write_report(f"{args.profile}.json")
+            profiler.write_collapsed(f"{args.profile}.folded")
+        if args.snapshot_at and result.snapshot is not None:
+            result.snapshot.save(args.snapshot_out)
+        if args.results:
+            from backtest.results import ResultStore
+            ResultStore(args.results).add_backtest(result)
+        summary = result.summary()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backtest.engine import bar_step, load_algorithm
+
+ROOT = Path(__file__).resolve().parent.parent
+STRATEGIES = ("V1", "V2", "V3", "V4", "V5", "V6")
+SIZES = (10000, 100000, 1000000)
+PERCENTILES = (50, 90, 99, 99.9)
+# Bars replayed under tracemalloc, which is several times slower than a plain run
+ALLOC_BARS = 100000
+
+
+def synthetic_bars(n, seed=0, start=datetime(2000, 1, 3)):
+    # A seeded hourly random walk with plausible OHLC, as Python lists ready for TradeBar
+    rng = np.random.default_rng(seed)
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate(([50.0], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.002, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    times = [start + timedelta(hours=i) for i in range(n)]
+    return times, open_.tolist(), high.tolist(), low.tolist(), close.tolist()
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def _start(algorithm_cls, period):
+    algorithm = algorithm_cls()
+    algorithm.initialize()
+    symbol = next(iter(algorithm.securities))
+    # set_warm_up(n) or set_warm_up(timedelta), counted in bars of this gapless stream
+    warm_up = algorithm.warm_up_period
+    warm_up = int(warm_up / period) if isinstance(warm_up, timedelta) else warm_up or 0
+    algorithm.is_warming_up = warm_up > 0
+    return algorithm, bar_step(algorithm, symbol, period), warm_up
+
+
+def allocations(algorithm_cls, bars, period=timedelta(hours=1)):
+    # Untimed replay under tracemalloc, bar by bar: the bytes a bar allocates above what was live when it
+    # started (its high-water mark, so memory allocated and freed within the bar counts too), and the bytes
+    # it leaves behind. CPython keeps no count of allocation events, so the peak is the churn measure.
+    times, opens, highs, lows, closes = bars
+    n = len(times)
+    algorithm, step, warm_up = _start(algorithm_cls, period)
+    on_data = algorithm.on_data
+    churn = np.empty(n, dtype=np.int64)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for i in range(n):
+            if i == warm_up:
+                algorithm.is_warming_up = False
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            on_data(step(times[i], opens[i], highs[i], lows[i], closes[i], 0.0))
+            churn[i] = tracemalloc.get_traced_memory()[1] - before
+        retained = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    return {
+        "bars": n,
+        "peak_bytes_per_bar": {"mean": round(float(churn.mean()), 1), "p99": round(float(np.percentile(churn, 99)), 1),
+                               "max": int(churn.max())},
+        "retained_bytes_per_bar": round(retained / n, 1),
+    }
+
+
+def measure(name, n, seed=0):
+    # Replays n synthetic bars through the strategy exactly as engine.run does (engine.bar_step, warm-up
+    # included), timing every on_data call, then repeats up to ALLOC_BARS of them under tracemalloc. Runs in
+    # a fresh process (see run_suite) so peak RSS belongs to this case alone.
+    algorithm_cls = load_algorithm(ROOT / f"{name}.py")
+    times, opens, highs, lows, closes = bars = synthetic_bars(n, seed)
+    period = timedelta(hours=1)
+    algorithm, step, warm_up = _start(algorithm_cls, period)
+    on_data = algorithm.on_data
+    clock = time.perf_counter_ns
+    on_data_ns = np.empty(n, dtype=np.int64)
+
+    blocks = sys.getallocatedblocks()
+    started = clock()
+    for i in range(n):
+        if i == warm_up:
+            algorithm.is_warming_up = False
+        data = step(times[i], opens[i], highs[i], lows[i], closes[i], 0.0)
+        t = clock()
+        on_data(data)
+        on_data_ns[i] = clock() - t
+    total = clock() - started
+    retained = sys.getallocatedblocks() - blocks
+    algorithm.on_end_of_algorithm()
+    peak_rss = _peak_rss_mb()
+    allocated = allocations(algorithm_cls, [column[:ALLOC_BARS] for column in bars], period)
+
+    return {
+        "strategy": name,
+        "class": algorithm_cls.__name__,
+        "bars": n,
+        "on_data_ns": {
+            "mean": round(float(on_data_ns.mean()), 1),
+            **{f"p{q:g}": round(float(v), 1) for q, v in zip(PERCENTILES, np.percentile(on_data_ns, PERCENTILES))},
+            "max": int(on_data_ns.max()),
+        },
+        # Whole bar: TradeBar/Slice construction, resting orders, indicator and consolidator updates and on_data
+        "bar_ns": round(total / n, 1),
+        # Net objects still alive per bar (plot buffers, order history, ...): growth, not churn
+        "retained_blocks_per_bar": round(retained / n, 3),
+        # Per-bar allocation from the separate tracemalloc pass
+        "allocations": allocated,
+        # Before the tracemalloc pass, whose traces would count against this case
+        "peak_rss_mb": round(peak_rss, 1),
+        "orders": len(algorithm.orders),
+    }
+
+
+def _measure_case(case):
+    return measure(*case)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(strategies=STRATEGIES, sizes=SIZES, seed=0):
+    # One spawned process per (strategy, size): nothing carries over between cases
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for n in sizes:
+        for name in strategies:
+            with context.Pool(1) as pool:
+                result = pool.apply(_measure_case, ((name, n, seed),))
+            print(f"{name:>3} {n:>8} bars  on_data p50 {result['on_data_ns']['p50']:>9.0f} ns  "
+                  f"bar {result['bar_ns']:>9.0f} ns  rss {result['peak_rss_mb']:>7.1f} MB", file=sys.stderr)
+            results.append(result)
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    # Ratio of this run to a previous report for every case both contain (>1 is slower)
+    before = {(r["strategy"], r["bars"]): r for r in baseline["results"]}
+    rows = []
+    for r in report["results"]:
+        old = before.get((r["strategy"], r["bars"]))
+        if old:
+            rows.append({
+                "strategy": r["strategy"],
+                "bars": r["bars"],
+                "on_data_p50": round(r["on_data_ns"]["p50"] / old["on_data_ns"]["p50"], 3),
+                "on_data_p99": round(r["on_data_ns"]["p99"] / old["on_data_ns"]["p99"], 3),
+                "bar_ns": round(r["bar_ns"] / old["bar_ns"], 3),
+                "peak_rss_mb": round(r["peak_rss_mb"] / old["peak_rss_mb"], 3),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.bench",
+                                     description="Per-bar latency of the V1-V6 strategies on synthetic bars")
+    parser.add_argument("--out", default="bench.json", help="JSON report")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--bars", default=",".join(map(str, SIZES)), help="comma-separated stream lengths")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="previous report to compare against")
+    args = parser.parse_args()
+
+    report = run_suite(args.strategies.split(","), [int(n) for n in args.bars.split(",")], args.seed)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = {"commit": baseline.get("commit"), "ratios": compare(report, baseline)}
+        print(json.dumps(report["baseline"], indent=2))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
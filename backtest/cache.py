@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+
+def fingerprint(bars):
+    # Content hash of the OHLC arrays, remembered on the Bars object
+    cached = getattr(bars, "_fingerprint", None)
+    if cached is None:
+        h = hashlib.blake2b(digest_size=12)
+        for column in (bars.time, bars.open, bars.high, bars.low, bars.close):
+            h.update(np.ascontiguousarray(column).view(np.uint8))
+        cached = bars._fingerprint = h.hexdigest()
+    return cached
+
+
+class IndicatorCache:
+    # Memoizes indicator series by (data fingerprint, indicator, parameters, resolution).
+    # Recently used series stay in memory up to max_bytes; everything computed is also spilled to
+    # `directory` (when given) so other processes and later runs load it instead of recomputing.
+    def __init__(self, compute, max_bytes=256 * 2 ** 20, directory=None):
+        self.compute = compute
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = self.disk_hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def key(self, bars, name, args, resolution):
+        return fingerprint(bars), name, tuple(args), resolution
+
+    def _path(self, key):
+        data, name, args, resolution = key
+        return os.path.join(self.directory, data, f"{name}-{'_'.join(map(str, args))}-{resolution}.npy")
+
+    def get(self, bars, name, args, resolution):
+        key = self.key(bars, name, args, resolution)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        path = self._path(key) if self.directory else None
+        if path and os.path.exists(path):
+            value = np.load(path, mmap_mode="r")
+            self.disk_hits += 1
+        else:
+            value = np.asarray(self.compute(bars, name, args, resolution))
+            self.misses += 1
+            if path:
+                self._spill(path, value)
+        self._remember(key, value)
+        return value
+
+    def _spill(self, path, value):
+        # Write-then-rename so concurrent workers never read a half-written file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, value)
+        os.replace(tmp, path)
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._bytes += value.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SignalCache:
+    # Content-addressed store of derived arrays (entry masks, Fibonacci levels): the key hashes the data
+    # fingerprint with a JSON spec of everything the arrays depend on, so configs that differ only in
+    # exit logic map to the same entry. Entries live in `directory` as .npz files, least recently used
+    # first out once the directory passes max_bytes, plus a small in-memory LRU per process.
+    def __init__(self, directory, max_bytes=512 * 2 ** 20, memory_items=64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.hits = self.disk_hits = self.misses = 0
+        self._entries = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".npz"))
+
+    def key(self, bars, kind, spec):
+        digest = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:20]
+        return f"{fingerprint(bars)}-{kind}-{digest}"
+
+    def get(self, bars, kind, spec, compute):
+        # compute() returns a dict of arrays; so does get()
+        key = self.key(bars, kind, spec)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        path = os.path.join(self.directory, f"{key}.npz")
+        try:
+            with np.load(path) as data:
+                value = {name: data[name] for name in data.files}
+            os.utime(path)
+            self.disk_hits += 1
+        except (OSError, ValueError):
+            value = compute()
+            self.misses += 1
+            self._spill(path, value)
+        self._entries[key] = value
+        if len(self._entries) > self.memory_items:
+            self._entries.popitem(last=False)
+        return value
+
+    def _spill(self, path, value):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **{str(name): array for name, array in value.items()})
+        size = os.path.getsize(tmp)
+        os.replace(tmp, path)
+        self._bytes += size
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        # Oldest access first (hits touch the file), down to 80% of the budget
+        entries = sorted((e for e in os.scandir(self.directory) if e.name.endswith(".npz")),
+                         key=lambda e: e.stat().st_mtime_ns)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes * 0.8:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._bytes = total
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+DAY = timedelta(days=1)
+WEEK = timedelta(weeks=1)
+
+
+class SessionCalendar:
+    # Where bars are cut. day_start shifts the trading day off midnight: CFD sessions such as WTICOUSD
+    # roll over at 17:00 New York, so SessionCalendar(day_start=timedelta(hours=17)) makes the "day"
+    # labelled D run from D-1 17:00 to D 17:00 (in the data's time zone). Intraday buckets (4h, ...) are
+    # anchored on the session open and weekly bars start on `week_start` (Monday=0 ... Sunday=6).
+    def __init__(self, day_start=timedelta(0), week_start=0):
+        self.day_start = day_start
+        self.week_start = week_start
+
+    def session_start(self, time):
+        start = datetime(time.year, time.month, time.day) + self.day_start
+        while start > time:
+            start -= DAY
+        while start + DAY <= time:
+            start += DAY
+        return start
+
+    def session_date(self, start):
+        # Sessions opening in the evening belong to the next calendar day (Sunday 17:00 opens Monday)
+        date = start - self.day_start
+        return (date + DAY if self.day_start >= timedelta(hours=12) else date).date()
+
+    def bucket(self, time, period):
+        # (start, end) of the bar of length `period` containing `time`
+        start = self.session_start(time)
+        if period == WEEK:
+            start -= ((self.session_date(start).weekday() - self.week_start) % 7) * DAY
+            return start, start + WEEK
+        if period >= DAY:
+            return start, start + DAY
+        start += ((time - start) // period) * period
+        return start, start + period
+
+
+DEFAULT_CALENDAR = SessionCalendar()
+
+
+class _Event(list):
+    # consolidator.data_consolidated += handler, like LEAN's C# event
+    def __iadd__(self, handler):
+        self.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self.remove(handler)
+        return self
+
+
+class TradeBarConsolidator:
+    # Rolls a finer bar stream into `period` bars (4h, daily, weekly ...) cut on the session calendar.
+    # A consolidated bar is emitted when the first bar of the next bucket arrives, before that bar
+    # reaches on_data, so higher-timeframe indicators never see a partially formed bar.
+    def __init__(self, period, calendar=DEFAULT_CALENDAR):
+        self.period = period
+        self.calendar = calendar
+        self.data_consolidated = _Event()
+        self.consolidated = None
+        self._working = None
+        self._end = None
+
+    def update(self, bar):
+        working = self._working
+        if working is not None and bar.time < self._end:
+            if bar.high > working.high:
+                working.high = bar.high
+            if bar.low < working.low:
+                working.low = bar.low
+            working.close = bar.close
+            working.volume += bar.volume
+            return
+
+        if working is not None:
+            self.consolidated = working
+            for handler in self.data_consolidated:
+                handler(working)
+        start, self._end = self.calendar.bucket(bar.time, self.period)
+        self._working = bar.__class__(start, bar.symbol, bar.open, bar.high, bar.low, bar.close, bar.volume,
+                                      self._end - start)
+
+    def reset(self):
+        self.consolidated = self._working = self._end = None
@@ -0,0 +1,87 @@
+import csv
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+TIME_COLUMNS = ("time", "datetime", "date", "timestamp")
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def parse_time(text):
+    text = text.strip()
+    if text.isdigit():
+        # LEAN-style yyyyMMdd dates, or epoch seconds read as naive UTC like the rest of the bar times
+        if len(text) > 8:
+            return datetime.fromtimestamp(int(text), timezone.utc).replace(tzinfo=None)
+        return datetime.strptime(text, "%Y%m%d")
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y%m%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(text)
+
+
+def read_csv(path):
+    # Returns (times, opens, highs, lows, closes, volumes) as parallel lists, sorted by time
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader)]
+        time_col = next((header.index(c) for c in TIME_COLUMNS if c in header), None)
+        if time_col is None:
+            raise ValueError(f"{path}: no time column in header {header}")
+        price_cols = [header.index(c) for c in PRICE_COLUMNS]
+        volume_col = header.index("volume") if "volume" in header else None
+
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            rows.append((
+                parse_time(row[time_col]),
+                *(float(row[i]) for i in price_cols),
+                float(row[volume_col]) if volume_col is not None and row[volume_col] else 0.0,
+            ))
+    rows.sort(key=lambda r: r[0])
+    return tuple(list(column) for column in zip(*rows)) if rows else ([], [], [], [], [], [])
+
+
+class Bars:
+    # Columnar OHLC arrays with datetime64 bar start times
+    def __init__(self, time, open, high, low, close, volume=None):
+        self.time = np.asarray(time, dtype="datetime64[s]")
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.zeros(len(self.close)) if volume is None else np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(*columns)
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, index):
+        # Slices are views: no copy, even over memory-mapped columns
+        return Bars(self.time[index], self.open[index], self.high[index], self.low[index], self.close[index],
+                    self.volume[index])
+
+    def index(self, when):
+        return int(np.searchsorted(self.time, np.datetime64(when, "s")))
+
+    def between(self, start=None, end=None):
+        # Half-open [start, end) slice, matching the engine's set_start_date/set_end_date handling
+        lo = self.index(start) if start is not None else 0
+        hi = self.index(end) if end is not None else len(self)
+        return self[lo:hi]
+
+
+def load_bars(path):
+    # A bar store directory (see backtest.store) or a CSV file
+    if os.path.isdir(path):
+        from backtest.store import BarStore
+        return BarStore(path).bars()
+    return Bars.from_columns(read_csv(path))
@@ -0,0 +1,201 @@
+import importlib.util
+import inspect
+import sys
+import time as _time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backtest import lean
+from backtest.data import Bars, load_bars
+from backtest.metrics import OnlineMetrics
+from backtest.snapshot import Snapshot
+
+
+class BacktestResult:
+    def __init__(self, algorithm, equity_times, equity, elapsed, bars, snapshot=None, metrics=None):
+        self.algorithm = algorithm
+        self.equity_times = equity_times
+        self.equity = equity
+        self.elapsed = elapsed
+        self.bars = bars
+        self.snapshot = snapshot
+        self.metrics = metrics
+
+    @property
+    def orders(self):
+        return self.algorithm.orders
+
+    @property
+    def charts(self):
+        return self.algorithm.charts
+
+    def summary(self):
+        equity = self.equity
+        metrics = self.metrics
+        if metrics is None:
+            metrics = OnlineMetrics()
+            metrics.update_many(equity, self.equity_times)
+        start = equity[0] if equity else 0.0
+        end = equity[-1] if equity else 0.0
+        return {
+            "algorithm": type(self.algorithm).__name__,
+            "bars": self.bars,
+            "orders": len(self.orders),
+            "start_equity": round(start, 2),
+            "end_equity": round(end, 2),
+            "net_return": round(end / start - 1, 6) if start else 0.0,
+            **metrics.summary(),
+            "elapsed_s": round(self.elapsed, 4),
+        }
+
+
+def load_algorithm(path):
+    # Imports a strategy file with `AlgorithmImports` resolved to the offline shim
+    sys.modules.setdefault("AlgorithmImports", lean)
+    path = Path(path).resolve()
+    # Strategies import their helper modules (rolling, ...) from their own directory, as in a LEAN project
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so classes defined in the strategy file can be pickled into snapshots
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    classes = [c for _, c in inspect.getmembers(module, inspect.isclass)
+               if issubclass(c, lean.QCAlgorithm) and c is not lean.QCAlgorithm and c.__module__ == module.__name__]
+    if len(classes) != 1:
+        raise ValueError(f"{path}: expected exactly one QCAlgorithm subclass, found {[c.__name__ for c in classes]}")
+    return classes[0]
+
+
+def instrument(profiler, algorithm, handlers):
+    # Method-level profiler sections: on_data, every method the strategy defines, order calls, plotting
+    # and the per-bar indicator/consolidator updates. Finer sections are opt-in inside the strategy.
+    own = [name for name, value in vars(type(algorithm)).items()
+           if inspect.isfunction(value) and not name.startswith("__") and name not in ("initialize", "on_data")]
+    profiler.instrument(algorithm, ["on_data", *own, "market_order", "liquidate"])
+    plotter = getattr(algorithm, "plotter", None)
+    if plotter is not None:
+        profiler.instrument(plotter, ["plot"], "plotter.")
+    handlers[:] = [profiler.wrap(h, f"update {type(getattr(h, '__self__', h)).__name__}") for h in handlers]
+
+
+def replay_range(bars, start, end, warm_up):
+    # Bar indices (warm_first, first, last): warm-up replays [warm_first, first), results cover [first, last)
+    first = bars.index(start) if start else 0
+    last = bars.index(end) if end else len(bars)
+    warm_first = first
+    if isinstance(warm_up, int):
+        warm_first = max(0, first - warm_up)
+    elif isinstance(warm_up, timedelta) and first < len(bars):
+        warm_first = bars.index(bars.time[first] - np.timedelta64(warm_up))
+    return warm_first, first, last
+
+
+def bar_step(algorithm, symbol, period=timedelta(hours=1)):
+    # What a backtest does with one bar before on_data, as step(time, open, high, low, close, volume) -> Slice:
+    # fill resting orders against the bar, update indicators and consolidators, ratchet trailing stops.
+    # Shared with backtest.bench so the benchmark replays bars exactly as a backtest does.
+    security = algorithm.securities[symbol]
+    holding = algorithm.portfolio[symbol]
+    handlers = algorithm._bar_handlers[symbol]
+    # Stop/limit orders rest here between bars; empty for strategies that only use market orders
+    resting = algorithm._resting
+    TradeBar, Slice = lean.TradeBar, lean.Slice
+
+    def step(time, open, high, low, close, volume):
+        bar = TradeBar(time, symbol, open, high, low, close, volume, period)
+        algorithm.time = bar.end_time
+        security.price = holding.price = close
+        if resting:
+            algorithm._fill_resting(bar)
+        for handler in handlers:
+            handler(bar)
+        if resting:
+            algorithm._trail_resting(bar)
+        return Slice(bar.end_time, {symbol: bar})
+
+    return step
+
+
+def run(algorithm_cls, bars, start=None, end=None, period=timedelta(hours=1), session=None,
+        snapshot=None, snapshot_at=None, profiler=None, metrics=None, snapshot_history=False):
+    # snapshot: a Snapshot to resume from instead of warming up; replay starts at the snapshot's time.
+    # snapshot_at: capture a Snapshot after the last bar ending at or before this time (result.snapshot),
+    # with the orders, charts and plot buffers so far if snapshot_history is set.
+    # profiler: an enabled profiler.Profiler to attribute the run's time to sections.
+    # metrics: an OnlineMetrics to keep accumulating into, e.g. the one saved with the snapshot.
+    if not isinstance(bars, Bars):
+        bars = Bars.from_columns(bars)
+    algorithm = algorithm_cls()
+    if session is not None:
+        # Must be in place before initialize() so the daily/weekly consolidators are cut on it
+        algorithm.session_calendar = session
+    algorithm.initialize()
+    if snapshot is not None:
+        snapshot.restore(algorithm)
+    if len(algorithm.securities) != 1:
+        raise ValueError("the offline engine replays a single symbol per run")
+    symbol = next(iter(algorithm.securities))
+    handlers = algorithm._bar_handlers[symbol]
+
+    start = start or algorithm.start_date
+    end = end or (algorithm.end_date + timedelta(days=1) if algorithm.end_date else None)
+    warm_up = algorithm.warm_up_period if snapshot is None else None
+    warm_first, first, last = replay_range(bars, start, end, warm_up)
+    if snapshot is not None:
+        # Indicators are already warm; bars between the snapshot and `start` still run as warm-up
+        warm_first = bars.index(snapshot.time)
+        first = max(first, warm_first)
+
+    # Only the replayed window is converted to Python scalars; the source arrays may be memory-mapped
+    window = bars[warm_first:last]
+    times = window.time.tolist()
+    opens, highs, lows = window.open.tolist(), window.high.tolist(), window.low.tolist()
+    closes, volumes = window.close.tolist(), window.volume.tolist()
+    first, count = first - warm_first, last - warm_first
+    capture = -1
+    if snapshot_at is not None:
+        capture = int(np.searchsorted(window.time, np.datetime64(snapshot_at - period, "s"), side="right")) - 1
+    captured = None
+
+    if profiler is not None:
+        instrument(profiler, algorithm, handlers)
+    step = bar_step(algorithm, symbol, period)
+    on_data = algorithm.on_data
+    equity_times, equity = [], []
+    # Sharpe, drawdown, trade stats etc. are accumulated as the run goes rather than from the curve afterwards
+    # Trades are timed in bar indices into `bars`, which stay valid across resumed runs
+    metrics = OnlineMetrics() if metrics is None else metrics
+    orders, seen = algorithm.orders, len(algorithm.orders)
+    for held in algorithm.portfolio.values():
+        if held.quantity and held.symbol not in metrics.positions:
+            # Carried in from a snapshot
+            metrics.positions[held.symbol] = [held.quantity, held.average_price, warm_first + first]
+
+    started = _time.perf_counter()
+    algorithm.is_warming_up = first > 0
+    for i in range(count):
+        if i == first:
+            algorithm.is_warming_up = False
+        data = step(times[i], opens[i], highs[i], lows[i], closes[i], volumes[i])
+        on_data(data)
+        if i >= first:
+            value = algorithm.portfolio.total_portfolio_value
+            equity_times.append(data.time)
+            equity.append(value)
+            metrics.update(value, data.time)
+            if len(orders) != seen:
+                seen = metrics.fills(orders, seen, warm_first + i)
+        if i == capture:
+            captured = Snapshot.take(algorithm, snapshot_history)
+    algorithm.on_end_of_algorithm()
+    elapsed = _time.perf_counter() - started
+
+    return BacktestResult(algorithm, equity_times, equity, elapsed, count - first, captured, metrics)
+
+
+def run_file(path, data_path, **kwargs):
+    return run(load_algorithm(path), load_bars(data_path), **kwargs)
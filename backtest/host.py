@@ -0,0 +1,191 @@
+import argparse
+import json
+import time as _time
+from datetime import timedelta
+
+from backtest import lean
+from backtest.data import Bars, load_bars
+from backtest.engine import BacktestResult, load_algorithm, replay_range
+from backtest.metrics import OnlineMetrics
+
+INDICATOR_METHODS = ("macd", "sma", "ema", "rsi", "bb", "adx", "atr")
+
+
+def _normalize(value):
+    # Resolution.HOUR and timedelta(hours=1) ask for the same series
+    return lean.RESOLUTION_PERIOD.get(value, value) if isinstance(value, str) else value
+
+
+class SharedIndicators:
+    # Hands every hosted algorithm the same indicator object for the same (method, symbol, arguments) and
+    # first replayed bar. The first algorithm to ask creates and registers it, so it is updated once per bar
+    # by that algorithm's handlers; later algorithms get the instance without registering it again.
+    # Algorithms whose replay starts elsewhere (another warm-up or start date) never share, as the indicator
+    # would not have seen the history a separate run feeds it.
+    def __init__(self):
+        self.indicators = {}
+        self.requested = 0
+
+    def attach(self, algorithm, group=None):
+        # Shadows the factory methods on the instance, before initialize() runs
+        for name in INDICATOR_METHODS:
+            setattr(algorithm, name, self._shared(name, getattr(algorithm, name), group))
+
+    def _shared(self, name, create, group):
+        def indicator(symbol, *args, **kwargs):
+            key = (group, name, symbol, tuple(map(_normalize, args)),
+                   tuple(sorted((k, _normalize(v)) for k, v in kwargs.items())))
+            self.requested += 1
+            found = self.indicators.get(key)
+            if found is None:
+                found = self.indicators[key] = create(symbol, *args, **kwargs)
+            return found
+        return indicator
+
+
+class HostResult:
+    def __init__(self, results, shared, elapsed):
+        self.results = results
+        self.shared = shared
+        self.elapsed = elapsed
+
+    def summary(self):
+        return {
+            "strategies": [r.summary() for r in self.results],
+            "indicators": len(self.shared.indicators),
+            "indicators_requested": self.shared.requested,
+            "elapsed_s": round(self.elapsed, 4),
+        }
+
+
+class _Feed:
+    # One hosted algorithm's state in the shared pass; bar indices are into the pass's window
+    __slots__ = ("algorithm", "warm_first", "first", "last", "updates", "security", "holding", "resting",
+                 "handlers", "on_data", "equity_times", "equity", "metrics", "seen")
+
+    def __init__(self, algorithm, symbol, warm_first, first, last):
+        self.algorithm = algorithm
+        self.warm_first = warm_first
+        self.first = first
+        self.last = last
+        self.updates = last
+        self.security = algorithm.securities[symbol]
+        self.holding = algorithm.portfolio[symbol]
+        self.resting = algorithm._resting
+        self.handlers = algorithm._bar_handlers[symbol]
+        self.on_data = algorithm.on_data
+        self.equity_times = []
+        self.equity = []
+        self.metrics = OnlineMetrics()
+        self.seen = len(algorithm.orders)
+
+
+def _initialized(algorithm_cls, session):
+    algorithm = algorithm_cls()
+    if session is not None:
+        algorithm.session_calendar = session
+    return algorithm
+
+
+def run(algorithm_classes, bars, start=None, end=None, period=timedelta(hours=1), session=None):
+    # Replays one symbol's bars through several algorithms at once: each bar and Slice is built once,
+    # each distinct indicator is updated once, and every algorithm keeps its own portfolio, order log
+    # and resting orders. Each algorithm sees exactly the bars a separate engine.run would feed it: its
+    # own dates (or start/end if given) and its own warm-up, so its orders match a separate run's.
+    # Within a bar the phases of engine.run are kept for every algorithm: resting fills, then indicator
+    # updates, then on_data.
+    if not isinstance(bars, Bars):
+        bars = Bars.from_columns(bars)
+    shared = SharedIndicators()
+    algorithms, ranges = [], []
+    for algorithm_cls in algorithm_classes:
+        # The replay range depends on initialize(), and decides which indicators can be shared
+        probe = _initialized(algorithm_cls, session)
+        probe.initialize()
+        own_start = start or probe.start_date
+        own_end = end or (probe.end_date + timedelta(days=1) if probe.end_date else None)
+        window = replay_range(bars, own_start, own_end, probe.warm_up_period)
+        algorithm = _initialized(algorithm_cls, session)
+        shared.attach(algorithm, window[0])
+        algorithm.initialize()
+        if len(algorithm.securities) != 1:
+            raise ValueError(f"{type(algorithm).__name__}: the host replays a single symbol")
+        algorithms.append(algorithm)
+        ranges.append(window)
+    symbols = {next(iter(a.securities)) for a in algorithms}
+    if len(symbols) != 1:
+        raise ValueError(f"hosted algorithms subscribe to different symbols: {sorted(map(str, symbols))}")
+    symbol = symbols.pop()
+
+    lo = min(warm_first for warm_first, _, _ in ranges)
+    hi = max(last for _, _, last in ranges)
+    window = bars[lo:hi]
+    times = window.time.tolist()
+    opens, highs, lows = window.open.tolist(), window.high.tolist(), window.low.tolist()
+    closes, volumes = window.close.tolist(), window.volume.tolist()
+
+    feeds = [_Feed(algorithm, symbol, warm_first - lo, first - lo, last - lo)
+             for algorithm, (warm_first, first, last) in zip(algorithms, ranges)]
+    for feed in feeds:
+        # An algorithm's handlers keep running past its own end while another one may read its indicators
+        feed.updates = max(other.last for other in feeds if other.warm_first == feed.warm_first)
+    TradeBar, Slice = lean.TradeBar, lean.Slice
+
+    started = _time.perf_counter()
+    for i in range(hi - lo):
+        updating = [feed for feed in feeds if feed.warm_first <= i < feed.updates]
+        if not updating:
+            continue
+        active = [feed for feed in updating if i < feed.last]
+        bar = TradeBar(times[i], symbol, opens[i], highs[i], lows[i], closes[i], volumes[i], period)
+        end_time, close = bar.end_time, bar.close
+        for feed in active:
+            algorithm = feed.algorithm
+            algorithm.is_warming_up = i < feed.first
+            algorithm.time = end_time
+            feed.security.price = feed.holding.price = close
+            if feed.resting:
+                algorithm._fill_resting(bar)
+        # Shared indicators sit in their creator's handler list only, so running every active algorithm's
+        # list updates each once
+        for feed in updating:
+            for handler in feed.handlers:
+                handler(bar)
+        data = Slice(end_time, {symbol: bar})
+        for feed in active:
+            algorithm = feed.algorithm
+            if feed.resting:
+                algorithm._trail_resting(bar)
+            feed.on_data(data)
+            if i >= feed.first:
+                value = algorithm.portfolio.total_portfolio_value
+                feed.equity_times.append(end_time)
+                feed.equity.append(value)
+                feed.metrics.update(value, end_time)
+                if len(algorithm.orders) != feed.seen:
+                    feed.seen = feed.metrics.fills(algorithm.orders, feed.seen, lo + i)
+            if i == feed.last - 1:
+                algorithm.on_end_of_algorithm()
+    for feed in feeds:
+        if feed.last <= feed.warm_first:
+            feed.algorithm.on_end_of_algorithm()
+    elapsed = _time.perf_counter() - started
+
+    results = [BacktestResult(feed.algorithm, feed.equity_times, feed.equity, elapsed, max(0, feed.last - feed.first),
+                              metrics=feed.metrics) for feed in feeds]
+    return HostResult(results, shared, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.host",
+                                     description="Replay several strategies over one pass of the bars")
+    parser.add_argument("strategies", nargs="+", help="strategy files, e.g. V3.py V4.py V5.py")
+    parser.add_argument("--data", required=True, help="bar store directory or CSV")
+    args = parser.parse_args()
+
+    result = run([load_algorithm(path) for path in args.strategies], load_bars(args.data))
+    print(json.dumps(result.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
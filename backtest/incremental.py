@@ -0,0 +1,143 @@
+import ast
+import hashlib
+import os
+import pickle
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backtest.cache import fingerprint
+from backtest.engine import BacktestResult, run
+
+# Shim modules whose behaviour is baked into a checkpoint's state
+SHIM_FILES = ("lean.py", "indicators.py", "consolidators.py", "engine.py", "snapshot.py", "metrics.py", "data.py")
+
+
+class _DropEndDate(ast.NodeTransformer):
+    # The end date decides how far a run goes, not what it computes up to there
+    def visit_Expr(self, node):
+        call = node.value
+        if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "set_end_date":
+            return None
+        return node
+
+
+def _local_imports(tree, directory):
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return sorted(directory / f"{name}.py" for name in names if (directory / f"{name}.py").exists())
+
+
+def code_hash(algorithm_cls):
+    # The strategy's syntax tree with set_end_date() left out (so comments and formatting don't count
+    # either), plus the source of the helper modules it imports from its own directory, transitively, and
+    # of the shim
+    path = Path(sys.modules[algorithm_cls.__module__].__file__).resolve()
+    tree = _DropEndDate().visit(ast.parse(path.read_text()))
+    h = hashlib.sha1(algorithm_cls.__name__.encode())
+    h.update(ast.dump(tree).encode())
+    pending, seen = _local_imports(tree, path.parent), {path}
+    while pending:
+        source = pending.pop()
+        if source in seen:
+            continue
+        seen.add(source)
+        text = source.read_text()
+        h.update(text.encode())
+        pending.extend(_local_imports(ast.parse(text), path.parent))
+    shim = Path(__file__).resolve().parent
+    for name in SHIM_FILES:
+        h.update((shim / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+class Checkpoint:
+    # End-of-run state: a Snapshot taken after the last bar (before on_end_of_algorithm) with the run's
+    # orders, charts and plot buffers, the equity curve and metrics accumulated up to it, and a fingerprint
+    # of the bars consumed, so a checkpoint is only resumed over the exact history that produced it
+    def __init__(self, snapshot, consumed, data, equity_times, equity, metrics, bars):
+        self.snapshot = snapshot
+        self.consumed = consumed
+        self.data = data
+        self.equity_times = equity_times
+        self.equity = equity
+        self.metrics = metrics
+        self.bars = bars
+
+    @property
+    def time(self):
+        return self.snapshot.time
+
+
+class CheckpointStore:
+    # root/<strategy>/<code hash>/<start>_<session>/<time>.ckpt, one file per run end
+    def __init__(self, root):
+        self.root = root
+
+    def directory(self, algorithm_cls, start, session=None):
+        calendar = f"{session.day_start.total_seconds():g}-{session.week_start}" if session is not None else "default"
+        run = f"{np.datetime64(start, 's')}_{calendar}".replace(":", "")
+        return os.path.join(self.root, algorithm_cls.__name__, code_hash(algorithm_cls), run)
+
+    def latest(self, directory, bars, end=None):
+        # The newest checkpoint at or before `end` whose history matches `bars`
+        if not os.path.isdir(directory):
+            return None
+        for name in sorted(os.listdir(directory), reverse=True):
+            if not name.endswith(".ckpt"):
+                continue
+            with open(os.path.join(directory, name), "rb") as f:
+                checkpoint = pickle.load(f)
+            if end is not None and checkpoint.time > end:
+                continue
+            if checkpoint.consumed <= len(bars) and fingerprint(bars[:checkpoint.consumed]) == checkpoint.data:
+                return checkpoint
+        return None
+
+    def save(self, directory, checkpoint):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{np.datetime64(checkpoint.time, 's')}.ckpt".replace(":", ""))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+
+def run_incremental(algorithm_cls, bars, root, start=None, end=None, period=timedelta(hours=1), session=None):
+    # engine.run that resumes from the latest checkpoint of the same code, start date and history, so moving
+    # set_end_date (or `end`) forward only simulates the new bars; the returned result covers the whole
+    # range. Every run leaves a checkpoint at its end. Returns (result, time resumed from or None).
+    probe = algorithm_cls()
+    if session is not None:
+        probe.session_calendar = session
+    probe.initialize()
+    start = start or probe.start_date
+    end = end or (probe.end_date + timedelta(days=1) if probe.end_date else None)
+
+    store = CheckpointStore(root)
+    directory = store.directory(algorithm_cls, start, session)
+    found = store.latest(directory, bars, end)
+    until = end or bars.time[-1].item() + period
+    if found is None:
+        result = run(algorithm_cls, bars, start, end, period, session, snapshot_at=until, snapshot_history=True)
+        times, equity, count = result.equity_times, result.equity, result.bars
+    else:
+        result = run(algorithm_cls, bars, start, end, period, session, snapshot=found.snapshot, snapshot_at=until,
+                     metrics=found.metrics, snapshot_history=True)
+        times, equity = found.equity_times + result.equity_times, found.equity + result.equity
+        count = found.bars + result.bars
+    merged = BacktestResult(result.algorithm, times, equity, result.elapsed, count, result.snapshot, result.metrics)
+
+    # Only a snapshot of the final bar lines up with the equity and metrics saved beside it
+    if result.snapshot is not None and times and result.snapshot.time == times[-1]:
+        consumed = bars.index(result.snapshot.time)
+        store.save(directory, Checkpoint(result.snapshot, consumed, fingerprint(bars[:consumed]), times, equity,
+                                         result.metrics, count))
+    return merged, found.time if found is not None else None
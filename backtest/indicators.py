@@ -0,0 +1,393 @@
+import math
+
+# Streaming versions of the LEAN indicators the strategies use. Each update is a handful of float
+# operations on __slots__ state: current/previous are two IndicatorDataPoints that swap roles and are
+# overwritten in place, so a steady-state update allocates nothing. The recurrences are written in the
+# same order as backtest.ta, so the bar-by-bar and vectorized engines agree to the last bit.
+
+
+class IndicatorDataPoint:
+    __slots__ = ("time", "value")
+
+    def __init__(self, time=None, value=0.0):
+        self.time = time
+        self.value = value
+
+    def __float__(self):
+        return float(self.value)
+
+    def __repr__(self):
+        return f"IndicatorDataPoint({self.time}, {self.value})"
+
+
+def _values(values):
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class Indicator:
+    # Mirrors LEAN's IndicatorBase: update(time, value) or update(bar), current/previous, samples, is_ready.
+    # The base class is the identity indicator used for component series (MACD histogram, bands, +DI/-DI).
+    __slots__ = ("name", "period", "samples", "current", "previous")
+
+    def __init__(self, name, period):
+        self.name = name
+        self.period = period
+        self.samples = 0
+        self.current = IndicatorDataPoint()
+        self.previous = IndicatorDataPoint()
+
+    @property
+    def is_ready(self):
+        return self.samples >= self.period
+
+    def update(self, time, value=None):
+        if value is None:
+            value = time.close
+            time = time.end_time
+        value = self._step(value, time)
+        self.samples += 1
+        point = self.previous
+        self.previous = self.current
+        point.time = time
+        point.value = value
+        self.current = point
+        return self.is_ready
+
+    def update_many(self, values, times=None):
+        # Batch path: feeds a whole array through the same recurrence and returns the output per input
+        values = _values(values)
+        times = _values(times) if times is not None else [None] * len(values)
+        step = self._step
+        out = []
+        for value, time in zip(values, times):
+            out.append(step(value, time))
+            self.samples += 1
+        self._finish_many(out, times)
+        return out
+
+    def _finish_many(self, out, times):
+        if len(out) > 1:
+            self.previous.time, self.previous.value = times[-2], out[-2]
+        elif out:
+            self.previous.time, self.previous.value = self.current.time, self.current.value
+        if out:
+            self.current.time, self.current.value = times[-1], out[-1]
+
+    def _step(self, value, time):
+        return value
+
+    def reset(self):
+        self.samples = 0
+        self.current.time, self.current.value = None, 0.0
+        self.previous.time, self.previous.value = None, 0.0
+
+    def __repr__(self):
+        return f"{self.name}: {self.current.value}"
+
+
+class SimpleMovingAverage(Indicator):
+    __slots__ = ("_window", "_index", "_sum")
+
+    def __init__(self, period, name=None):
+        super().__init__(name or f"SMA({period})", period)
+        self._window = [0.0] * period
+        self._index = 0
+        self._sum = 0.0
+
+    def _step(self, value, time):
+        # Ring buffer: drop the value leaving the window once it is full, then add the new one
+        index = self._index
+        if self.samples >= self.period:
+            self._sum -= self._window[index]
+        self._window[index] = value
+        self._index = index + 1 if index + 1 < self.period else 0
+        self._sum += value
+        return self._sum / min(self.samples + 1, self.period)
+
+    def update_many(self, values, times=None):
+        values = _values(values)
+        times = _values(times) if times is not None else [None] * len(values)
+        window, index, total, period, samples = self._window, self._index, self._sum, self.period, self.samples
+        out = []
+        for value in values:
+            if samples >= period:
+                total -= window[index]
+            window[index] = value
+            index = index + 1 if index + 1 < period else 0
+            total += value
+            samples += 1
+            out.append(total / (samples if samples < period else period))
+        self._index, self._sum, self.samples = index, total, samples
+        self._finish_many(out, times)
+        return out
+
+    def reset(self):
+        super().reset()
+        self._window = [0.0] * self.period
+        self._index = 0
+        self._sum = 0.0
+
+
+class ExponentialMovingAverage(Indicator):
+    # Seeded with the SMA of the first `period` samples, like LEAN
+    __slots__ = ("alpha", "_sum", "_value")
+
+    def __init__(self, period, name=None, alpha=None):
+        super().__init__(name or f"EMA({period})", period)
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+        self._sum = 0.0
+        self._value = 0.0
+
+    def _step(self, value, time):
+        if self.samples < self.period:
+            self._sum += value
+            self._value = self._sum / (self.samples + 1)
+        else:
+            self._value = self._value + self.alpha * (value - self._value)
+        return self._value
+
+    def update_many(self, values, times=None):
+        values = _values(values)
+        times = _values(times) if times is not None else [None] * len(values)
+        # Warm-up goes through _step for the seed; after that the recurrence runs on locals
+        warm = max(0, min(len(values), self.period - self.samples))
+        out = super().update_many(values[:warm], times[:warm])
+        current, alpha = self._value, self.alpha
+        tail = []
+        for value in values[warm:]:
+            current = current + alpha * (value - current)
+            tail.append(current)
+        self._value = current
+        if tail:
+            self.samples += len(tail)
+            self._finish_many(out + tail, times)
+        return out + tail
+
+    def reset(self):
+        super().reset()
+        self._sum = 0.0
+        self._value = 0.0
+
+
+class WildersMovingAverage(ExponentialMovingAverage):
+    __slots__ = ()
+
+    def __init__(self, period, name=None):
+        super().__init__(period, name or f"RMA({period})", alpha=1.0 / period)
+
+
+class MovingAverageConvergenceDivergence(Indicator):
+    __slots__ = ("fast", "slow", "signal", "histogram")
+
+    def __init__(self, fast_period, slow_period, signal_period, name=None):
+        super().__init__(name or f"MACD({fast_period},{slow_period},{signal_period})", slow_period + signal_period - 1)
+        self.fast = ExponentialMovingAverage(fast_period)
+        self.slow = ExponentialMovingAverage(slow_period)
+        self.signal = ExponentialMovingAverage(signal_period)
+        self.histogram = Indicator("Histogram", 1)
+
+    @property
+    def is_ready(self):
+        return self.signal.is_ready
+
+    def _step(self, value, time):
+        fast_ready = self.fast.update(time, value)
+        slow_ready = self.slow.update(time, value)
+        macd = self.fast.current.value - self.slow.current.value
+        if fast_ready and slow_ready:
+            self.signal.update(time, macd)
+            self.histogram.update(time, macd - self.signal.current.value)
+        return macd
+
+    def reset(self):
+        super().reset()
+        for indicator in (self.fast, self.slow, self.signal, self.histogram):
+            indicator.reset()
+
+
+class RelativeStrengthIndex(Indicator):
+    __slots__ = ("average_gain", "average_loss", "_previous_input")
+
+    def __init__(self, period, name=None):
+        super().__init__(name or f"RSI({period})", period + 1)
+        self.average_gain = WildersMovingAverage(period)
+        self.average_loss = WildersMovingAverage(period)
+        self._previous_input = None
+
+    def _step(self, value, time):
+        previous = self._previous_input
+        self._previous_input = value
+        if previous is None:
+            return 0.0
+        change = value - previous
+        self.average_gain.update(time, change if change > 0 else 0.0)
+        self.average_loss.update(time, -change if change < 0 else 0.0)
+        loss = self.average_loss.current.value
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.average_gain.current.value / loss)
+
+    def reset(self):
+        super().reset()
+        self.average_gain.reset()
+        self.average_loss.reset()
+        self._previous_input = None
+
+
+class BollingerBands(Indicator):
+    # Population standard deviation over the window, from running sums
+    __slots__ = ("k", "_window", "_index", "_sum", "_sum_sq", "middle_band", "upper_band", "lower_band",
+                 "standard_deviation")
+
+    def __init__(self, period, k, name=None):
+        super().__init__(name or f"BB({period},{k})", period)
+        self.k = k
+        self._window = [0.0] * period
+        self._index = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self.middle_band = Indicator("MiddleBand", period)
+        self.upper_band = Indicator("UpperBand", period)
+        self.lower_band = Indicator("LowerBand", period)
+        self.standard_deviation = Indicator("StandardDeviation", period)
+
+    def _step(self, value, time):
+        index = self._index
+        if self.samples >= self.period:
+            old = self._window[index]
+            self._sum -= old
+            self._sum_sq -= old * old
+        self._window[index] = value
+        self._index = index + 1 if index + 1 < self.period else 0
+        self._sum += value
+        self._sum_sq += value * value
+        n = min(self.samples + 1, self.period)
+        mean = self._sum / n
+        std = math.sqrt(max(0.0, self._sum_sq / n - mean * mean))
+        self.middle_band.update(time, mean)
+        self.upper_band.update(time, mean + self.k * std)
+        self.lower_band.update(time, mean - self.k * std)
+        self.standard_deviation.update(time, std)
+        return mean
+
+    def reset(self):
+        super().reset()
+        self._window = [0.0] * self.period
+        self._index = 0
+        self._sum = self._sum_sq = 0.0
+        for band in (self.middle_band, self.upper_band, self.lower_band, self.standard_deviation):
+            band.reset()
+
+
+class BarIndicator(Indicator):
+    # Indicators that consume whole TradeBars (high, low, close) rather than a single value
+    __slots__ = ()
+
+    def update(self, bar):
+        value = self._step_bar(bar.high, bar.low, bar.close, bar.end_time)
+        self.samples += 1
+        point = self.previous
+        self.previous = self.current
+        point.time = bar.end_time
+        point.value = value
+        self.current = point
+        return self.is_ready
+
+    def update_many(self, high, low, close, times=None):
+        high, low, close = _values(high), _values(low), _values(close)
+        times = _values(times) if times is not None else [None] * len(close)
+        step = self._step_bar
+        out = []
+        for h, l, c, t in zip(high, low, close, times):
+            out.append(step(h, l, c, t))
+            self.samples += 1
+        self._finish_many(out, times)
+        return out
+
+    def _step_bar(self, high, low, close, time):
+        raise NotImplementedError
+
+
+def true_range(high, low, previous_close):
+    if previous_close is None:
+        return high - low
+    return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+
+class AverageTrueRange(BarIndicator):
+    __slots__ = ("true_range", "_average", "_previous_close")
+
+    def __init__(self, period, name=None):
+        super().__init__(name or f"ATR({period})", period)
+        self.true_range = Indicator("TrueRange", 1)
+        self._average = WildersMovingAverage(period)
+        self._previous_close = None
+
+    def _step_bar(self, high, low, close, time):
+        tr = true_range(high, low, self._previous_close)
+        self._previous_close = close
+        self.true_range.update(time, tr)
+        self._average.update(time, tr)
+        return self._average.current.value
+
+    def reset(self):
+        super().reset()
+        self.true_range.reset()
+        self._average.reset()
+        self._previous_close = None
+
+
+class AverageDirectionalIndex(BarIndicator):
+    __slots__ = ("_n", "_previous_high", "_previous_low", "_previous_close", "_tr", "_dm_plus", "_dm_minus",
+                 "_dx", "positive_directional_index", "negative_directional_index")
+
+    def __init__(self, period, name=None):
+        super().__init__(name or f"ADX({period})", period * 2)
+        self._n = period
+        self._previous_high = self._previous_low = self._previous_close = None
+        self._tr = self._dm_plus = self._dm_minus = 0.0
+        self._dx = WildersMovingAverage(period)
+        self.positive_directional_index = Indicator("+DI", period + 1)
+        self.negative_directional_index = Indicator("-DI", period + 1)
+
+    def _step_bar(self, high, low, close, time):
+        previous_high, previous_low, previous_close = self._previous_high, self._previous_low, self._previous_close
+        self._previous_high, self._previous_low, self._previous_close = high, low, close
+        if previous_close is None:
+            return 0.0
+
+        tr = true_range(high, low, previous_close)
+        up = high - previous_high
+        down = previous_low - low
+        dm_plus = up if up > down and up > 0 else 0.0
+        dm_minus = down if down > up and down > 0 else 0.0
+
+        # Wilder smoothing of the running sums: seeded with the plain sum of the first `period` values
+        n = self._n
+        samples = self.samples + 1
+        if samples <= n + 1:
+            self._tr += tr
+            self._dm_plus += dm_plus
+            self._dm_minus += dm_minus
+        else:
+            self._tr = self._tr - self._tr / n + tr
+            self._dm_plus = self._dm_plus - self._dm_plus / n + dm_plus
+            self._dm_minus = self._dm_minus - self._dm_minus / n + dm_minus
+        if samples < n + 1:
+            return 0.0
+
+        di_plus = 100.0 * self._dm_plus / self._tr if self._tr else 0.0
+        di_minus = 100.0 * self._dm_minus / self._tr if self._tr else 0.0
+        self.positive_directional_index.update(time, di_plus)
+        self.negative_directional_index.update(time, di_minus)
+        di_sum = di_plus + di_minus
+        self._dx.update(time, 100.0 * abs(di_plus - di_minus) / di_sum if di_sum else 0.0)
+        return self._dx.current.value
+
+    def reset(self):
+        super().reset()
+        self._previous_high = self._previous_low = self._previous_close = None
+        self._tr = self._dm_plus = self._dm_minus = 0.0
+        self._dx.reset()
+        self.positive_directional_index.reset()
+        self.negative_directional_index.reset()
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import numpy as np
+
+from backtest.data import Bars
+
+
+def resample(bars, period=timedelta(hours=1)):
+    # Coarser bars rolled up from finer ones (minute -> hour), cut on multiples of `period` since the epoch
+    step = np.timedelta64(period).astype("timedelta64[s]").astype(np.int64)
+    seconds = bars.time.astype(np.int64)
+    bucket = seconds - seconds % step
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.append(starts[1:], len(bars)) - 1
+    return Bars(bucket[starts].astype("datetime64[s]"), bars.open[starts], np.maximum.reduceat(bars.high, starts),
+                np.minimum.reduceat(bars.low, starts), bars.close[ends], np.add.reduceat(bars.volume, starts))
+
+
+class IntrabarIndex:
+    # Maps every hourly bar to its [lo, hi) range of minute bars (one vectorized searchsorted up front),
+    # so locating the minute a stop or target was first touched is a scan of at most 60 rows of the
+    # memory-mapped minute columns, and only for hours whose high/low actually crossed a level.
+    def __init__(self, bars, minutes, period=timedelta(hours=1)):
+        self.minutes = minutes
+        self.lo = np.searchsorted(minutes.time, bars.time)
+        self.hi = np.searchsorted(minutes.time, bars.time + np.timedelta64(period))
+
+    def first_touch(self, i, side, stop, target):
+        # (is_stop, fill price, minute index) of the first minute in hourly bar i whose range reaches
+        # the stop or the target, or None. A minute that spans both counts as the stop, and a minute
+        # that opens through a level fills at its open.
+        lo, hi = self.lo[i], self.hi[i]
+        if lo == hi:
+            return None
+        m = self.minutes
+        if side > 0:
+            stopped = m.low[lo:hi] <= stop
+            reached = m.high[lo:hi] >= target
+        else:
+            stopped = m.high[lo:hi] >= stop
+            reached = m.low[lo:hi] <= target
+        s = int(np.argmax(stopped)) if stopped.any() else hi - lo
+        t = int(np.argmax(reached)) if reached.any() else hi - lo
+        if s == t == hi - lo:
+            return None
+        k = lo + min(s, t)
+        opened = float(m.open[k])
+        if s <= t:
+            return True, min(opened, stop) if side > 0 else max(opened, stop), k
+        return False, max(opened, target) if side > 0 else min(opened, target), k
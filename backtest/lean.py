@@ -0,0 +1,559 @@
+from datetime import datetime, timedelta
+
+from backtest.consolidators import DEFAULT_CALENDAR, TradeBarConsolidator
+from backtest.indicators import (
+    AverageDirectionalIndex, AverageTrueRange, BollingerBands, ExponentialMovingAverage,
+    IndicatorDataPoint, MovingAverageConvergenceDivergence, RelativeStrengthIndex, SimpleMovingAverage,
+)
+
+
+class _Names:
+    # Enum-like namespaces (Color, SeriesType, ...) that accept both LEAN spellings: Color.BLACK and Color.Black
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return attr.upper()
+
+    def __repr__(self):
+        return self._name
+
+
+Color = _Names("Color")
+SeriesType = _Names("SeriesType")
+ScatterMarkerSymbol = _Names("ScatterMarkerSymbol")
+
+
+class Resolution:
+    TICK = Tick = "TICK"
+    SECOND = Second = "SECOND"
+    MINUTE = Minute = "MINUTE"
+    HOUR = Hour = "HOUR"
+    DAILY = Daily = "DAILY"
+
+
+class OrderType:
+    MARKET = Market = "MARKET"
+    LIMIT = Limit = "LIMIT"
+    STOP_MARKET = StopMarket = "STOP_MARKET"
+    TRAILING_STOP = TrailingStop = "TRAILING_STOP"
+
+
+class OrderStatus:
+    SUBMITTED = Submitted = "SUBMITTED"
+    FILLED = Filled = "FILLED"
+    CANCELED = Canceled = "CANCELED"
+
+
+class Calendar:
+    WEEKLY = Weekly = timedelta(weeks=1)
+    DAILY = Daily = timedelta(days=1)
+
+
+RESOLUTION_PERIOD = {
+    Resolution.SECOND: timedelta(seconds=1),
+    Resolution.MINUTE: timedelta(minutes=1),
+    Resolution.HOUR: timedelta(hours=1),
+    Resolution.DAILY: timedelta(days=1),
+}
+
+
+class Symbol:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Symbol) and other.value == self.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __str__(self):
+        return self.value
+
+    __repr__ = __str__
+
+
+class TradeBar:
+    __slots__ = ("time", "end_time", "symbol", "open", "high", "low", "close", "volume")
+
+    def __init__(self, time, symbol, open, high, low, close, volume=0.0, period=timedelta(hours=1)):
+        self.time = time
+        self.end_time = time + period
+        self.symbol = symbol
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @property
+    def value(self):
+        return self.close
+
+    @property
+    def price(self):
+        return self.close
+
+    def __repr__(self):
+        return f"TradeBar({self.symbol} {self.time} O:{self.open} H:{self.high} L:{self.low} C:{self.close})"
+
+
+class Slice:
+    __slots__ = ("time", "bars")
+
+    def __init__(self, time, bars):
+        self.time = time
+        self.bars = bars
+
+    def contains_key(self, symbol):
+        return symbol in self.bars
+
+    ContainsKey = contains_key
+
+    def __contains__(self, symbol):
+        return symbol in self.bars
+
+    def __getitem__(self, symbol):
+        return self.bars[symbol]
+
+    def get(self, symbol, default=None):
+        return self.bars.get(symbol, default)
+
+    def keys(self):
+        return self.bars.keys()
+
+
+class RollingWindow:
+    # RollingWindow[float](n): index 0 is the most recent value
+    def __class_getitem__(cls, item):
+        return cls
+
+    def __init__(self, size):
+        self.size = size
+        self._items = []
+        self.samples = 0
+
+    def add(self, item):
+        self.samples += 1
+        self._items.insert(0, item)
+        if len(self._items) > self.size:
+            self._items.pop()
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    @property
+    def is_ready(self):
+        return len(self._items) == self.size
+
+    def reset(self):
+        self._items.clear()
+        self.samples = 0
+
+
+class Series:
+    def __init__(self, name, series_type=SeriesType.LINE, unit="$", color=None, symbol=None):
+        self.name = name
+        self.series_type = series_type
+        self.unit = unit
+        self.color = color
+        self.scatter_marker_symbol = symbol
+        self.values = []
+
+    def add_point(self, time, value):
+        self.values.append((time, value))
+
+
+class Chart:
+    def __init__(self, name):
+        self.name = name
+        self.series = {}
+
+    def add_series(self, series):
+        self.series[series.name] = series
+
+
+class Security:
+    def __init__(self, symbol, resolution):
+        self.symbol = symbol
+        self.resolution = resolution
+        self.price = 0.0
+
+
+class SecurityHolding:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.quantity = 0
+        self.average_price = 0.0
+        self.price = 0.0
+
+    @property
+    def invested(self):
+        return self.quantity != 0
+
+    @property
+    def is_long(self):
+        return self.quantity > 0
+
+    @property
+    def is_short(self):
+        return self.quantity < 0
+
+    @property
+    def holdings_value(self):
+        return self.quantity * self.price
+
+    @property
+    def unrealized_profit(self):
+        return self.quantity * (self.price - self.average_price)
+
+
+class SecurityPortfolioManager(dict):
+    def __init__(self):
+        super().__init__()
+        self.cash = 0.0
+
+    def __missing__(self, symbol):
+        holding = self[symbol] = SecurityHolding(symbol)
+        return holding
+
+    @property
+    def total_portfolio_value(self):
+        return self.cash + sum(h.quantity * h.price for h in self.values())
+
+    @property
+    def invested(self):
+        return any(h.quantity for h in self.values())
+
+    def fill(self, symbol, quantity, price):
+        holding = self[symbol]
+        new_quantity = holding.quantity + quantity
+        if new_quantity == 0:
+            holding.average_price = 0.0
+        elif holding.quantity == 0 or (holding.quantity > 0) != (new_quantity > 0):
+            holding.average_price = price
+        elif abs(new_quantity) > abs(holding.quantity):
+            holding.average_price = (holding.average_price * holding.quantity + price * quantity) / new_quantity
+        holding.quantity = new_quantity
+        self.cash -= quantity * price
+
+
+class OrderEvent:
+    # The shim only reports fills, so status is always FILLED; LEAN also sends SUBMITTED/CANCELED events
+    __slots__ = ("order_id", "time", "symbol", "quantity", "fill_price", "tag", "status")
+
+    def __init__(self, order_id, time, symbol, quantity, fill_price, tag):
+        self.order_id = order_id
+        self.time = time
+        self.symbol = symbol
+        self.quantity = quantity
+        self.fill_price = fill_price
+        self.tag = tag
+        self.status = OrderStatus.FILLED
+
+    def __repr__(self):
+        return f"OrderEvent({self.order_id} {self.time} {self.symbol} {self.quantity}@{self.fill_price} {self.tag!r})"
+
+
+class OrderTicket:
+    # A resting limit/stop/trailing-stop order. One-cancels-other pairs are the strategy's job, as in LEAN:
+    # cancel the sibling from on_order_event (see brackets.py)
+    __slots__ = ("order_id", "symbol", "quantity", "order_type", "stop_price", "limit_price", "trailing_amount",
+                 "tag", "status", "fill_price")
+
+    def __init__(self, order_id, symbol, quantity, order_type, stop_price=None, limit_price=None,
+                 trailing_amount=None, tag=""):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.order_type = order_type
+        self.stop_price = stop_price
+        self.limit_price = limit_price
+        self.trailing_amount = trailing_amount
+        self.tag = tag
+        self.status = OrderStatus.SUBMITTED
+        self.fill_price = None
+
+    @property
+    def is_open(self):
+        return self.status == OrderStatus.SUBMITTED
+
+    def cancel(self, tag=None):
+        if self.status == OrderStatus.SUBMITTED:
+            self.status = OrderStatus.CANCELED
+
+    def update_stop_price(self, price, tag=None):
+        self.stop_price = price
+
+    def update_limit_price(self, price, tag=None):
+        self.limit_price = price
+
+    def trigger(self, bar):
+        # Fill price if the bar reaches the order, or None. Gaps through the level fill at the open.
+        if self.order_type == OrderType.LIMIT:
+            limit = self.limit_price
+            if self.quantity < 0:
+                return max(bar.open, limit) if bar.high >= limit else None
+            return min(bar.open, limit) if bar.low <= limit else None
+        stop = self.stop_price
+        if self.quantity < 0:
+            return min(bar.open, stop) if bar.low <= stop else None
+        return max(bar.open, stop) if bar.high >= stop else None
+
+    def trail(self, close):
+        # Trailing stops ratchet from the close
+        amount = self.trailing_amount
+        if self.quantity < 0:
+            self.stop_price = max(self.stop_price, close - amount)
+        else:
+            self.stop_price = min(self.stop_price, close + amount)
+
+    def __repr__(self):
+        level = self.limit_price if self.order_type == OrderType.LIMIT else self.stop_price
+        return f"OrderTicket({self.order_id} {self.order_type} {self.symbol} {self.quantity}@{level} {self.status})"
+
+
+class QCAlgorithm:
+    # The subset of LEAN's QCAlgorithm that the V1-V6 strategies rely on
+    def __init__(self):
+        self.time = None
+        self.start_date = None
+        self.end_date = None
+        self.portfolio = SecurityPortfolioManager()
+        self.securities = {}
+        self.charts = {}
+        self.orders = []
+        self.is_warming_up = False
+        self.warm_up_period = None
+        self.session_calendar = DEFAULT_CALENDAR
+        self._consolidators = {}
+        self._bar_handlers = {}
+        self._next_order_id = 1
+        # Resting stop/limit orders, evaluated by the engine against each new bar before on_data
+        self._resting = []
+
+    # --- setup ---
+
+    def set_start_date(self, year, month=None, day=None):
+        self.start_date = year if isinstance(year, datetime) else datetime(year, month, day)
+
+    def set_end_date(self, year, month=None, day=None):
+        self.end_date = year if isinstance(year, datetime) else datetime(year, month, day)
+
+    def set_cash(self, cash):
+        self.portfolio.cash = float(cash)
+
+    def set_warm_up(self, period, resolution=None):
+        self.warm_up_period = period
+
+    def add_cfd(self, ticker, resolution=Resolution.HOUR, *args, **kwargs):
+        security = Security(Symbol(ticker), resolution)
+        self.securities[security.symbol] = security
+        self._bar_handlers.setdefault(security.symbol, [])
+        return security
+
+    add_forex = add_equity = add_crypto = add_cfd
+
+    # --- indicators ---
+
+    def _consolidator(self, symbol, period):
+        # One consolidator per (symbol, period), fed from the symbol's own stream: higher-timeframe
+        # indicators never need a second subscription
+        period = RESOLUTION_PERIOD.get(period, period)
+        consolidator = self._consolidators.get((symbol, period))
+        if consolidator is None:
+            if not isinstance(period, timedelta) or period <= RESOLUTION_PERIOD[self.securities[symbol].resolution]:
+                raise ValueError(f"Cannot consolidate {symbol} into {period}")
+            consolidator = TradeBarConsolidator(period, self.session_calendar)
+            self._consolidators[(symbol, period)] = consolidator
+            self._bar_handlers[symbol].insert(0, consolidator.update)
+        return consolidator
+
+    def consolidate(self, symbol, period, handler):
+        consolidator = self._consolidator(symbol, period)
+        consolidator.data_consolidated += handler
+        return consolidator
+
+    def register_indicator(self, symbol, indicator, resolution=None, selector=None):
+        # update(bar) feeds bar indicators the whole bar and value indicators its close
+        if isinstance(resolution, TradeBarConsolidator):
+            resolution.data_consolidated += indicator.update
+        elif resolution is None or resolution == self.securities[symbol].resolution:
+            self._bar_handlers[symbol].append(indicator.update)
+        else:
+            self._consolidator(symbol, resolution).data_consolidated += indicator.update
+        return indicator
+
+    _register = register_indicator
+
+    def macd(self, symbol, fast_period, slow_period, signal_period, type=None, resolution=None, selector=None):
+        if resolution is None and type in RESOLUTION_PERIOD:
+            type, resolution = None, type
+        return self._register(symbol, MovingAverageConvergenceDivergence(fast_period, slow_period, signal_period),
+                              resolution)
+
+    def sma(self, symbol, period, resolution=None, selector=None):
+        return self._register(symbol, SimpleMovingAverage(period), resolution)
+
+    def ema(self, symbol, period, resolution=None, selector=None):
+        return self._register(symbol, ExponentialMovingAverage(period), resolution)
+
+    def rsi(self, symbol, period, moving_average_type=None, resolution=None, selector=None):
+        if resolution is None and moving_average_type in RESOLUTION_PERIOD:
+            moving_average_type, resolution = None, moving_average_type
+        return self._register(symbol, RelativeStrengthIndex(period), resolution)
+
+    def bb(self, symbol, period, k, moving_average_type=None, resolution=None, selector=None):
+        if resolution is None and moving_average_type in RESOLUTION_PERIOD:
+            moving_average_type, resolution = None, moving_average_type
+        return self._register(symbol, BollingerBands(period, k), resolution)
+
+    def adx(self, symbol, period, resolution=None, selector=None):
+        return self._register(symbol, AverageDirectionalIndex(period), resolution)
+
+    def atr(self, symbol, period, moving_average_type=None, resolution=None, selector=None):
+        if resolution is None and moving_average_type in RESOLUTION_PERIOD:
+            moving_average_type, resolution = None, moving_average_type
+        return self._register(symbol, AverageTrueRange(period), resolution)
+
+    # --- charting ---
+
+    def add_chart(self, chart):
+        self.charts[chart.name] = chart
+
+    def plot(self, chart, series, value):
+        target = self.charts.get(chart)
+        if target is None:
+            target = self.charts[chart] = Chart(chart)
+        points = target.series.get(series)
+        if points is None:
+            points = target.series[series] = Series(series)
+        points.values.append((self.time, value))
+
+    # --- orders ---
+
+    def _fill(self, symbol, quantity, price, tag, order_id=None):
+        if order_id is None:
+            order_id = self._next_order_id
+            self._next_order_id += 1
+        self.portfolio.fill(symbol, quantity, price)
+        event = OrderEvent(order_id, self.time, symbol, quantity, price, tag)
+        self.orders.append(event)
+        self.on_order_event(event)
+        return event
+
+    def market_order(self, symbol, quantity, asynchronous=False, tag="", order_properties=None):
+        if self.is_warming_up or quantity == 0:
+            return None
+        return self._fill(symbol, quantity, self.securities[symbol].price, tag)
+
+    def _submit(self, symbol, quantity, order_type, tag, **levels):
+        if self.is_warming_up or quantity == 0:
+            return None
+        ticket = OrderTicket(self._next_order_id, symbol, quantity, order_type, tag=tag, **levels)
+        self._next_order_id += 1
+        # Stops are checked before limits, so a bar that reaches both fills the stop
+        if order_type == OrderType.LIMIT:
+            self._resting.append(ticket)
+        else:
+            self._resting.insert(0, ticket)
+        return ticket
+
+    def limit_order(self, symbol, quantity, limit_price, asynchronous=False, tag="", order_properties=None):
+        return self._submit(symbol, quantity, OrderType.LIMIT, tag, limit_price=limit_price)
+
+    def stop_market_order(self, symbol, quantity, stop_price, asynchronous=False, tag="", order_properties=None):
+        return self._submit(symbol, quantity, OrderType.STOP_MARKET, tag, stop_price=stop_price)
+
+    def trailing_stop_order(self, symbol, quantity, trailing_amount, trailing_as_percentage=False, tag="",
+                            order_properties=None):
+        price = self.securities[symbol].price
+        if trailing_as_percentage:
+            trailing_amount *= price
+        ticket = self._submit(symbol, quantity, OrderType.TRAILING_STOP, tag, trailing_amount=trailing_amount)
+        if ticket is not None:
+            ticket.stop_price = float("inf") if quantity > 0 else float("-inf")
+            ticket.trail(price)
+        return ticket
+
+    def _fill_resting(self, bar):
+        # Orders placed from on_order_event during this pass start resting from the next bar
+        for ticket in tuple(self._resting):
+            if ticket.status != OrderStatus.SUBMITTED or ticket.symbol != bar.symbol:
+                continue
+            price = ticket.trigger(bar)
+            if price is None:
+                continue
+            ticket.status = OrderStatus.FILLED
+            ticket.fill_price = price
+            # on_order_event may cancel tickets later in this pass (OCO siblings); they are skipped above
+            self._fill(ticket.symbol, ticket.quantity, price, ticket.tag, ticket.order_id)
+        self._resting[:] = [t for t in self._resting if t.status == OrderStatus.SUBMITTED]
+
+    def _trail_resting(self, bar):
+        for ticket in self._resting:
+            if ticket.order_type == OrderType.TRAILING_STOP and ticket.symbol == bar.symbol and ticket.is_open:
+                ticket.trail(bar.close)
+
+    def cancel_open_orders(self, symbol=None):
+        for ticket in self._resting:
+            if symbol is None or ticket.symbol == symbol:
+                ticket.cancel()
+        self._resting[:] = [t for t in self._resting if t.status == OrderStatus.SUBMITTED]
+
+    def liquidate(self, symbol=None, tag="Liquidated", **kwargs):
+        self.cancel_open_orders(symbol)
+        symbols = [symbol] if symbol is not None else list(self.portfolio)
+        events = []
+        for s in symbols:
+            quantity = self.portfolio[s].quantity
+            if quantity:
+                events.append(self.market_order(s, -quantity, tag=tag))
+        return events
+
+    # --- logging ---
+
+    def debug(self, message):
+        pass
+
+    def log(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+    # --- events ---
+
+    def initialize(self):
+        pass
+
+    def on_data(self, data):
+        pass
+
+    def on_order_event(self, order_event):
+        pass
+
+    def on_end_of_algorithm(self):
+        pass
+
+
+__all__ = [
+    "QCAlgorithm", "Resolution", "Calendar", "Slice", "TradeBar", "Symbol", "RollingWindow", "Chart", "Series", "SeriesType",
+    "Color", "ScatterMarkerSymbol", "OrderEvent", "OrderTicket", "OrderType", "OrderStatus",
+    "TradeBarConsolidator", "IndicatorDataPoint", "datetime", "timedelta",
+]
@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+
+YEAR_S = 365.25 * 86400
+
+
+class OnlineMetrics:
+    # Performance statistics kept up to date bar by bar in constant memory: per-bar returns go through
+    # Welford's mean/variance (plus a running downside sum of squares for Sortino), drawdown through the
+    # running peak, and closed trades through win/loss sums, holding time and per-tag counters. update()
+    # and fill() are the streaming path; update_many() and trades_many() fold whole arrays into the same
+    # state (Chan's parallel merge), so both engines report identical numbers.
+    __slots__ = ("count", "mean", "m2", "downside", "last", "first", "peak", "max_drawdown", "first_time",
+                 "last_time", "trades", "wins", "gross_profit", "gross_loss", "held_bars", "tags", "positions")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside = 0.0
+        self.first = self.last = None
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.first_time = self.last_time = None
+        self.trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.held_bars = 0
+        # tag -> [trades, pnl]
+        self.tags = {}
+        # symbol -> [quantity, average price, entry bar] for fills fed one at a time
+        self.positions = {}
+
+    # --- equity ---
+
+    def update(self, equity, time=None):
+        last = self.last
+        if last is None:
+            self.first = equity
+            self.first_time = time
+        elif last:
+            r = equity / last - 1.0
+            self.count += 1
+            delta = r - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (r - self.mean)
+            if r < 0.0:
+                self.downside += r * r
+        self.last = equity
+        self.last_time = time
+        if equity > self.peak:
+            self.peak = equity
+        elif self.peak > 0:
+            drawdown = (self.peak - equity) / self.peak
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+
+    def update_many(self, equity, times=None):
+        equity = np.asarray(equity, dtype=np.float64)
+        if not len(equity):
+            return
+        if self.last is None:
+            self.first = float(equity[0])
+            self.first_time = times[0] if times is not None else None
+            previous = equity[:-1]
+            current = equity[1:]
+        else:
+            previous = np.concatenate(([self.last], equity[:-1]))
+            current = equity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = current / previous - 1.0
+        r = r[previous != 0]
+        if len(r):
+            n, mean = len(r), float(r.mean())
+            m2 = float(np.sum((r - mean) ** 2))
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += m2 + delta * delta * self.count * n / total
+            self.count = total
+            negative = r[r < 0.0]
+            self.downside += float(np.dot(negative, negative))
+        peak = np.maximum.accumulate(np.concatenate(([self.peak], equity)))[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(peak > 0, (peak - equity) / peak, 0.0)
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        self.peak = float(peak[-1])
+        self.last = float(equity[-1])
+        self.last_time = times[-1] if times is not None else None
+
+    # --- trades ---
+
+    def trade(self, pnl, bars_held, tag=""):
+        self.trades += 1
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        else:
+            self.gross_loss -= pnl
+        self.held_bars += bars_held
+        counter = self.tags.get(tag)
+        if counter is None:
+            counter = self.tags[tag] = [0, 0.0]
+        counter[0] += 1
+        counter[1] += pnl
+
+    def trades_many(self, pnl, bars_held, tags):
+        for p, held, tag in zip(np.asarray(pnl).tolist(), np.asarray(bars_held).tolist(), tags):
+            self.trade(p, held, tag)
+
+    def fill(self, symbol, quantity, price, tag, bar):
+        # Order events from the bar-by-bar engine: fills that reduce a position close (part of) a trade
+        # against its average entry price and are counted under the closing order's tag
+        position = self.positions.get(symbol)
+        if position is None or position[0] == 0:
+            self.positions[symbol] = [quantity, price, bar]
+            return
+        held, average, entry = position
+        if (held > 0) == (quantity > 0):
+            position[1] = (held * average + quantity * price) / (held + quantity)
+            position[0] = held + quantity
+            return
+        closed = -quantity if abs(quantity) <= abs(held) else held
+        self.trade(closed * (price - average), bar - entry, tag)
+        remaining = held + quantity
+        if remaining and (remaining > 0) != (held > 0):
+            # Reversal: the excess opens a new trade at this fill
+            self.positions[symbol] = [remaining, price, bar]
+        else:
+            position[0] = remaining
+
+    def fills(self, orders, seen, bar):
+        # Feeds the OrderEvents appended to an algorithm's order log since `seen`; returns the new length
+        for i in range(seen, len(orders)):
+            order = orders[i]
+            self.fill(order.symbol, order.quantity, order.fill_price, order.tag, bar)
+        return len(orders)
+
+    # --- results ---
+
+    def periods_per_year(self):
+        if self.first_time is None or self.last_time is None or not self.count:
+            return None
+        span = self.last_time - self.first_time
+        seconds = span / np.timedelta64(1, "s") if isinstance(span, np.timedelta64) else span.total_seconds()
+        return self.count * YEAR_S / seconds if seconds > 0 else None
+
+    def summary(self, periods_per_year=None):
+        # Sharpe and Sortino are per-bar figures scaled by sqrt(bars per year), estimated from the time
+        # span seen unless given. profit_factor is None when there are wins but no losses (it would be
+        # infinite, which JSON can't carry)
+        periods_per_year = periods_per_year or self.periods_per_year() or 1.0
+        scale = math.sqrt(periods_per_year)
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        downside = math.sqrt(self.downside / self.count) if self.count else 0.0
+        return {
+            "sharpe": round(self.mean / std * scale, 6) if std else 0.0,
+            "sortino": round(self.mean / downside * scale, 6) if downside else 0.0,
+            "max_drawdown": round(self.max_drawdown, 6),
+            "trades": self.trades,
+            "win_rate": round(self.wins / self.trades, 6) if self.trades else 0.0,
+            "profit_factor": round(self.gross_profit / self.gross_loss, 6) if self.gross_loss else
+            (None if self.gross_profit else 0.0),
+            "avg_holding_bars": round(self.held_bars / self.trades, 3) if self.trades else 0.0,
+            "exits": {tag: {"trades": n, "pnl": round(pnl, 2)} for tag, (n, pnl) in sorted(self.tags.items())},
+        }
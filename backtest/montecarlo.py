@@ -0,0 +1,143 @@
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backtest.data import load_bars
+from backtest.engine import load_algorithm, run
+from backtest.vector import EXIT_TAGS, PRESETS, TAG_LONG, TAG_SHORT, backtest
+
+METHODS = ("bootstrap", "permutation")
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+def trade_returns(trades, cash):
+    # Each closed trade's P&L as a fraction of the equity it was sized from. Trades are sequential, so
+    # that equity is the starting cash plus everything realized before it.
+    closed = np.array([tag in EXIT_TAGS for tag in trades.exit_tag], dtype=bool)
+    pnl = trades.pnl[closed]
+    before = cash + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return pnl / before
+
+
+def order_returns(orders, cash):
+    # The same from a shim run's OrderEvents: an entry ("Long Entry"/"Short Entry") closed by the next
+    # order on the symbol ("Take Profit", "Stop Loss", "Time Exit", ...)
+    returns, equity, entry = [], cash, None
+    for order in orders:
+        if order.tag in (TAG_LONG, TAG_SHORT) and entry is None:
+            entry = order
+        elif entry is not None and order.quantity == -entry.quantity:
+            pnl = entry.quantity * (order.fill_price - entry.fill_price)
+            returns.append(pnl / equity)
+            equity += pnl
+            entry = None
+    return np.array(returns)
+
+
+class MonteCarloResult:
+    def __init__(self, returns, final_return, max_drawdown, ruined, method, elapsed):
+        self.returns = returns
+        self.final_return = final_return
+        self.max_drawdown = max_drawdown
+        self.ruined = ruined
+        self.method = method
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.final_return)
+
+    def summary(self):
+        def distribution(values):
+            return {f"p{q}": round(float(v), 6) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+        return {
+            "method": self.method,
+            "paths": len(self),
+            "trades": len(self.returns),
+            "final_return": distribution(self.final_return),
+            "max_drawdown": distribution(self.max_drawdown),
+            "ruin_probability": round(float(self.ruined.mean()), 6) if len(self) else 0.0,
+            "elapsed_s": round(self.elapsed, 4),
+        }
+
+
+def simulate(returns, paths=10000, method="bootstrap", ruin=0.5, seed=0, chunk=8192, length=None):
+    # Resamples the trade returns into `paths` synthetic sequences and compounds them, `chunk` paths at a
+    # time as one (chunk x trades) matrix. bootstrap draws with replacement; permutation reshuffles the
+    # realized trades, which keeps the final return and only moves the drawdown. A path is ruined once
+    # its equity falls to (1 - ruin) of the start.
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    returns = np.asarray(returns, dtype=np.float64)
+    n = length or len(returns)
+    if method == "permutation" and n != len(returns):
+        raise ValueError("permutation paths are as long as the trade list")
+    rng = np.random.default_rng(seed)
+    # Log growth per trade; a loss of 100% or more is -inf, i.e. ruin
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.log1p(np.maximum(returns, -1.0))
+    floor = np.log1p(-ruin) if ruin < 1 else -np.inf
+
+    final_return = np.empty(paths)
+    max_drawdown = np.empty(paths)
+    ruined = np.empty(paths, dtype=bool)
+    started = time.perf_counter()
+    for lo in range(0, paths, chunk):
+        rows = min(chunk, paths - lo)
+        if not len(returns):
+            final_return[lo:lo + rows] = max_drawdown[lo:lo + rows] = 0.0
+            ruined[lo:lo + rows] = False
+            continue
+        if method == "bootstrap":
+            sample = growth[rng.integers(0, len(growth), size=(rows, n))]
+        else:
+            sample = growth[rng.permuted(np.broadcast_to(np.arange(n), (rows, n)), axis=1)]
+        wealth = np.cumsum(sample, axis=1)
+        peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 0.0)
+        with np.errstate(invalid="ignore"):
+            drawdown = np.nan_to_num(peak - wealth, nan=np.inf).max(axis=1)
+        final_return[lo:lo + rows] = np.expm1(wealth[:, -1])
+        max_drawdown[lo:lo + rows] = -np.expm1(-drawdown)
+        ruined[lo:lo + rows] = wealth.min(axis=1) <= floor
+    return MonteCarloResult(returns, final_return, max_drawdown, ruined, method, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.montecarlo",
+                                     description="Resample a backtest's trades into synthetic equity paths")
+    parser.add_argument("--data", required=True, help="bar store directory or CSV")
+    parser.add_argument("--preset", default="V6", choices=sorted(PRESETS))
+    parser.add_argument("--strategy", metavar="FILE",
+                        help="replay a V-file through the shim and resample its realized trades instead of --preset")
+    parser.add_argument("--start", default=None, help="default 2020-01-01, or the V-file's start date")
+    parser.add_argument("--end", default=None, help="inclusive, like set_end_date; default 2020-12-31 or the V-file's")
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--method", default="bootstrap", choices=METHODS)
+    parser.add_argument("--ruin", type=float, default=0.5, help="fractional loss that counts as ruin")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) + timedelta(days=1) if args.end else None
+    if args.strategy:
+        # The tagged orders of a bar-by-bar run, sized from the cash the strategy starts with
+        algorithm_cls = load_algorithm(args.strategy)
+        probe = algorithm_cls()
+        probe.initialize()
+        result = run(algorithm_cls, load_bars(args.data), start, end)
+        returns = order_returns(result.orders, probe.portfolio.cash)
+    else:
+        params = PRESETS[args.preset]
+        bars = load_bars(args.data).between(start or datetime(2020, 1, 1), end or datetime(2021, 1, 1))
+        result = backtest(bars, params)
+        returns = trade_returns(result.trades, params.cash)
+    report = simulate(returns, args.paths, args.method, args.ruin, args.seed).summary()
+    report["backtest"] = result.summary()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
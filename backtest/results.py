@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import json
+import operator
+import os
+import pickle
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from backtest.vector import PRESETS, StrategyParams
+
+OPERATORS = {"==": operator.eq, "!=": operator.ne, "<=": operator.le, ">=": operator.ge, "<": operator.lt,
+             ">": operator.gt}
+
+
+def load_results(path):
+    # One JSON object per line (the store's index, sweep tables); a torn last line from a crash is ignored
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return results
+
+
+def _stamp(value):
+    return str(np.datetime64(value, "s")) if value is not None else ""
+
+
+def _save_columns(path, columns):
+    # One compressed .npz per table, a .npy member per column, written then renamed into place
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, **columns)
+    os.replace(tmp, path)
+
+
+class ResultStore:
+    # Every run's trades, equity curve and (optionally) chart series as columnar .npz files under
+    # runs/<strategy>/<params hash>/<engine>_<start>_<end>/, plus one index row per run in index.jsonl holding
+    # its identity, flattened parameters and summary metrics. Queries only touch the index, loaded
+    # once into one array per field; run files are opened on demand.
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._columns = None
+        self._loaded = None
+
+    def run_path(self, key):
+        return os.path.join(self.root, "runs", key)
+
+    @staticmethod
+    def key(strategy, params_hash, start, end, engine="vector"):
+        span = f"{engine}_{_stamp(start)}_{_stamp(end)}".replace(":", "")
+        return f"{strategy}/{params_hash}/{span}"
+
+    # --- writing ---
+
+    def write_run(self, strategy, params, metrics, start, end, trades, equity_time, equity, charts=None,
+                  params_hash=None, engine="vector"):
+        # trades: dict of equal-length columns (entry_time, exit_time, quantity, entry_price, exit_price, tag)
+        params = dict(params or {})
+        params_hash = params_hash or hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        key = self.key(strategy, params_hash, start, end, engine)
+        path = self.run_path(key)
+        os.makedirs(path, exist_ok=True)
+        tags = list(trades.get("tag", []))
+        vocabulary = sorted(set(tags))
+        columns = {name: np.asarray(values) for name, values in trades.items() if name != "tag"}
+        columns["tag"] = np.array([vocabulary.index(t) for t in tags], dtype=np.int8)
+        _save_columns(os.path.join(path, "trades.npz"), columns)
+        _save_columns(os.path.join(path, "equity.npz"), {
+            "time": np.asarray(equity_time, dtype="datetime64[s]"), "value": np.asarray(equity, dtype=np.float64)})
+        if charts:
+            series = {}
+            for chart, chart_series in charts.items():
+                for name, points in chart_series.items():
+                    times, values = zip(*points) if points else ((), ())
+                    series[f"{chart}/{name}/time"] = np.array(times, dtype="datetime64[s]")
+                    series[f"{chart}/{name}/value"] = np.array(values, dtype=np.float64)
+            _save_columns(os.path.join(path, "charts.npz"), series)
+        row = {"key": key, "strategy": strategy, "engine": engine, "params_hash": params_hash, "start": _stamp(start),
+               "end": _stamp(end), "tags": vocabulary, "written": round(time.time(), 3),
+               "params": params, "metrics": metrics}
+        with open(os.path.join(path, "run.json"), "w") as f:
+            json.dump(row, f)
+        return row
+
+    def append_index(self, rows):
+        # Only one process should append; sweep workers write run files and hand rows back
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        self._columns = None
+
+    def add(self, *args, **kwargs):
+        row = self.write_run(*args, **kwargs)
+        self.append_index([row])
+        return row
+
+    def add_vector(self, strategy, result, start=None, end=None):
+        row = self.write_vector(strategy, result, start, end)
+        self.append_index([row])
+        return row
+
+    def write_vector(self, strategy, result, start=None, end=None):
+        # A vector.VectorResult: trade indices become bar times
+        bars, trades = result.bars, result.trades
+        columns = {
+            "entry_time": bars.time[trades.entry_index], "exit_time": bars.time[trades.exit_index],
+            "quantity": trades.quantity, "entry_price": trades.entry_price, "exit_price": trades.exit_price,
+            "tag": trades.exit_tag,
+        }
+        start = start if start is not None else (bars.time[0] if len(bars) else None)
+        end = end if end is not None else (bars.time[-1] if len(bars) else None)
+        return self.write_run(strategy, result.params.as_dict(), result.summary(), start, end, columns, bars.time,
+                              result.equity, params_hash=result.params.digest())
+
+    def add_backtest(self, result, params=None, charts=True):
+        # An engine.BacktestResult: the order log is stored as-is (one row per fill), charts included.
+        # params: the StrategyParams (or a dict) the strategy runs with; by default its vector preset, so
+        # shim runs of V3-V6 answer the same parameter queries as vector runs
+        strategy = type(result.algorithm).__name__
+        params = PRESETS.get(strategy) if params is None else params
+        params_hash = None
+        if isinstance(params, StrategyParams):
+            params, params_hash = params.as_dict(), params.digest()
+        orders = result.orders
+        columns = {
+            "time": np.array([o.time for o in orders], dtype="datetime64[s]"),
+            "quantity": np.array([o.quantity for o in orders], dtype=np.float64),
+            "price": np.array([o.fill_price for o in orders], dtype=np.float64),
+            "tag": [o.tag for o in orders],
+        }
+        series = None
+        if charts:
+            series = {name: {s: target.values for s, target in chart.series.items()}
+                      for name, chart in result.charts.items()}
+        times = result.equity_times
+        summary = result.summary()
+        del summary["algorithm"]
+        return self.add(strategy, params, summary, times[0] if times else None, times[-1] if times else None,
+                        columns, times, result.equity, series, params_hash, "shim")
+
+    # --- reading ---
+
+    def rows(self):
+        # Last write wins for a key that was run more than once
+        return list({row["key"]: row for row in load_results(self.index_path)}.values())
+
+    def _source(self):
+        st = os.stat(self.index_path)
+        return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+    def columns(self):
+        # The index as one array per field ("key", "strategy", "params.adx_threshold", "metrics.max_drawdown",
+        # ...). It is persisted as index.pkl next to index.jsonl and only rebuilt when the log has changed,
+        # so a query in a fresh process is an np.load plus a few vectorized comparisons.
+        if not os.path.exists(self.index_path):
+            return {}
+        source = self._source()
+        if self._columns is not None and np.array_equal(self._loaded, source):
+            return self._columns
+        cached = os.path.join(self.root, "index.pkl")
+        columns = None
+        if os.path.exists(cached):
+            with open(cached, "rb") as f:
+                stamp, columns = pickle.load(f)
+            if not np.array_equal(stamp, source):
+                columns = None
+        if columns is None:
+            flat = [_flatten(row) for row in self.rows()]
+            columns = {}
+            for name in sorted({name for row in flat for name in row}):
+                values = [row.get(name) for row in flat]
+                if all(isinstance(v, (int, float, bool)) or v is None for v in values):
+                    columns[name] = np.array([np.nan if v is None else float(v) for v in values])
+                else:
+                    columns[name] = np.array(["" if v is None else str(v) for v in values])
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump((source, columns), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cached)
+        self._columns, self._loaded = columns, source
+        return columns
+
+    def query(self, *conditions):
+        # conditions: "strategy == V5", "adx_threshold > 20", "max_drawdown < 0.15". Bare names are looked up
+        # as themselves, then under params. and metrics. Returns the matching index rows, flattened.
+        columns = self.columns()
+        if not columns:
+            return []
+        mask = np.ones(len(columns["key"]), dtype=bool)
+        for condition in conditions:
+            name, op, value = _parse_condition(condition)
+            column = _column(columns, name)
+            with np.errstate(invalid="ignore"):
+                mask &= OPERATORS[op](column, value if column.dtype.kind == "U" else float(value))
+        rows = np.flatnonzero(mask)
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*(columns[name][rows].tolist() for name in names))]
+
+    def load(self, key, table="trades"):
+        path = os.path.join(self.run_path(key), f"{table}.npz")
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files}
+        if table == "trades" and "tag" in columns:
+            with open(os.path.join(self.run_path(key), "run.json")) as f:
+                vocabulary = json.load(f)["tags"]
+            columns["tag"] = np.array(vocabulary, dtype=object)[columns["tag"]] if vocabulary else columns["tag"]
+        return columns
+
+    def remove(self, key):
+        shutil.rmtree(self.run_path(key), ignore_errors=True)
+        rows = [row for row in self.rows() if row["key"] != key]
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        os.replace(tmp, self.index_path)
+        self._columns = None
+
+
+def _flatten(row, prefix=""):
+    flat = {}
+    for name, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{name}."))
+        elif not isinstance(value, list):
+            flat[prefix + name] = value
+    return flat
+
+
+def _column(columns, name):
+    for candidate in (name, f"params.{name}", f"metrics.{name}"):
+        if candidate in columns:
+            return columns[candidate]
+    raise KeyError(f"no field {name!r} in the index")
+
+
+def _parse_condition(text):
+    for op in ("==", "!=", "<=", ">=", "<", ">"):
+        name, found, value = text.partition(op)
+        if found:
+            return name.strip(), op, value.strip()
+    raise ValueError(f"cannot parse condition {text!r}; expected e.g. 'max_drawdown < 0.15'")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.results", description="Query stored backtest runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="list runs matching every condition")
+    query.add_argument("root")
+    query.add_argument("conditions", nargs="*", help="e.g. 'strategy == V5' 'adx_threshold > 20'")
+    query.add_argument("--fields", default="key,metrics.net_return,metrics.max_drawdown")
+    show = sub.add_parser("show", help="print one run's trades")
+    show.add_argument("root")
+    show.add_argument("key")
+    args = parser.parse_args()
+
+    store = ResultStore(args.root)
+    if args.command == "query":
+        started = time.perf_counter()
+        rows = store.query(*args.conditions)
+        fields = args.fields.split(",")
+        for row in rows:
+            print("\t".join(str(row.get(f, "")) for f in fields))
+        print(f"{len(rows)} runs in {(time.perf_counter() - started) * 1e3:.1f} ms", file=sys.stderr)
+    else:
+        trades = store.load(args.key)
+        names = list(trades)
+        print("\t".join(names))
+        for i in range(len(next(iter(trades.values()))) if trades else 0):
+            print("\t".join(str(trades[n][i]) for n in names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import ast
+import operator
+
+import numpy as np
+
+# Entry rules are written as Python-style boolean expressions over named series, e.g.
+#     "adx > 20 and macd > macd_signal and close > sma and (close > fib_382 or close > fib_500)"
+# Names are whatever the environment provides (indicator values, close, previous_close, fib_236 ...
+# fib_786); numbers, + - * /, comparisons, and/or/not and parentheses are supported.
+# compile_rule() gives a Rule whose mask(arrays) is the whole-array boolean mask (NaN compares False) the
+# vector, sweep and universe engines trade on
+
+COMPARE = {ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Lt: operator.lt, ast.LtE: operator.le,
+           ast.Eq: operator.eq, ast.NotEq: operator.ne}
+ARITH = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+SYMBOLS = {operator.gt: ">", operator.ge: ">=", operator.lt: "<", operator.le: "<=", operator.eq: "==",
+           operator.ne: "!=", operator.add: "+", operator.sub: "-", operator.mul: "*", operator.truediv: "/"}
+
+
+class Ref:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def array(self, env):
+        return env[self.name]
+
+    def names(self):
+        return {self.name}
+
+    def __str__(self):
+        return self.name
+
+
+class Const:
+    __slots__ = ("number",)
+
+    def __init__(self, number):
+        self.number = number
+
+    def array(self, env):
+        return self.number
+
+    def names(self):
+        return set()
+
+    def __str__(self):
+        return repr(self.number)
+
+
+class Arith:
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def array(self, env):
+        return self.op(self.left.array(env), self.right.array(env))
+
+    def names(self):
+        return self.left.names() | self.right.names()
+
+    def __str__(self):
+        return f"({self.left} {SYMBOLS[self.op]} {self.right})"
+
+
+class Compare:
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def mask(self, env):
+        with np.errstate(invalid="ignore"):
+            return np.asarray(self.op(self.left.array(env), self.right.array(env)), dtype=bool)
+
+    def names(self):
+        return self.left.names() | self.right.names()
+
+    def __str__(self):
+        return f"{self.left} {SYMBOLS[self.op]} {self.right}"
+
+
+class Not:
+    __slots__ = ("clause",)
+
+    def __init__(self, clause):
+        self.clause = clause
+
+    def mask(self, env):
+        return ~self.clause.mask(env)
+
+    def names(self):
+        return self.clause.names()
+
+    def __str__(self):
+        return f"not ({self.clause})"
+
+
+class _Junction:
+    __slots__ = ("clauses",)
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+
+    def names(self):
+        return set().union(*(c.names() for c in self.clauses))
+
+    def __str__(self):
+        return "(" + f" {self.word} ".join(map(str, self.clauses)) + ")"
+
+
+class And(_Junction):
+    __slots__ = ()
+    word = "and"
+
+    def mask(self, env):
+        out = self.clauses[0].mask(env).copy()
+        for clause in self.clauses[1:]:
+            out &= clause.mask(env)
+        return out
+
+
+class Or(_Junction):
+    __slots__ = ()
+    word = "or"
+
+    def mask(self, env):
+        out = self.clauses[0].mask(env).copy()
+        for clause in self.clauses[1:]:
+            out |= clause.mask(env)
+        return out
+
+
+class Rule:
+    def __init__(self, text, root):
+        self.text = text
+        self.root = root
+
+    def mask(self, env):
+        return self.root.mask(env)
+
+    def names(self):
+        return self.root.names()
+
+    def __str__(self):
+        return str(self.root)
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+
+class LazyValues:
+    # Environment for masks: values come from zero-argument getters and are computed at most once, only if
+    # a clause reads them (the Fibonacci levels, say, for rules without a fib_* term are never built)
+    __slots__ = ("getters", "values")
+
+    def __init__(self, getters):
+        self.getters = getters
+        self.values = {}
+
+    def __getitem__(self, name):
+        values = self.values
+        if name in values:
+            return values[name]
+        value = values[name] = self.getters[name]()
+        return value
+
+
+def _condition(node):
+    # and/or/not only combine conditions; a bare value (`adx and ...`) has no mask to combine
+    built = _build(node)
+    if isinstance(built, (Ref, Const, Arith)):
+        raise ValueError(f"{ast.unparse(node)!r} is a value, not a condition")
+    return built
+
+
+def _build(node):
+    if isinstance(node, ast.Expression):
+        return _build(node.body)
+    if isinstance(node, ast.BoolOp):
+        return (And if isinstance(node.op, ast.And) else Or)([_condition(v) for v in node.values])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return Not(_condition(node.operand))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return Arith(operator.sub, Const(0.0), _build(node.operand))
+    if isinstance(node, ast.Compare):
+        # a < b < c is (a < b) and (b < c)
+        terms = [_build(node.left)] + [_build(c) for c in node.comparators]
+        parts = [Compare(COMPARE[type(op)], terms[i], terms[i + 1]) for i, op in enumerate(node.ops)]
+        for part in parts:
+            if not part.names():
+                # Would be one bool for the whole series rather than a mask per bar
+                raise ValueError(f"{part} compares constants")
+        return parts[0] if len(parts) == 1 else And(parts)
+    if isinstance(node, ast.BinOp) and type(node.op) in ARITH:
+        return Arith(ARITH[type(node.op)], _build(node.left), _build(node.right))
+    if isinstance(node, ast.Name):
+        return Ref(node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return Const(float(node.value))
+    raise ValueError(f"unsupported syntax in rule: {ast.dump(node)}")
+
+
+def compile_rule(text, names=None):
+    # names: the series the rule may refer to; anything else is rejected here rather than when evaluated
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"cannot parse rule {text!r}: {e.msg}") from None
+    try:
+        root = _condition(tree.body)
+    except ValueError as e:
+        raise ValueError(f"rule {text!r}: {e}") from None
+    if names is not None:
+        unknown = root.names() - set(names)
+        if unknown:
+            raise ValueError(f"rule {text!r} uses unknown names {sorted(unknown)}; available: {sorted(names)}")
+    return Rule(text, root)
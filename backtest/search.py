@@ -0,0 +1,173 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from backtest.data import load_bars
+from backtest.sweep import (add_space_arguments, configs_from_args, init_worker, random_samples, space_from_args,
+                            warm_cache, worker)
+from backtest.vector import PRESETS, VectorResult, entry_signals, equity_curve, first_active_bar, indicators, simulate
+from backtest.walkforward import OBJECTIVES, score
+
+
+def _evaluate_prefix(task):
+    # One config on the sweep window up to `budget` bars past its first active bar: the bars before that
+    # only warm the indicators up, so counting them would leave the short rungs without a single trade.
+    # Indicators and entry masks are causal, so they are computed (or loaded from the workers' caches)
+    # over the whole window and sliced: a config pays for its indicators once, however many rungs it
+    # survives, and only the simulation grows.
+    params, budget = task
+    started = time.perf_counter()
+    bars, cache, signals = worker()
+    ind = indicators(bars, params, cache)
+    long, short = entry_signals(bars, ind, params, signals)
+    stop = min(len(bars), first_active_bar(ind)[1] + budget)
+    window = bars[:stop]
+    ind = {name: values[:stop] for name, values in ind.items()}
+    trades = simulate(window, ind, long[:stop], short[:stop], params)
+    summary = VectorResult(params, window, trades, equity_curve(window, trades, params.cash)).summary()
+    summary["elapsed_s"] = round(time.perf_counter() - started, 4)
+    return params, summary
+
+
+def pruned(summary, objective, max_drawdown=None, min_score=None):
+    # Why a config is dropped at a rung regardless of rank, or None
+    if max_drawdown is not None and summary["max_drawdown"] > max_drawdown:
+        return "max_drawdown"
+    if min_score is not None and score(summary, objective) < min_score:
+        return "min_score"
+    return None
+
+
+class Search:
+    # Successive halving over growing prefixes of the window: every config runs on the shortest slice,
+    # configs that breach the drawdown limit or the score floor are dropped outright, and the best
+    # 1/eta of the rest go on to a slice eta times longer, until the survivors run the full window.
+    # hyperband() repeats that over brackets that trade breadth (many configs, short first slice)
+    # against depth (few configs, long first slice).
+    def __init__(self, pool, total, out, objective="net_return", eta=3, max_drawdown=None, min_score=None):
+        self.pool = pool
+        self.total = total
+        self.out = out
+        self.objective = objective
+        self.eta = eta
+        self.max_drawdown = max_drawdown
+        self.min_score = min_score
+        self.simulated = 0
+        self.evaluated = 0
+        self.configs = set()
+        self.finished = []
+
+    def budgets(self, rungs):
+        # Bars past each config's first active bar per rung; the last one covers the full window
+        return [max(1, round(self.total * self.eta ** (i - rungs + 1))) for i in range(rungs)]
+
+    def halving(self, configs, rungs, bracket=0):
+        alive = list({params.digest(): params for params in configs}.values())
+        self.configs.update(params.digest() for params in alive)
+        for rung, stop in enumerate(self.budgets(rungs)):
+            results = list(self.pool.imap_unordered(_evaluate_prefix, [(p, stop) for p in alive]))
+            scores = [score(summary, self.objective) for _, summary in results]
+            # A rung where every config scores the same (typically: none has traded yet) says nothing about
+            # them, so nothing is dropped on it and every config moves on
+            tied = rung < rungs - 1 and len(set(scores)) == 1
+            ranked = []
+            for (params, summary), value in zip(results, scores):
+                reason = None if tied else pruned(summary, self.objective, self.max_drawdown, self.min_score)
+                self.simulated += summary["bars"]
+                self.evaluated += 1
+                row = {"key": params.digest(), "bracket": bracket, "rung": rung, "bars": summary["bars"],
+                       "pruned": reason, "params": params.as_dict(), "metrics": summary}
+                self.out.write(json.dumps(row) + "\n")
+                if reason is None:
+                    ranked.append((value, params, row))
+            self.out.flush()
+            ranked.sort(key=lambda item: -item[0])
+            print(f"bracket {bracket} rung {rung}: {len(alive)} configs x {stop} active bars, "
+                  f"{len(ranked)} within bounds{', scores tied' if tied else ''}", file=sys.stderr)
+            if rung == rungs - 1:
+                self.finished.extend(row for _, _, row in ranked)
+                break
+            if tied:
+                continue
+            # At least one survivor per rung, so every bracket with a config in bounds reaches the full window
+            alive = [params for _, params, _ in ranked[:max(1, math.ceil(len(ranked) / self.eta))]]
+            if not alive:
+                break
+        return self.finished
+
+    def hyperband(self, sample, max_rungs):
+        # sample(n, bracket) -> n configs. Bracket s starts ceil((s_max+1)/(s+1) * eta^s) configs on a
+        # 1/eta^s slice (Li et al., 2018), so every bracket spends about the same number of bars.
+        s_max = max_rungs - 1
+        for s in range(s_max, -1, -1):
+            n = math.ceil((s_max + 1) / (s + 1) * self.eta ** s)
+            self.halving(sample(n, s_max - s), s + 1, s_max - s)
+        return self.finished
+
+    def summary(self, top=10):
+        best = sorted(self.finished, key=lambda row: -score(row["metrics"], self.objective))[:top]
+        return {
+            "configs": len(self.configs),
+            "evaluations": self.evaluated,
+            "simulated_bars": self.simulated,
+            # What running every config over the full window would have cost
+            "exhaustive_bars": len(self.configs) * self.total,
+            "finished": len(self.finished),
+            "best": [{"key": row["key"], "score": round(score(row["metrics"], self.objective), 6),
+                      "metrics": row["metrics"], "params": row["params"]} for row in best],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.search",
+                                     description="Successive halving / Hyperband over strategy constants")
+    parser.add_argument("--data", required=True, help="bar store directory or CSV")
+    parser.add_argument("--out", required=True, help="JSON-lines log of every (config, rung) evaluation")
+    parser.add_argument("--preset", default="V6", choices=sorted(PRESETS))
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default="2021-01-01", help="inclusive, like set_end_date")
+    parser.add_argument("--objective", default="net_return", choices=OBJECTIVES)
+    parser.add_argument("--eta", type=int, default=3, help="keep 1/eta of the configs per rung")
+    parser.add_argument("--rungs", type=int, default=4, help="slices per bracket; the first is 1/eta^(rungs-1)")
+    parser.add_argument("--max-drawdown", type=float, default=0.5, help="drop configs that exceed this drawdown")
+    parser.add_argument("--min-score", type=float, default=None, help="drop configs scoring below this at any rung")
+    parser.add_argument("--hyperband", action="store_true",
+                        help="run every bracket, each on freshly sampled configs (the bracket sets how many)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None, help="indicator cache directory (default: <out>.cache)")
+    add_space_arguments(parser)
+    args = parser.parse_args()
+
+    base = PRESETS[args.preset]
+    # Hyperband samples the space itself, bracket by bracket
+    space = space_from_args(args, parser, ranges=args.hyperband)
+    configs = None if args.hyperband else configs_from_args(args, parser, base, space)
+    start = datetime.fromisoformat(args.start)
+    end = datetime.fromisoformat(args.end) + timedelta(days=1)
+    cache_dir = args.cache_dir or f"{args.out}.cache"
+
+    def sample(n, bracket):
+        return [base.replace(**c) for c in random_samples(space, n, args.seed + bracket)]
+
+    started = time.perf_counter()
+    total = len(load_bars(args.data).between(start, end))
+    with multiprocessing.Pool(args.workers or os.cpu_count(), init_worker,
+                              (args.data, start, end, cache_dir)) as pool, open(args.out, "w") as out:
+        search = Search(pool, total, out, args.objective, args.eta, args.max_drawdown, args.min_score)
+        if args.hyperband:
+            search.hyperband(sample, args.rungs)
+        else:
+            warm_cache(args.data, configs, start, end, cache_dir)
+            search.halving(configs, args.rungs)
+    print(json.dumps(search.summary(), indent=2))
+    print(f"{search.evaluated} evaluations, {search.simulated} bars simulated in "
+          f"{time.perf_counter() - started:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import io
+import pickle
+import zlib
+
+# Attributes that describe the run rather than the strategy's state; a resumed run keeps its own
+RUN_ATTRIBUTES = ("start_date", "end_date", "is_warming_up", "warm_up_period")
+# Output the run has produced so far; grows with run length and is left out unless asked for
+HISTORY_ATTRIBUTES = ("orders", "charts", "plotter")
+
+
+class _Pickler(pickle.Pickler):
+    # The algorithm is referenced from its own state (PlotBuffer, bound on_* handlers, ...). It is written
+    # as a placeholder and rebound to the algorithm being restored, so the strategy class itself is never
+    # pickled and snapshots survive edits to the V-file that don't change its attributes.
+    def __init__(self, file, algorithm):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.algorithm = algorithm
+
+    def persistent_id(self, obj):
+        return "algorithm" if obj is self.algorithm else None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, algorithm):
+        super().__init__(file)
+        self.algorithm = algorithm
+
+    def persistent_load(self, pid):
+        if pid != "algorithm":
+            raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+        return self.algorithm
+
+
+def _dump(algorithm, state):
+    buffer = io.BytesIO()
+    _Pickler(buffer, algorithm).dump(state)
+    return zlib.compress(buffer.getvalue(), 6)
+
+
+def _load(algorithm, payload):
+    return _Unpickler(io.BytesIO(zlib.decompress(payload)), algorithm).load()
+
+
+class Snapshot:
+    # Indicator and strategy state of an algorithm at `time` (end of the last bar it saw): every indicator,
+    # consolidator, deque/rolling window, the portfolio and the strategy's own fields. Resuming from it
+    # replaces warm-up entirely. The order log, charts and plot buffers are only kept with history=True,
+    # for a resumed run that has to report the whole range (incremental checkpoints); otherwise the resumed
+    # run keeps the empty ones initialize() gave it and the snapshot stays the same size however long the
+    # run before it was.
+    def __init__(self, algorithm, time, payload, history=None):
+        self.algorithm = algorithm
+        self.time = time
+        self.payload = payload
+        self.history = history
+
+    @classmethod
+    def take(cls, algorithm, history=False):
+        state = {k: v for k, v in algorithm.__dict__.items() if k not in HISTORY_ATTRIBUTES}
+        output = {k: v for k, v in algorithm.__dict__.items() if k in HISTORY_ATTRIBUTES} if history else None
+        return cls(type(algorithm).__name__, algorithm.time, _dump(algorithm, state),
+                   _dump(algorithm, output) if history else None)
+
+    def restore(self, algorithm):
+        if type(algorithm).__name__ != self.algorithm:
+            raise ValueError(f"snapshot of {self.algorithm} cannot restore {type(algorithm).__name__}")
+        state = _load(algorithm, self.payload)
+        for name in RUN_ATTRIBUTES:
+            state.pop(name, None)
+        algorithm.__dict__.update(state)
+        if self.history is not None:
+            algorithm.__dict__.update(_load(algorithm, self.history))
+        return algorithm
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump((self.algorithm, self.time, self.payload, self.history), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(*pickle.load(f))
+
+    def __len__(self):
+        return len(self.payload) + len(self.history or b"")
+
+    def __repr__(self):
+        return f"Snapshot({self.algorithm} @ {self.time}, {len(self)} bytes)"
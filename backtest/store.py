@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from backtest.data import Bars, read_csv
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class BarStore:
+    # One contiguous .npy file per field plus an int64 epoch-seconds time index, opened memory-mapped.
+    # Opening costs a few page faults regardless of history length, slicing by date is a binary search
+    # over the time index, and every process reading the same store shares its pages in the OS cache.
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.time = np.load(os.path.join(path, "time.npy"), mmap_mode="r").view("datetime64[s]")
+        self.columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in FIELDS}
+
+    def __len__(self):
+        return len(self.time)
+
+    def bars(self, start=None, end=None):
+        c = self.columns
+        bars = Bars(self.time, c["open"], c["high"], c["low"], c["close"], c["volume"])
+        return bars.between(start, end) if start is not None or end is not None else bars
+
+
+class StoreWriter:
+    # Builds a store from chunks: each append() goes straight to raw per-field files, and close() turns
+    # them into the .npy columns BarStore maps. Memory stays bounded by the chunk size, not the history.
+    COPY_CHUNK = 1 << 20
+
+    def __init__(self, path, symbol=None, period=3600):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.symbol = symbol
+        self.period = period
+        self.count = 0
+        self.first = self.last = None
+        self.meta = None
+        self._parts = {name: open(self._part(name), "wb") for name in ("time",) + FIELDS}
+
+    def _part(self, name):
+        return os.path.join(self.path, f"{name}.npy.part")
+
+    def append(self, time, opens, highs, lows, closes, volumes=None):
+        time = np.asarray(time, dtype="datetime64[s]").astype(np.int64)
+        if not len(time):
+            return
+        if np.any(np.diff(time) <= 0) or (self.last is not None and time[0] <= self.last):
+            raise ValueError("bar times must be strictly increasing")
+        columns = {"open": opens, "high": highs, "low": lows, "close": closes,
+                   "volume": np.zeros(len(time)) if volumes is None else volumes}
+        self._parts["time"].write(time.tobytes())
+        for name in FIELDS:
+            self._parts[name].write(np.ascontiguousarray(columns[name], dtype=np.float64).tobytes())
+        if self.first is None:
+            self.first = int(time[0])
+        self.last = int(time[-1])
+        self.count += len(time)
+
+    def close(self):
+        for name, part in self._parts.items():
+            part.close()
+            dtype = np.int64 if name == "time" else np.float64
+            column = np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype,
+                                               shape=(self.count,))
+            raw = np.memmap(self._part(name), dtype=dtype, mode="r", shape=(self.count,)) if self.count else []
+            for lo in range(0, self.count, self.COPY_CHUNK):
+                column[lo:lo + self.COPY_CHUNK] = raw[lo:lo + self.COPY_CHUNK]
+            column.flush()
+            del column, raw
+            os.remove(self._part(name))
+        self.meta = {
+            "symbol": self.symbol,
+            "period_s": self.period,
+            "count": self.count,
+            "first": str(np.datetime64(self.first, "s")) if self.count else None,
+            "last": str(np.datetime64(self.last, "s")) if self.count else None,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+        return self.meta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def write_store(path, time, opens, highs, lows, closes, volumes=None, symbol=None, period=3600):
+    with StoreWriter(path, symbol, period) as writer:
+        writer.append(time, opens, highs, lows, closes, volumes)
+    return writer.meta
+
+
+def ingest(csv_path, path, symbol=None, period=3600):
+    return write_store(path, *read_csv(csv_path), symbol=symbol, period=period)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.store",
+                                     description="Convert bar history into a memory-mapped columnar store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = commands.add_parser("ingest", help="CSV -> store directory")
+    ingest_cmd.add_argument("csv")
+    ingest_cmd.add_argument("path")
+    ingest_cmd.add_argument("--symbol", default="WTICOUSD")
+    ingest_cmd.add_argument("--period", type=int, default=3600, help="bar length in seconds")
+    info_cmd = commands.add_parser("info", help="print a store's metadata")
+    info_cmd.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        meta = ingest(args.csv, args.path, args.symbol, args.period)
+    else:
+        meta = BarStore(args.path).meta
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from backtest.data import load_bars
+from backtest.cache import IndicatorCache, SignalCache, fingerprint
+from backtest.results import ResultStore, load_results
+from backtest.vector import PRESETS, StrategyParams, backtest, compile_entry_rules, compute_indicator, indicator_keys
+
+# Constants that differ between V3-V6 and are worth sweeping by default
+DEFAULT_SPACE = {
+    "adx_threshold": [20, 25],
+    "tp_atr": [3, 4, 8],
+    "risk_per_trade": [0.015, 0.02, 0.06],
+    "trail_atr": [1.0, 1.2, 1.5],
+    "time_exit": [24, 48],
+}
+
+
+def grid(space):
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_samples(space, n, seed=0):
+    # Lists are sampled uniformly; (low, high) tuples are sampled as uniform ranges, integer if both ends are
+    rng = random.Random(seed)
+    for _ in range(n):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                config[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) \
+                    else rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(values)
+        yield config
+
+
+_bars = None
+_cache = None
+_signals = None
+_store = None
+
+
+def init_worker(data_path, start, end, cache_dir, results_dir=None, strategy=None):
+    # Pool initializer: loads the sweep window and opens the caches once per process
+    global _bars, _cache, _signals, _store
+    _bars = load_bars(data_path).between(start, end)
+    _cache = IndicatorCache(compute_indicator, directory=cache_dir)
+    # Configs that only differ in exit parameters share their entry masks
+    _signals = SignalCache(os.path.join(cache_dir, "signals")) if cache_dir else None
+    if results_dir:
+        _store = ResultStore(results_dir), strategy
+
+
+def worker():
+    # (bars, indicator cache, signal cache) of a process set up by init_worker, for task functions in
+    # other modules that run on the same kind of pool
+    return _bars, _cache, _signals
+
+
+def _evaluate(params):
+    started = time.perf_counter()
+    result = backtest(_bars, params, cache=_cache, signals=_signals)
+    summary = result.summary()
+    summary["elapsed_s"] = round(time.perf_counter() - started, 4)
+    row = {"key": params.digest(), "params": params.as_dict(), "metrics": summary}
+    if _store is not None:
+        # Run files are written here; the parent appends the index rows so there is a single writer
+        store, strategy = _store
+        row["index"] = store.write_vector(strategy, result)
+    return row
+
+
+def warm_cache(data_path, params_list, start, end, cache_dir):
+    # Computes every distinct indicator series the configs need exactly once and spills it to cache_dir,
+    # where the workers pick it up memory-mapped
+    bars = load_bars(data_path).between(start, end)
+    cache = IndicatorCache(compute_indicator, max_bytes=0, directory=cache_dir)
+    for key in {k for params in params_list for k in indicator_keys(params)}:
+        cache.get(bars, *key)
+    return cache
+
+
+def run_sweep(data_path, configs, out_path, base=StrategyParams(), start=None, end=None, workers=None,
+              chunksize=4, cache_dir=None, results_dir=None, strategy="V4"):
+    # Fans configs out over a process pool and appends each result to out_path as soon as it finishes,
+    # so an interrupted sweep resumes where it stopped. configs are StrategyParams or dicts of changes to base.
+    # Rows carry the fingerprint of the bars they ran on; resuming over other data or dates raises ValueError.
+    data = fingerprint(load_bars(data_path).between(start, end))
+    rows = load_results(out_path)
+    if any(r.get("data") != data for r in rows):
+        raise ValueError(f"{out_path} holds results for other data or dates; use a new output file")
+    done = {r["key"] for r in rows}
+    configs = (c if isinstance(c, StrategyParams) else base.replace(**c) for c in configs)
+    pending = [p for p in configs if p.digest() not in done]
+    pending = list({p.digest(): p for p in pending}.values())
+    if not pending:
+        return 0
+
+    cache_dir = cache_dir or f"{out_path}.cache"
+    warm_cache(data_path, pending, start, end, cache_dir)
+    workers = workers or os.cpu_count()
+    store = None
+    if results_dir:
+        store = ResultStore(results_dir)
+    with multiprocessing.Pool(workers, init_worker, (data_path, start, end, cache_dir, results_dir, strategy)) \
+            as pool, open(out_path, "a") as out:
+        for result in pool.imap_unordered(_evaluate, pending, chunksize=chunksize):
+            if store is not None:
+                store.append_index([result.pop("index")])
+            result["data"] = data
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    return len(pending)
+
+
+def _parse_value(name, text):
+    kind = StrategyParams.field_types()[name]
+    if kind is bool:
+        return text.lower() in ("1", "true", "yes")
+    return kind(text)
+
+
+def parse_space(items):
+    # name=v1,v2,... (grid values) or name=low..high (a range for random sampling), typed by the field
+    space = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in StrategyParams.field_types():
+            raise ValueError(f"unknown parameter {name!r}")
+        try:
+            if ".." in values:
+                low, high = (_parse_value(name, v) for v in values.split(".."))
+                space[name] = (low, high)
+            else:
+                space[name] = [_parse_value(name, v) for v in values.split(",")]
+        except ValueError:
+            raise ValueError(f"bad value for {name}: {values!r}") from None
+    return space
+
+
+def add_space_arguments(parser):
+    parser.add_argument("--random", type=int, default=0, help="draw this many random samples instead of the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("space", nargs="*", help="name=v1,v2,... for a grid or name=low..high for random ranges")
+
+
+def space_from_args(args, parser, ranges=False):
+    # The space given on the command line (DEFAULT_SPACE if none); ranges need --random unless the caller
+    # samples the space itself
+    try:
+        space = parse_space(args.space) if args.space else DEFAULT_SPACE
+    except ValueError as e:
+        parser.error(str(e))
+    if not (ranges or args.random) and any(isinstance(v, tuple) for v in space.values()):
+        parser.error("ranges (low..high) need --random")
+    return space
+
+
+def configs_from_args(args, parser, base, space=None):
+    # The StrategyParams to evaluate, from the arguments add_space_arguments() defines: --random samples or
+    # the grid, applied to `base`. Bad parameters, values and entry rules are parser errors here, before
+    # any worker starts.
+    space = space_from_args(args, parser) if space is None else space
+    samples = random_samples(space, args.random, args.seed) if args.random else grid(space)
+    configs = [base.replace(**c) for c in samples]
+    for params in {(p.long_rule, p.short_rule): p for p in configs}.values():
+        try:
+            compile_entry_rules(params)
+        except ValueError as e:
+            parser.error(str(e))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.sweep",
+                                     description="Sweep strategy constants over a process pool")
+    parser.add_argument("--data", required=True, help="bar store directory or CSV")
+    parser.add_argument("--out", required=True, help="JSON-lines result table; existing rows are skipped on resume")
+    parser.add_argument("--preset", default="V4", choices=sorted(PRESETS))
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default="2021-01-01", help="inclusive, like set_end_date")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None, help="indicator cache directory (default: <out>.cache)")
+    parser.add_argument("--results", default=None, metavar="DIR",
+                        help="also store every run's trades and equity in a backtest.results store")
+    add_space_arguments(parser)
+    args = parser.parse_args()
+    configs = configs_from_args(args, parser, PRESETS[args.preset])
+
+    started = time.perf_counter()
+    try:
+        count = run_sweep(args.data, configs, args.out, PRESETS[args.preset], datetime.fromisoformat(args.start),
+                          datetime.fromisoformat(args.end) + timedelta(days=1), args.workers,
+                          cache_dir=args.cache_dir, results_dir=args.results, strategy=args.preset)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{count} configs in {time.perf_counter() - started:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+
+from backtest.store import StoreWriter
+
+YEAR = 365.25 * 86400
+HOUR = 3600
+DAY = 86400
+WEEK = 7 * DAY
+# 1970-01-01 was a Thursday; weekdays here are Monday = 0
+EPOCH_WEEKDAY = 3
+
+
+@dataclass(frozen=True)
+class Model:
+    # Regime-switching GBM with Merton jumps, annualized. Each regime is a (drift, volatility) pair held
+    # for a geometric number of trading bars (mean `duration_days` of calendar time), then replaced by
+    # another regime drawn uniformly. Jumps arrive as a Poisson process and add N(jump_mean, jump_std)
+    # log-returns. Closed-market gaps move the price like the time they span, times gap_vol.
+    drift: tuple = (0.05,)
+    volatility: tuple = (0.30,)
+    duration_days: tuple = (30.0,)
+    jumps_per_year: float = 0.0
+    jump_mean: float = 0.0
+    jump_std: float = 0.0
+    gap_vol: float = 1.0
+    start_price: float = 50.0
+    volume_mean: float = 1000.0
+    # Sub-steps simulated inside each bar; high/low are their extremes, so wicks scale with volatility
+    substeps: int = 8
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+
+MODELS = {
+    "gbm": Model(),
+    "regime": Model(drift=(0.20, 0.0, -0.30), volatility=(0.22, 0.35, 0.75), duration_days=(90.0, 45.0, 15.0)),
+    "jump": Model(drift=(0.05,), volatility=(0.28,), jumps_per_year=12.0, jump_mean=-0.01, jump_std=0.04),
+    "regime-jump": Model(drift=(0.20, 0.0, -0.30), volatility=(0.22, 0.35, 0.75), duration_days=(90.0, 45.0, 15.0),
+                         jumps_per_year=12.0, jump_mean=-0.01, jump_std=0.04),
+}
+
+
+@dataclass(frozen=True)
+class Session:
+    # Trading hours in UTC hours-of-week: open from `open_weekday` at `open_hour` until `close_weekday` at
+    # `close_hour`, minus a daily break [break_start, break_end). The default is a CFD/energy-futures week:
+    # Sunday 22:00 to Friday 21:00 with an hour's maintenance break every evening.
+    open_weekday: int = 6
+    open_hour: float = 22
+    close_weekday: int = 4
+    close_hour: float = 21
+    break_start: float = 21
+    break_end: float = 22
+    always: bool = False
+
+    def mask(self, seconds):
+        # Bars whose start falls inside trading hours; seconds are epoch seconds (int64)
+        if self.always:
+            return np.ones(len(seconds), dtype=bool)
+        hour_of_week = ((seconds // DAY + EPOCH_WEEKDAY) % 7) * 24 + (seconds % DAY) / HOUR
+        opens = self.open_weekday * 24 + self.open_hour
+        closes = self.close_weekday * 24 + self.close_hour
+        if opens > closes:
+            trading = (hour_of_week >= opens) | (hour_of_week < closes)
+        else:
+            trading = (hour_of_week >= opens) & (hour_of_week < closes)
+        if self.break_end > self.break_start:
+            hour = (seconds % DAY) / HOUR
+            trading &= (hour < self.break_start) | (hour >= self.break_end)
+        return trading
+
+
+SESSIONS = {"cfd": Session(), "continuous": Session(always=True),
+            "weekdays": Session(open_weekday=0, open_hour=0, close_weekday=5, close_hour=0, break_start=0, break_end=0)}
+
+
+class Generator:
+    # Produces one symbol's bars chunk by chunk. Everything that crosses a chunk boundary (RNG stream,
+    # last close, regime and its remaining length, clock) lives on the instance, so memory is bounded by
+    # the chunk size and a history of any length costs the same per bar. Same seed, model, session and
+    # chunk size give the same bars.
+    def __init__(self, model, session, start, period=HOUR, seed=0):
+        self.model = model
+        self.session = session
+        self.period = period
+        self.rng = np.random.default_rng(seed)
+        self.clock = int(np.datetime64(start, "s").astype(np.int64))
+        self.clock -= self.clock % period
+        self.previous = None
+        self.log_close = np.log(model.start_price)
+        self.regime = int(self.rng.integers(len(model.drift)))
+        self.remaining = self._duration(self.regime)
+
+    def _duration(self, regime):
+        # Regime length in bars, geometric with the configured calendar-time mean
+        mean = max(self.model.duration_days[regime] * DAY / self.period, 1.0)
+        return int(self.rng.geometric(1.0 / mean))
+
+    def _regimes(self, n):
+        regimes = np.empty(n, dtype=np.intp)
+        count = len(self.model.drift)
+        filled = 0
+        while filled < n:
+            take = min(self.remaining, n - filled)
+            regimes[filled:filled + take] = self.regime
+            filled += take
+            self.remaining -= take
+            if self.remaining == 0:
+                if count > 1:
+                    self.regime = (self.regime + 1 + int(self.rng.integers(count - 1))) % count
+                self.remaining = self._duration(self.regime)
+        return regimes
+
+    def _times(self, n):
+        # The next n in-session bar starts; a candidate span a little wider than needed is masked at a time
+        times = []
+        found = 0
+        while found < n:
+            span = max(2 * (n - found), int(WEEK // self.period))
+            candidates = self.clock + self.period * np.arange(span, dtype=np.int64)
+            kept = candidates[self.session.mask(candidates)][:n - found]
+            times.append(kept)
+            found += len(kept)
+            self.clock = int(kept[-1]) + self.period if found == n else int(candidates[-1]) + self.period
+        return np.concatenate(times)
+
+    def chunk(self, n):
+        model, rng, dt = self.model, self.rng, self.period / YEAR
+        seconds = self._times(n)
+        regimes = self._regimes(n)
+        drift = np.asarray(model.drift)[regimes]
+        vol = np.asarray(model.volatility)[regimes]
+        step_mu = (drift - 0.5 * vol * vol) * dt
+        step_sigma = vol * np.sqrt(dt)
+
+        # Bars skipped since the previous bar (weekends, breaks) become an opening gap
+        previous = np.concatenate(([self.previous if self.previous is not None else seconds[0] - self.period],
+                                   seconds[:-1]))
+        skipped = (seconds - previous) / self.period - 1
+        gap = step_mu * skipped + step_sigma * model.gap_vol * np.sqrt(skipped) * rng.standard_normal(n)
+
+        k = model.substeps
+        steps = rng.standard_normal((n, k))
+        steps *= (step_sigma / np.sqrt(k))[:, None]
+        steps += (step_mu / k)[:, None]
+        if model.jumps_per_year:
+            arrivals = rng.poisson(model.jumps_per_year * dt, n)
+            hit = np.flatnonzero(arrivals)
+            if len(hit):
+                size = model.jump_mean * arrivals[hit] + model.jump_std * np.sqrt(arrivals[hit]) * \
+                    rng.standard_normal(len(hit))
+                steps[hit, rng.integers(k, size=len(hit))] += size
+        np.cumsum(steps, axis=1, out=steps)
+
+        log_close = self.log_close + np.cumsum(gap + steps[:, -1])
+        log_open = log_close - steps[:, -1]
+        steps += log_open[:, None]
+        steps[:, -1] = log_close
+        highs = np.exp(np.maximum(log_open, steps.max(axis=1)))
+        lows = np.exp(np.minimum(log_open, steps.min(axis=1)))
+        del steps
+        volumes = np.round(rng.lognormal(np.log(model.volume_mean), 0.5, n) * (1 + 20 * step_sigma))
+
+        self.log_close = float(log_close[-1])
+        self.previous = int(seconds[-1])
+        return seconds.view("datetime64[s]"), np.exp(log_open), highs, lows, np.exp(log_close), volumes
+
+
+def generate(path, bars, start="2000-01-03", period=HOUR, model=MODELS["regime"], session=SESSIONS["cfd"], seed=0,
+             chunk=250000, symbol=None):
+    # Writes `bars` bars straight into a BarStore directory, `chunk` bars at a time
+    generator = Generator(model, session, start, period, seed)
+    with StoreWriter(path, symbol, period) as writer:
+        written = 0
+        while written < bars:
+            n = min(chunk, bars - written)
+            writer.append(*generator.chunk(n))
+            written += n
+    return writer.meta
+
+
+def _generate_symbol(job):
+    return generate(**job)
+
+
+def generate_universe(root, symbols, bars, start="2000-01-03", period=HOUR, model=MODELS["regime"],
+                      session=SESSIONS["cfd"], seed=0, chunk=250000, processes=None):
+    # One store per symbol under root/<symbol>/, seeds spawned from `seed` so each symbol is independent
+    # and reproducible on its own; symbols are generated in parallel
+    from multiprocessing import Pool
+
+    names = [f"SYN{i:03d}" for i in range(symbols)]
+    seeds = np.random.SeedSequence(seed).spawn(symbols)
+    jobs = [dict(path=os.path.join(root, name), bars=bars, start=start, period=period, model=model, session=session,
+                 seed=seed_, chunk=chunk, symbol=name) for name, seed_ in zip(names, seeds)]
+    if symbols == 1:
+        return [_generate_symbol(jobs[0])]
+    with Pool(processes) as pool:
+        return pool.map(_generate_symbol, jobs, chunksize=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.synthetic",
+                                     description="Generate seeded synthetic OHLC bars into bar store directories")
+    parser.add_argument("path", help="store directory (with --symbols, a directory of stores)")
+    parser.add_argument("--bars", type=int, default=1000000, help="bars per symbol")
+    parser.add_argument("--start", default="2000-01-03")
+    parser.add_argument("--period", type=int, default=HOUR, help="bar length in seconds, e.g. 60 for minutes")
+    parser.add_argument("--model", default="regime", choices=sorted(MODELS))
+    parser.add_argument("--session", default="cfd", choices=sorted(SESSIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--symbols", type=int, default=0, help="generate this many independent symbols")
+    parser.add_argument("--symbol", default="SYNTHETIC", help="symbol name for a single store")
+    parser.add_argument("--chunk", type=int, default=250000, help="bars held in memory at once")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model, session = MODELS[args.model], SESSIONS[args.session]
+    start = datetime.fromisoformat(args.start)
+    if args.symbols:
+        metas = generate_universe(args.path, args.symbols, args.bars, start, args.period, model, session, args.seed,
+                                  args.chunk, args.processes)
+    else:
+        metas = [generate(args.path, args.bars, start, args.period, model, session, args.seed, args.chunk,
+                          args.symbol)]
+    elapsed = time.perf_counter() - started
+    print(json.dumps(metas[0] if len(metas) == 1 else {"symbols": len(metas), "first": metas[0]}, indent=2))
+    print(f"{sum(m['count'] for m in metas)} bars in {elapsed:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
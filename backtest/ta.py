@@ -0,0 +1,181 @@
+import numpy as np
+
+# Whole-array versions of the LEAN indicators in backtest.indicators. Every function returns float64
+# arrays aligned with its input, NaN wherever the streaming indicator would not yet be ready.
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+def _first_valid(x):
+    valid = np.flatnonzero(~np.isnan(x))
+    return valid[0] if len(valid) else len(x)
+
+
+def _smoothed(x, period, wilder):
+    # EMA / Wilder average seeded with the SMA of the first `period` valid samples
+    out = _nan(len(x))
+    start = _first_valid(x)
+    if len(x) - start < period:
+        return out
+    values = x[start:].tolist()
+    result = [0.0] * len(values)
+    alpha = 1.0 / period if wilder else 2.0 / (period + 1)
+    total = 0.0
+    for i in range(period):
+        total += values[i]
+    prev = total / period
+    result[period - 1] = prev
+    for i in range(period, len(values)):
+        prev = prev + alpha * (values[i] - prev)
+        result[i] = prev
+    out[start + period - 1:] = result[period - 1:]
+    return out
+
+
+def sma(x, period, partial=False):
+    # Running sum, accumulated in the same order as the streaming SMA so both agree to the last bit.
+    # partial=True also fills the warm-up bars with the running mean, which is what `previous`
+    # reports on the first ready bar
+    out = _nan(len(x))
+    start = _first_valid(x)
+    values = x[start:].tolist()
+    result = []
+    total = 0.0
+    for i, value in enumerate(values):
+        if i >= period:
+            total -= values[i - period]
+        total += value
+        result.append(total / min(i + 1, period))
+    out[start:] = result
+    if not partial:
+        out[start:start + period - 1] = np.nan
+    return out
+
+
+def ema(x, period):
+    return _smoothed(x, period, wilder=False)
+
+
+def wilder(x, period):
+    return _smoothed(x, period, wilder=True)
+
+
+def macd(close, fast_period, slow_period, signal_period):
+    line = ema(close, fast_period) - ema(close, slow_period)
+    signal = ema(line, signal_period)
+    line[np.isnan(signal)] = np.nan
+    return line, signal, line - signal
+
+
+def true_range(high, low, close):
+    tr = high - low
+    if len(tr) > 1:
+        prev = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return tr
+
+
+def atr(high, low, close, period):
+    return wilder(true_range(high, low, close), period)
+
+
+def rsi(close, period):
+    out = _nan(len(close))
+    if len(close) <= period:
+        return out
+    change = np.diff(close)
+    gain = wilder(np.maximum(change, 0.0), period)
+    loss = wilder(np.maximum(-change, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    out[1:] = np.where(np.isnan(gain), np.nan, value)
+    return out
+
+
+def adx(high, low, close, period):
+    n = len(close)
+    out = _nan(n)
+    if n < 2 * period:
+        return out
+    tr = true_range(high, low, close)[1:]
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    dm_plus = np.where((up > down) & (up > 0), up, 0.0)
+    dm_minus = np.where((down > up) & (down > 0), down, 0.0)
+
+    # Wilder running sums (S - S/n + x), seeded with the plain sum of the first `period` values
+    sums = [_running_sum(series.tolist(), period) for series in (tr, dm_plus, dm_minus)]
+    s_tr, s_plus, s_minus = (np.asarray(s) for s in sums)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_plus = np.where(s_tr != 0, 100.0 * s_plus / s_tr, 0.0)
+        di_minus = np.where(s_tr != 0, 100.0 * s_minus / s_tr, 0.0)
+        di_sum = di_plus + di_minus
+        dx = np.where(di_sum != 0, 100.0 * np.abs(di_plus - di_minus) / di_sum, 0.0)
+    out[period:] = wilder(dx, period)
+    return out
+
+
+def _running_sum(values, period):
+    total = 0.0
+    for i in range(period):
+        total += values[i]
+    result = [total]
+    for x in values[period:]:
+        total = total - total / period + x
+        result.append(total)
+    return result
+
+
+def rolling_max(x, window, start=0):
+    # Max over the last `window` values, never looking back past index `start`. Van Herk/Gil-Werman:
+    # block-wise prefix and suffix maxima make the cost O(n) whatever the window length.
+    out = _nan(len(x))
+    n = len(x) - start
+    if n <= 0:
+        return out
+    padded = np.concatenate((np.full(window - 1, -np.inf), x[start:]))
+    blocks = -(-len(padded) // window)
+    padded = np.concatenate((padded, np.full(blocks * window - len(padded), -np.inf))).reshape(blocks, window)
+    prefix = np.maximum.accumulate(padded, axis=1).ravel()
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    ends = np.arange(window - 1, window - 1 + n)
+    out[start:] = np.maximum(suffix[ends - window + 1], prefix[ends])
+    return out
+
+
+def rolling_min(x, window, start=0):
+    return -rolling_max(-np.asarray(x), window, start)
+
+
+def day_index(times, day_start=None):
+    # Ordinal of the trading day each bar belongs to, counted from the first bar. day_start moves the
+    # day boundary off midnight, matching consolidators.SessionCalendar
+    if day_start is not None:
+        times = times - np.timedelta64(day_start)
+    days = times.astype("datetime64[D]")
+    return np.concatenate(([0], np.cumsum(days[1:] != days[:-1])))
+
+
+def daily_bars(times, open, high, low, close, day_start=None):
+    # Trading-day OHLC bars rolled up from an intraday series
+    days = day_index(times, day_start)
+    starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+    ends = np.append(starts[1:], len(close)) - 1
+    return (
+        days,
+        open[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+    )
+
+
+def as_of_previous_day(daily_values, days, lag=1):
+    # Align a daily series with the intraday bars: a day's value is only visible once the day has closed
+    idx = days - lag
+    out = _nan(len(days))
+    ok = idx >= 0
+    out[ok] = daily_values[idx[ok]]
+    return out
@@ -0,0 +1,196 @@
+import argparse
+import json
+import time as _time
+from datetime import timedelta
+
+import numpy as np
+
+from backtest.data import load_bars
+from backtest.vector import (
+    PRESETS, TAG_SL, TAG_TIME, TAG_TP, StrategyParams, Trades, entry_signals, indicators,
+)
+
+# Columns of the per-symbol state matrix
+QUANTITY, ENTRY_PRICE, STOP, TARGET, ENTRY_BAR, SIDE = range(6)
+FIELDS = ("quantity", "entry_price", "stop", "target", "entry_bar", "side")
+
+
+class Universe:
+    # Several symbols on one time grid (the union of their bar times) as time x symbol matrices.
+    # Indicators and entry masks are computed per symbol on that symbol's own bars, so a gap in one
+    # market never leaks into another's indicators; slots where a symbol has no bar are NaN/False.
+    def __init__(self, bars_by_symbol, params=StrategyParams(), cache=None):
+        self.symbols = list(bars_by_symbol)
+        self.params = params
+        self.time = np.unique(np.concatenate([bars.time for bars in bars_by_symbol.values()]))
+        shape = (len(self.time), len(self.symbols))
+        self.present = np.zeros(shape, dtype=bool)
+        self.close, self.atr, self.adx, self.rsi = (np.full(shape, np.nan) for _ in range(4))
+        self.long, self.short = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+        # The symbol's own bar number, which time exits count in (V6's bar_count)
+        self.bar = np.zeros(shape, dtype=np.int64)
+
+        for s, bars in enumerate(bars_by_symbol.values()):
+            rows = np.searchsorted(self.time, bars.time)
+            ind = indicators(bars, params, cache)
+            long, short = entry_signals(bars, ind, params)
+            self.present[rows, s] = True
+            self.close[rows, s] = bars.close
+            self.atr[rows, s] = ind["atr"]
+            self.adx[rows, s] = ind["adx"]
+            self.rsi[rows, s] = ind["rsi"]
+            self.long[rows, s] = long
+            self.short[rows, s] = short
+            self.bar[rows, s] = np.arange(len(bars))
+
+        # Last known close per symbol, for marking open positions on slices where it did not trade
+        mark = self.close.copy()
+        filled = np.where(self.present, np.arange(shape[0])[:, None], 0)
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        self.mark = np.take_along_axis(mark, filled, axis=0)
+        self.mark[np.isnan(self.mark)] = 0.0
+
+    def __len__(self):
+        return len(self.time)
+
+
+class UniverseResult:
+    def __init__(self, universe, trades, equity, elapsed):
+        self.universe = universe
+        self.trades = trades
+        self.equity = equity
+        self.elapsed = elapsed
+
+    def summary(self):
+        equity = self.equity
+        peak = np.maximum.accumulate(equity)
+        cash = self.universe.params.cash
+        return {
+            "symbols": len(self.universe.symbols),
+            "slices": len(self.universe),
+            "trades": {symbol: len(trades) for symbol, trades in self.trades.items()},
+            "end_equity": round(float(equity[-1]), 2) if len(equity) else cash,
+            "net_return": round(float(equity[-1] / cash - 1), 6) if len(equity) else 0.0,
+            "max_drawdown": round(float(np.max((peak - equity) / peak)), 6) if len(equity) else 0.0,
+            "elapsed_s": round(self.elapsed, 4),
+        }
+
+
+def simulate(universe, params=None):
+    # One shared portfolio stepped slice by slice. Every step is a handful of array operations over
+    # all symbols (exits for held symbols, then entries for the ones that were flat going into the
+    # slice), so the cost per slice barely moves with the number of symbols.
+    p = params or universe.params
+    u = universe
+    n, m = len(u.time), len(u.symbols)
+    state = np.zeros((m, len(FIELDS)))
+    cash = p.cash
+    equity = np.empty(n)
+    records = [[] for _ in range(m)]
+    any_signal = (u.long | u.short).any(axis=1)
+    held = 0
+
+    started = _time.perf_counter()
+    for t in range(n):
+        if not held and not any_signal[t]:
+            equity[t] = cash
+            continue
+        present = u.present[t]
+        close = u.close[t]
+        quantity = state[:, QUANTITY]
+        flat = (quantity == 0) & present
+
+        if held:
+            open_ = (quantity != 0) & present
+            side = state[:, SIDE]
+            atr = u.atr[t]
+            timed_out = open_ & (u.bar[t] - state[:, ENTRY_BAR] >= p.time_exit)
+            live = open_ & ~timed_out
+            stop = state[:, STOP]
+            entry_price = state[:, ENTRY_PRICE]
+            if p.trail_profit_scaled:
+                profit = np.abs(close - entry_price)
+                breakeven = entry_price + side * atr * 0.5
+                stop = np.where((profit >= atr) & (side * (breakeven - stop) > 0), breakeven, stop)
+                trail = np.maximum(1.0, 2.0 - profit / entry_price)
+            else:
+                trail = p.trail_atr
+            stop = np.where(side > 0, np.fmax(stop, close - atr * trail), np.fmin(stop, close + atr * trail))
+            state[live, STOP] = stop[live]
+            target = state[:, TARGET]
+            rsi = u.rsi[t]
+            take = live & (((side > 0) & ((close >= target) | (rsi < p.rsi_exit_long)))
+                           | ((side < 0) & ((close <= target) | (rsi > p.rsi_exit_short))))
+            stopped = live & ~take & (((side > 0) & (close <= stop)) | ((side < 0) & (close >= stop)))
+
+            for tag, mask in ((TAG_TIME, timed_out), (TAG_TP, take), (TAG_SL, stopped)):
+                for s in np.flatnonzero(mask):
+                    q = quantity[s]
+                    cash += q * close[s]
+                    records[s].append((int(state[s, ENTRY_BAR]), u.bar[t, s], q, state[s, ENTRY_PRICE], close[s], tag))
+                    state[s, QUANTITY] = 0.0
+                    held -= 1
+
+        if any_signal[t]:
+            side = np.where(u.long[t], 1.0, -1.0)
+            enter = flat & (u.long[t] | u.short[t])
+            if enter.any():
+                # All of a slice's entries are sized off the same portfolio value, as LEAN would see it
+                # before any of the slice's orders fill
+                value = cash + state[:, QUANTITY] @ u.mark[t]
+                atr = u.atr[t]
+                size = side * np.round(value * p.risk_per_trade / (atr * p.sizing_atr))
+                enter &= size != 0
+                tp_multiple = np.minimum(5, np.maximum(3, u.adx[t] / 10)) if p.tp_adx_scaled else p.tp_atr
+                rows = np.flatnonzero(enter)
+                state[rows, QUANTITY] = size[rows]
+                state[rows, ENTRY_PRICE] = close[rows]
+                state[rows, STOP] = (close - side * atr * p.stop_atr)[rows]
+                state[rows, TARGET] = (close + side * atr * tp_multiple)[rows]
+                state[rows, ENTRY_BAR] = u.bar[t, rows]
+                state[rows, SIDE] = side[rows]
+                cash -= float(size[rows] @ close[rows])
+                held += len(rows)
+
+        equity[t] = cash + state[:, QUANTITY] @ u.mark[t] if held else cash
+    elapsed = _time.perf_counter() - started
+
+    # Positions still open at the end are marked to the symbol's last close, like vector.simulate
+    last = u.bar.max(axis=0)
+    trades = {}
+    for s, symbol in enumerate(u.symbols):
+        if state[s, QUANTITY]:
+            records[s].append((int(state[s, ENTRY_BAR]), last[s], state[s, QUANTITY], state[s, ENTRY_PRICE],
+                               u.mark[-1, s], "Open"))
+        columns = list(zip(*records[s])) or [[]] * 6
+        trades[symbol] = Trades(*columns)
+    return UniverseResult(u, trades, equity, elapsed)
+
+
+def backtest(bars_by_symbol, params=StrategyParams(), cache=None):
+    return simulate(Universe(bars_by_symbol, params, cache), params)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.universe",
+                                     description="Run the V*-rules over several symbols with one shared portfolio")
+    parser.add_argument("--data", action="append", required=True, metavar="SYMBOL=PATH",
+                        help="bar store or CSV per symbol, repeatable")
+    parser.add_argument("--preset", default="V6", choices=sorted(PRESETS))
+    parser.add_argument("--start", help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", help="last day (inclusive), YYYY-MM-DD")
+    args = parser.parse_args()
+
+    universe = {}
+    for item in args.data:
+        symbol, _, path = item.partition("=")
+        if not path:
+            parser.error(f"--data expects SYMBOL=PATH, got {item!r}")
+        bars = load_bars(path)
+        end = np.datetime64(args.end) + np.timedelta64(timedelta(days=1)) if args.end else None
+        universe[symbol] = bars.between(np.datetime64(args.start) if args.start else None, end)
+    print(json.dumps(backtest(universe, PRESETS[args.preset]).summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, fields, replace
+
+import numpy as np
+
+from backtest import ta
+from backtest.data import Bars
+from backtest.metrics import OnlineMetrics
+from backtest.rules import LazyValues, compile_rule
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    # The constants V3-V6 hard-code; defaults are V4
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    sma_period: int = 30
+    adx_period: int = 30
+    atr_period: int = 30
+    rsi_period: int = 14
+    daily_sma_period: int = 30
+    fib_window: int = 100
+
+    adx_threshold: float = 25
+    rsi_long: float = 50
+    rsi_short: float = 50
+    momentum_atr: float = 0.0  # V3: close must clear the previous close by this many ATRs, 0 disables
+    fib_filter: bool = True
+    daily_close_filter: bool = True
+    daily_macd_filter: bool = True
+    daily_slope_short_strict: bool = False  # V6 shorts need a falling daily SMA, V3-V5 a non-rising one
+
+    risk_per_trade: float = 0.02
+    sizing_atr: float = 1.5
+    stop_atr: float = 2.0
+    tp_atr: float = 3.0
+    tp_adx_scaled: bool = False  # V3: TP multiple is min(5, max(3, adx / 10))
+    trail_atr: float = 1.5
+    trail_profit_scaled: bool = False  # V3: trail max(1, 2 - profit ratio) ATRs, breakeven + 0.5 ATR after 1 ATR
+    rsi_exit_long: float = 0.0  # V3 takes profit on longs once RSI < 70, 0 disables
+    rsi_exit_short: float = 100.0  # ... and on shorts once RSI > 30, 100 disables
+    time_exit: int = 48
+    cash: float = 100000.0
+    # Entry rules in the backtest.rules syntax; empty means the rule entry_rules() derives from the fields above
+    long_rule: str = ""
+    short_rule: str = ""
+
+    def __post_init__(self):
+        # Hold every field as its declared type, so 20 and 20.0 (presets vs parsed CLI values) are one config
+        for name, kind in self.field_types().items():
+            value = getattr(self, name)
+            if type(value) is not kind:
+                object.__setattr__(self, name, kind(value))
+
+    def as_dict(self):
+        return asdict(self)
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+    def digest(self):
+        # Stable identity of a configuration, used to key sweep results and caches
+        # Unset rule overrides are left out so configs hash as they did before the fields existed
+        fields_ = {k: v for k, v in self.as_dict().items() if not (k in ("long_rule", "short_rule") and not v)}
+        return hashlib.sha1(json.dumps(fields_, sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def field_types(cls):
+        return {f.name: f.type for f in fields(cls)}
+
+
+PRESETS = {
+    "V3": StrategyParams(momentum_atr=0.5, risk_per_trade=0.02, stop_atr=1.5, tp_adx_scaled=True,
+                         trail_profit_scaled=True, rsi_exit_long=70, rsi_exit_short=30, time_exit=24),
+    "V4": StrategyParams(),
+    "V5": StrategyParams(adx_threshold=20, risk_per_trade=0.015, sizing_atr=1.2, tp_atr=4, trail_atr=1.2),
+    "V6": StrategyParams(sma_period=20, adx_period=14, atr_period=14, daily_sma_period=50, adx_threshold=20,
+                         rsi_long=55, rsi_short=45, fib_filter=False, daily_close_filter=False,
+                         daily_macd_filter=False, daily_slope_short_strict=True, risk_per_trade=0.06,
+                         sizing_atr=1.2, stop_atr=2.0, tp_atr=8, trail_atr=1.0, time_exit=24),
+}
+
+TAG_LONG, TAG_SHORT, TAG_TP, TAG_SL, TAG_TIME = "Long Entry", "Short Entry", "Take Profit", "Stop Loss", "Time Exit"
+EXIT_TAGS = (TAG_TP, TAG_SL, TAG_TIME)
+
+
+HOUR, DAILY = "HOUR", "DAILY"
+
+
+def compute_indicator(bars, name, args, resolution):
+    # One indicator series as a 2D array (one row per output), aligned with the hourly bars.
+    # Daily series are built from the hourly stream and only become visible once their day has closed.
+    if resolution == DAILY:
+        days, _, _, _, close = ta.daily_bars(bars.time, bars.open, bars.high, bars.low, bars.close)
+        if name == "sma":
+            # current and previous, where previous is the running mean while the SMA is still warming up
+            return np.vstack((ta.as_of_previous_day(ta.sma(close, *args), days),
+                              ta.as_of_previous_day(ta.sma(close, *args, partial=True), days, lag=2)))
+        if name == "macd":
+            line, signal, _ = ta.macd(close, *args)
+            return np.vstack((ta.as_of_previous_day(line, days), ta.as_of_previous_day(signal, days)))
+    elif name == "macd":
+        return np.vstack(ta.macd(bars.close, *args)[:2])
+    elif name in ("sma", "rsi"):
+        return getattr(ta, name)(bars.close, *args)[None]
+    elif name in ("adx", "atr"):
+        return getattr(ta, name)(bars.high, bars.low, bars.close, *args)[None]
+    raise ValueError(f"unknown indicator {name} at {resolution}")
+
+
+def indicators(bars, params, cache=None):
+    p = params
+    get = cache.get if cache is not None else compute_indicator
+    macd = get(bars, "macd", (p.macd_fast, p.macd_slow, p.macd_signal), HOUR)
+    daily_sma = get(bars, "sma", (p.daily_sma_period,), DAILY)
+    daily_macd = get(bars, "macd", (p.macd_fast, p.macd_slow, p.macd_signal), DAILY)
+    return {
+        "macd": macd[0],
+        "macd_signal": macd[1],
+        "sma": get(bars, "sma", (p.sma_period,), HOUR)[0],
+        "adx": get(bars, "adx", (p.adx_period,), HOUR)[0],
+        "atr": get(bars, "atr", (p.atr_period,), HOUR)[0],
+        "rsi": get(bars, "rsi", (p.rsi_period,), HOUR)[0],
+        "daily_sma": daily_sma[0],
+        "daily_sma_previous": daily_sma[1],
+        "daily_macd": daily_macd[0],
+        "daily_macd_signal": daily_macd[1],
+    }
+
+
+def indicator_keys(params):
+    # The (name, args, resolution) series a config reads, for warming a shared cache up front
+    p = params
+    macd = (p.macd_fast, p.macd_slow, p.macd_signal)
+    return [("macd", macd, HOUR), ("sma", (p.daily_sma_period,), DAILY), ("macd", macd, DAILY),
+            ("sma", (p.sma_period,), HOUR), ("adx", (p.adx_period,), HOUR), ("atr", (p.atr_period,), HOUR),
+            ("rsi", (p.rsi_period,), HOUR)]
+
+
+def first_active_bar(ind):
+    # on_data only starts appending to the price deques once every indicator is ready, and only
+    # evaluates entries once five closes have been collected
+    ready = np.ones(len(ind["macd"]), dtype=bool)
+    for name in ("macd", "sma", "adx", "atr", "rsi", "daily_sma", "daily_macd"):
+        ready &= ~np.isnan(ind[name])
+    ready_idx = np.flatnonzero(ready)
+    if not len(ready_idx):
+        return len(ready), len(ready)
+    return ready_idx[0], ready_idx[0] + 4
+
+
+def fibonacci_levels(bars, ind, params, ready):
+    recent_high = ta.rolling_max(bars.high, params.fib_window, ready)
+    recent_low = ta.rolling_min(bars.low, params.fib_window, ready)
+    price_range = recent_high - recent_low
+    trend_up = ind["daily_sma"] > ind["daily_sma_previous"]
+    return {level: np.where(trend_up, recent_low + price_range * level, recent_high - price_range * level)
+            for level in (0.236, 0.382, 0.5, 0.618, 0.786)}
+
+
+def entry_rules(params):
+    # The V3-V6 entry conditions as rule text (see backtest.rules), unless the params override them
+    p = params
+
+    def n(x):
+        # repr round-trips the float exactly, so the rule compares against the same threshold
+        return repr(float(x))
+
+    long = [f"adx > {n(p.adx_threshold)}", "macd > macd_signal", "close > sma", f"rsi > {n(p.rsi_long)}",
+            "daily_sma > daily_sma_previous"]
+    short = [f"adx > {n(p.adx_threshold)}", "macd < macd_signal", "close < sma", f"rsi < {n(p.rsi_short)}",
+             "daily_sma < daily_sma_previous" if p.daily_slope_short_strict else "not daily_sma > daily_sma_previous"]
+    if p.daily_close_filter:
+        long.append("close > daily_sma")
+        short.append("close < daily_sma")
+    if p.daily_macd_filter:
+        long.append("daily_macd > daily_macd_signal")
+        short.append("daily_macd < daily_macd_signal")
+    if p.momentum_atr:
+        long.append(f"close > previous_close + atr * {n(p.momentum_atr)}")
+        short.append(f"close < previous_close - atr * {n(p.momentum_atr)}")
+    if p.fib_filter:
+        long.append("(close > fib_382 or close > fib_500)")
+        short.append("(close < fib_618 or close < fib_786)")
+    return p.long_rule or " and ".join(long), p.short_rule or " and ".join(short)
+
+
+FIB_NAMES = {"fib_236": 0.236, "fib_382": 0.382, "fib_500": 0.5, "fib_618": 0.618, "fib_786": 0.786}
+# Every series rule_arrays() provides
+RULE_NAMES = frozenset(("macd", "macd_signal", "sma", "adx", "atr", "rsi", "daily_sma", "daily_sma_previous",
+                        "daily_macd", "daily_macd_signal", "close", "previous_close", *FIB_NAMES))
+
+
+def rule_arrays(bars, ind, params, ready, signals=None):
+    # Everything a rule can name, as arrays; the Fibonacci levels are only computed if a rule reads them
+    close = bars.close
+    getters = {name: (lambda v=values: v) for name, values in ind.items()}
+    getters["close"] = lambda: close
+    getters["previous_close"] = lambda: np.concatenate(([np.nan], close[:-1]))
+    levels = {}
+
+    def compute():
+        return {str(k): v for k, v in fibonacci_levels(bars, ind, params, ready).items()}
+
+    def fib(level):
+        if not levels:
+            found = signals.get(bars, "fib", fib_spec(params), compute) if signals is not None else compute()
+            levels.update({float(k): v for k, v in found.items()})
+        return levels[level]
+
+    for name, level in FIB_NAMES.items():
+        getters[name] = lambda level=level: fib(level)
+    return LazyValues(getters)
+
+
+def fib_spec(params):
+    # What the Fibonacci levels depend on: the swing window and every indicator (through first_active_bar)
+    return {"indicators": indicator_keys(params), "fib_window": params.fib_window}
+
+
+def signal_spec(params):
+    # What the entry masks depend on; exit-only parameters (stops, targets, trailing, time exit) are absent
+    return {"rules": entry_rules(params), **fib_spec(params)}
+
+
+def compile_entry_rules(params):
+    # (long, short) Rules; raises ValueError for a rule that is malformed or names a series that doesn't exist
+    return tuple(compile_rule(text, RULE_NAMES) for text in entry_rules(params))
+
+
+def entry_signals(bars, ind, params, signals=None):
+    # signals: a cache.SignalCache, so configs that only differ in exit logic reuse the masks. Callers
+    # may modify the returned arrays, so cached masks are handed out as copies.
+    rules = compile_entry_rules(params)
+    if signals is not None:
+        found = signals.get(bars, "entries", signal_spec(params),
+                            lambda: dict(zip(("long", "short"), _entry_masks(bars, ind, params, rules, signals))))
+        return found["long"].copy(), found["short"].copy()
+    return _entry_masks(bars, ind, params, rules)
+
+
+def _entry_masks(bars, ind, params, rules, signals=None):
+    ready, active = first_active_bar(ind)
+    env = rule_arrays(bars, ind, params, ready, signals)
+    long = rules[0].mask(env)
+    short = rules[1].mask(env)
+    long[:active] = False
+    short[:active] = False
+    return long, short
+
+
+class Trades:
+    def __init__(self, entry_index, exit_index, quantity, entry_price, exit_price, exit_tag):
+        self.entry_index = np.asarray(entry_index, dtype=np.int64)
+        self.exit_index = np.asarray(exit_index, dtype=np.int64)
+        self.quantity = np.asarray(quantity, dtype=np.float64)
+        self.entry_price = np.asarray(entry_price, dtype=np.float64)
+        self.exit_price = np.asarray(exit_price, dtype=np.float64)
+        self.exit_tag = list(exit_tag)
+
+    def __len__(self):
+        return len(self.entry_index)
+
+    @property
+    def pnl(self):
+        return self.quantity * (self.exit_price - self.entry_price)
+
+
+def simulate(bars, ind, long, short, params, intrabar=None):
+    # The path-dependent part of on_data: position, trailing stop, time exit and TP/SL, one bar at a time
+    # while in a position, jumping straight to the next entry signal while flat. With an IntrabarIndex the
+    # stop and target set at the previous close are also checked against the minute bars inside each
+    # hour, filling at the level on the first minute that reaches it instead of at the hourly close.
+    p = params
+    close = bars.close.tolist()
+    high, low = (bars.high.tolist(), bars.low.tolist()) if intrabar is not None else (None, None)
+    atr = ind["atr"].tolist()
+    adx = ind["adx"].tolist()
+    rsi = ind["rsi"].tolist()
+    n = len(close)
+    candidates = np.flatnonzero(long | short)
+    is_long = long.tolist()
+
+    cash = p.cash
+    entries, exits, quantities, entry_prices, exit_prices, tags = [], [], [], [], [], []
+    i = 0
+    while True:
+        k = np.searchsorted(candidates, i)
+        if k == len(candidates):
+            break
+        i = int(candidates[k])
+        price = close[i]
+        atr_value = atr[i]
+        side = 1 if is_long[i] else -1
+        quantity = side * round(cash * p.risk_per_trade / (atr_value * p.sizing_atr))
+        tp_multiple = min(5, max(3, adx[i] / 10)) if p.tp_adx_scaled else p.tp_atr
+        stop = price - side * atr_value * p.stop_atr
+        target = price + side * atr_value * tp_multiple
+        if quantity == 0:
+            i += 1
+            continue
+
+        entry = i
+        cash -= quantity * price
+        tag = None
+        for j in range(entry + 1, n):
+            c = close[j]
+            a = atr[j]
+            touch = None
+            if intrabar is not None and ((side > 0 and (low[j] <= stop or high[j] >= target))
+                                         or (side < 0 and (high[j] >= stop or low[j] <= target))):
+                touch = intrabar.first_touch(j, side, stop, target)
+            if touch is not None:
+                is_stop, c, _ = touch
+                tag = TAG_SL if is_stop else TAG_TP
+            elif j - entry >= p.time_exit:
+                tag = TAG_TIME
+            else:
+                if p.trail_profit_scaled:
+                    profit = abs(c - price)
+                    if profit >= a:
+                        breakeven = price + side * a * 0.5
+                        if side * (breakeven - stop) > 0:
+                            stop = breakeven
+                    trail = max(1.0, 2.0 - profit / price)
+                else:
+                    trail = p.trail_atr
+                stop = max(stop, c - a * trail) if side > 0 else min(stop, c + a * trail)
+                if (side > 0 and (c >= target or rsi[j] < p.rsi_exit_long)) or \
+                        (side < 0 and (c <= target or rsi[j] > p.rsi_exit_short)):
+                    tag = TAG_TP
+                elif (side > 0 and c <= stop) or (side < 0 and c >= stop):
+                    tag = TAG_SL
+            if tag:
+                cash += quantity * c
+                exits.append(j)
+                exit_prices.append(c)
+                break
+        else:
+            # Still open at the end of the data: mark to the last close
+            exits.append(n - 1)
+            exit_prices.append(close[-1])
+            cash += quantity * close[-1]
+        entries.append(entry)
+        quantities.append(quantity)
+        entry_prices.append(price)
+        tags.append(tag or "Open")
+        i = exits[-1] + 1
+
+    return Trades(entries, exits, quantities, entry_prices, exit_prices, tags)
+
+
+def equity_curve(bars, trades, cash):
+    # Mark-to-market equity per bar from the trade list, without another per-bar loop
+    n = len(bars)
+    position = np.zeros(n + 1)
+    cash_flow = np.zeros(n + 1)
+    np.add.at(position, trades.entry_index, trades.quantity)
+    # Positions still open at the end of the data stay held and are marked to market
+    closed = np.array([t != "Open" for t in trades.exit_tag], dtype=bool)
+    np.add.at(position, trades.exit_index[closed], -trades.quantity[closed])
+    np.add.at(cash_flow, trades.entry_index, -trades.quantity * trades.entry_price)
+    np.add.at(cash_flow, trades.exit_index[closed], trades.quantity[closed] * trades.exit_price[closed])
+    held = np.cumsum(position)[:n]
+    return cash + np.cumsum(cash_flow)[:n] + held * bars.close
+
+
+class VectorResult:
+    def __init__(self, params, bars, trades, equity):
+        self.params = params
+        self.bars = bars
+        self.trades = trades
+        self.equity = equity
+
+    def metrics(self):
+        # The same accumulator the bar-by-bar engine feeds, folded over the arrays; trades still open at
+        # the end of the data are left out of the trade statistics, as they have no exit yet
+        metrics = OnlineMetrics()
+        metrics.update_many(self.equity, self.bars.time)
+        trades = self.trades
+        closed = np.array([tag in EXIT_TAGS for tag in trades.exit_tag], dtype=bool)
+        metrics.trades_many(trades.pnl[closed], (trades.exit_index - trades.entry_index)[closed],
+                            [tag for tag, c in zip(trades.exit_tag, closed) if c])
+        return metrics
+
+    def summary(self):
+        # Trade statistics count closed trades only, like the bar-by-bar engine's; a trade still open at the
+        # end has placed its entry order and nothing else
+        equity = self.equity
+        stats = self.metrics().summary()
+        still_open = sum(tag not in EXIT_TAGS for tag in self.trades.exit_tag)
+        return {
+            "bars": len(self.bars),
+            "trades": stats["trades"],
+            "orders": 2 * len(self.trades) - still_open,
+            "end_equity": round(float(equity[-1]), 2) if len(equity) else self.params.cash,
+            "net_return": round(float(equity[-1] / self.params.cash - 1), 6) if len(equity) else 0.0,
+            **{name: stats[name] for name in ("max_drawdown", "win_rate", "sharpe", "sortino", "profit_factor",
+                                              "avg_holding_bars", "exits")},
+        }
+
+
+def backtest(bars, params=StrategyParams(), ind=None, cache=None, intrabar=None, signals=None):
+    ind = indicators(bars, params, cache) if ind is None else ind
+    long, short = entry_signals(bars, ind, params, signals)
+    trades = simulate(bars, ind, long, short, params, intrabar)
+    return VectorResult(params, bars, trades, equity_curve(bars, trades, params.cash))
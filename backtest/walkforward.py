@@ -0,0 +1,164 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backtest.cache import IndicatorCache
+from backtest.data import load_bars
+from backtest.sweep import add_space_arguments, configs_from_args
+from backtest.vector import (
+    PRESETS, StrategyParams, VectorResult, backtest, compute_indicator, entry_signals, equity_curve, indicators,
+    simulate,
+)
+
+OBJECTIVES = ("net_return", "calmar", "win_rate", "sharpe", "sortino")
+
+
+def folds(start, end, in_sample, out_of_sample, step=None, anchored=False):
+    # Rolling (start, split, stop) windows: optimize on [start, split), trade [split, stop). The next fold
+    # moves on by `step` (default: one out-of-sample span, so the OOS windows tile the timeline).
+    # anchored=True keeps every in-sample window starting at `start`.
+    step = step or out_of_sample
+    result = []
+    split = start + in_sample
+    while split < end:
+        stop = min(split + out_of_sample, end)
+        result.append((start if anchored else split - in_sample, split, stop))
+        split += step
+    return result
+
+
+def score(summary, objective):
+    if objective == "calmar":
+        return summary["net_return"] / max(summary["max_drawdown"], 1e-9)
+    return summary[objective]
+
+
+_bars = None
+
+
+def _init_worker(data_path):
+    global _bars
+    _bars = load_bars(data_path)
+
+
+def _run_fold(task):
+    index, (start, split, stop), configs, objective = task
+    started = time.perf_counter()
+    window = _bars.between(start, stop)
+    cut = window.index(split)
+    # Indicators are computed once over the whole fold and are causal, so the in-sample runs read a
+    # prefix of the same arrays and the out-of-sample run starts with them already warm: the in-sample
+    # history is the OOS warm-up
+    cache = IndicatorCache(compute_indicator)
+    best, best_score, best_summary = None, float("-inf"), None
+    for params in configs:
+        ind = indicators(window, params, cache)
+        summary = backtest(window[:cut], params, {k: v[:cut] for k, v in ind.items()}).summary()
+        value = score(summary, objective)
+        if value > best_score:
+            best, best_score, best_summary = params, value, summary
+
+    ind = indicators(window, best, cache)
+    long, short = entry_signals(window, ind, best)
+    long[:cut] = False
+    short[:cut] = False
+    trades = simulate(window, ind, long, short, best)
+    equity = equity_curve(window, trades, best.cash)[cut:]
+    oos = VectorResult(best, window[cut:], trades, equity).summary()
+    return {
+        "fold": index,
+        "in_sample": [start.isoformat(), split.isoformat()],
+        "out_of_sample": [split.isoformat(), stop.isoformat()],
+        "params": best.as_dict(),
+        "in_sample_metrics": best_summary,
+        "out_of_sample_metrics": oos,
+        "configs": len(configs),
+        "elapsed_s": round(time.perf_counter() - started, 4),
+        "_equity": (window.time[cut:], equity / best.cash),
+    }
+
+
+def stitch(results, cash):
+    # Chains the folds' OOS curves, each scaled to start where the previous one ended
+    times, equity, level = [], [], cash
+    for result in results:
+        fold_times, growth = result.pop("_equity")
+        times.append(fold_times)
+        equity.append(level * growth)
+        if len(growth):
+            level = equity[-1][-1]
+    if not times:
+        return np.array([], dtype="datetime64[s]"), np.array([])
+    return np.concatenate(times), np.concatenate(equity)
+
+
+def walk_forward(data_path, configs, windows, objective="net_return", workers=None):
+    # Folds run concurrently, one per process; each searches all configs on its in-sample window
+    configs = list({p.digest(): p for p in configs}.values())
+    tasks = [(i, window, configs, objective) for i, window in enumerate(windows)]
+    workers = min(workers or os.cpu_count(), len(tasks)) or 1
+    with multiprocessing.Pool(workers, _init_worker, (data_path,)) as pool:
+        results = sorted(pool.imap_unordered(_run_fold, tasks), key=lambda r: r["fold"])
+    cash = configs[0].cash if configs else StrategyParams.cash
+    times, equity = stitch(results, cash)
+    return results, times, equity
+
+
+def summarize(results, equity, cash):
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    return {
+        "folds": len(results),
+        "end_equity": round(float(equity[-1]), 2) if len(equity) else cash,
+        "net_return": round(float(equity[-1] / cash - 1), 6) if len(equity) else 0.0,
+        "max_drawdown": round(float(np.max((peak - equity) / peak)), 6) if len(equity) else 0.0,
+        "fold_returns": [r["out_of_sample_metrics"]["net_return"] for r in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backtest.walkforward",
+                                     description="Rolling in-sample optimization, out-of-sample evaluation")
+    parser.add_argument("--data", required=True, help="bar store directory or CSV")
+    parser.add_argument("--out", required=True, help="JSON report with per-fold picks and the stitched OOS curve")
+    parser.add_argument("--preset", default="V4", choices=sorted(PRESETS))
+    parser.add_argument("--start", default="2019-01-01")
+    parser.add_argument("--end", default="2021-01-01", help="inclusive, like set_end_date")
+    parser.add_argument("--in-sample", type=int, default=180, metavar="DAYS")
+    parser.add_argument("--out-of-sample", type=int, default=60, metavar="DAYS")
+    parser.add_argument("--step", type=int, default=None, metavar="DAYS", help="default: --out-of-sample")
+    parser.add_argument("--anchored", action="store_true", help="grow the in-sample window from --start")
+    parser.add_argument("--objective", default="net_return", choices=OBJECTIVES)
+    parser.add_argument("--workers", type=int, default=None)
+    add_space_arguments(parser)
+    args = parser.parse_args()
+    base = PRESETS[args.preset]
+    configs = configs_from_args(args, parser, base)
+
+    windows = folds(datetime.fromisoformat(args.start), datetime.fromisoformat(args.end) + timedelta(days=1),
+                    timedelta(days=args.in_sample), timedelta(days=args.out_of_sample),
+                    timedelta(days=args.step) if args.step else None, args.anchored)
+    if not windows:
+        parser.error("the date range is shorter than one in-sample window")
+
+    started = time.perf_counter()
+    results, times, equity = walk_forward(args.data, configs, windows, args.objective, args.workers)
+    report = {
+        "summary": summarize(results, equity, base.cash),
+        "folds": results,
+        "equity": {"time": times.astype(str).tolist(), "value": equity.round(2).tolist()},
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f)
+    print(json.dumps(report["summary"], indent=2))
+    print(f"{len(windows)} folds x {len(configs)} configs in {time.perf_counter() - started:.1f}s -> {args.out}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from AlgorithmImports import OrderStatus
+
+
+class Bracket:
+    # Market entry plus a protective stop and an optional take-profit that cancel each other, built only
+    # from calls LEAN has (market_order, stop_market_order, limit_order, ticket.cancel/update_stop_price),
+    # so a strategy using it runs unchanged on QuantConnect. Forward on_order_event to it, and call trail()
+    # from on_data to ratchet the stop, e.g. by a multiple of ATR: bracket.trail(close, 1.0 * atr.current.value)
+    def __init__(self, algorithm, symbol, stop_tag="Stop Loss", take_profit_tag="Take Profit"):
+        self.algorithm = algorithm
+        self.symbol = symbol
+        self.stop_tag = stop_tag
+        self.take_profit_tag = take_profit_tag
+        self.stop = None
+        self.take_profit = None
+        self.stop_price = None
+        self.quantity = 0
+
+    @property
+    def is_open(self):
+        return self.stop is not None
+
+    def open(self, quantity, stop_price, take_profit_price=None, tag=""):
+        # Returns the entry order, or None while warming up (LEAN rejects orders then)
+        algorithm = self.algorithm
+        if algorithm.is_warming_up or quantity == 0:
+            return None
+        entry = algorithm.market_order(self.symbol, quantity, tag=tag)
+        self.quantity = quantity
+        self.stop_price = stop_price
+        self.stop = algorithm.stop_market_order(self.symbol, -quantity, stop_price, tag=self.stop_tag)
+        if take_profit_price is not None:
+            self.take_profit = algorithm.limit_order(self.symbol, -quantity, take_profit_price,
+                                                     tag=self.take_profit_tag)
+        return entry
+
+    def trail(self, close, amount):
+        # Moves the stop to `amount` from the close when that tightens it; never loosens it
+        if self.stop is None:
+            return
+        if self.quantity > 0:
+            level = close - amount
+            if level <= self.stop_price:
+                return
+        else:
+            level = close + amount
+            if level >= self.stop_price:
+                return
+        self.stop_price = level
+        self.stop.update_stop_price(level)
+
+    def on_order_event(self, order_event):
+        # One-cancels-other: a filled leg cancels its sibling
+        if order_event.status != OrderStatus.FILLED or self.stop is None:
+            return
+        if order_event.order_id == self.stop.order_id:
+            other = self.take_profit
+        elif self.take_profit is not None and order_event.order_id == self.take_profit.order_id:
+            other = self.stop
+        else:
+            return
+        if other is not None:
+            other.cancel()
+        self._clear()
+
+    def close(self, tag=""):
+        # Cancels the resting legs and flattens the position at market
+        for ticket in (self.stop, self.take_profit):
+            if ticket is not None:
+                ticket.cancel()
+        self._clear()
+        quantity = self.algorithm.portfolio[self.symbol].quantity
+        if quantity:
+            return self.algorithm.market_order(self.symbol, -quantity, tag=tag)
+        return None
+
+    def _clear(self):
+        self.stop = self.take_profit = None
+        self.stop_price = None
+        self.quantity = 0
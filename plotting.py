@@ -0,0 +1,81 @@
+def lttb(times, values, threshold):
+    # Largest-Triangle-Three-Buckets: keeps `threshold` points that preserve the visual shape of the line
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n)) if threshold >= n else [0, n - 1][:threshold]
+
+    keep = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        # Average of the next bucket is the third vertex of the triangle
+        span = next_end - end
+        avg_t = sum(times[end:next_end]) / span
+        avg_v = sum(values[end:next_end]) / span
+
+        ta, va = times[a], values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ta - avg_t) * (values[j] - va) - (ta - times[j]) * (avg_v - va))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def _series_of(chart):
+    series = chart.series
+    return list(series.values()) if hasattr(series, "values") else [s.value for s in series]
+
+
+class PlotBuffer:
+    # Stand-in for self.plot/self.add_chart. Line series registered through add_chart are buffered and
+    # decimated with LTTB to a per-chart point budget when flush() runs (call it from
+    # on_end_of_algorithm). Scatter series such as the Long/Short/TP/SL trade markers, and anything not
+    # registered, are plotted straight through at full fidelity.
+    def __init__(self, algorithm, budget=4000):
+        self.algorithm = algorithm
+        self.budget = budget
+        self._charts = {}
+        self._buffers = {}
+        self._direct = set()
+
+    def add_chart(self, chart):
+        self.algorithm.add_chart(chart)
+        self._charts[chart.name] = chart
+
+    def _line_series(self, chart, series):
+        target = self._charts.get(chart)
+        for s in _series_of(target) if target is not None else ():
+            if s.name == series and not str(s.series_type).upper().endswith("SCATTER"):
+                return s
+        return None
+
+    def plot(self, chart, series, value):
+        key = (chart, series)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if key in self._direct or self._line_series(chart, series) is None:
+                self._direct.add(key)
+                self.algorithm.plot(chart, series, value)
+                return
+            buffer = self._buffers[key] = ([], [])
+        buffer[0].append(self.algorithm.time)
+        buffer[1].append(float(value))
+
+    def flush(self):
+        lines_per_chart = {}
+        for chart, _ in self._buffers:
+            lines_per_chart[chart] = lines_per_chart.get(chart, 0) + 1
+
+        for (chart, series), (times, values) in self._buffers.items():
+            target = self._line_series(chart, series)
+            stamps = [t.timestamp() for t in times]
+            for i in lttb(stamps, values, max(3, self.budget // lines_per_chart[chart])):
+                target.add_point(times[i], values[i])
+        self._buffers.clear()
@@ -0,0 +1,184 @@
+import functools
+import json
+import os
+import time
+
+
+class Histogram:
+    # HDR-style log-linear histogram of nanosecond timings: exact below 2**bits, above that each power of
+    # two is split into 2**(bits-1) buckets, so every value is kept to within ~2**-(bits-1) (3% at bits=6)
+    # in a small sparse dict however many samples are recorded
+    __slots__ = ("bits", "half", "counts", "count", "total", "max")
+
+    def __init__(self, bits=6):
+        self.bits = bits
+        self.half = 1 << (bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        shift = value.bit_length() - self.bits
+        index = value if shift <= 0 else shift * self.half + (value >> shift)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def _lowest(self, index):
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return (index - shift * self.half) << shift
+
+    def percentile(self, q):
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._lowest(index), self.max)
+        return self.max
+
+
+class _Null:
+    # What sections become when profiling is off: one shared object, nothing recorded
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _Null()
+
+
+class _Section:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._push(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._pop()
+        return False
+
+
+class Profiler:
+    # Attributes time to named, nestable sections:
+    #     with PROFILER.section("fibonacci"): ...
+    #     @PROFILER.profiled("entries")
+    # Disabled (the default unless PROFILE=1 is set), section() hands back a shared no-op and profiled()
+    # returns the function untouched, so instrumented strategies run at full speed. Enabled, every section
+    # feeds a Histogram and self time is collected per call stack for flame graphs (write_collapsed).
+    def __init__(self, enabled=False, clock=time.perf_counter_ns):
+        self.enabled = enabled
+        self.clock = clock
+        self.histograms = {}
+        self.stacks = {}
+        self._sections = {}
+        self._names = []
+        self._starts = []
+        self._children = []
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def profiled(self, name=None):
+        # Decorator; decided when the function is defined, so enable before importing the strategy
+        def decorate(fn):
+            if not self.enabled:
+                return fn
+            section = self.section(name or fn.__name__)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with section:
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def wrap(self, fn, name):
+        return self.profiled(name)(fn)
+
+    def _push(self, name):
+        self._names.append(name)
+        self._children.append(0)
+        self._starts.append(self.clock())
+
+    def _pop(self):
+        elapsed = self.clock() - self._starts.pop()
+        own = elapsed - self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        stack = ";".join(self._names)
+        name = self._names.pop()
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(elapsed)
+        self.stacks[stack] = self.stacks.get(stack, 0) + own
+
+    def instrument(self, obj, names, prefix=""):
+        # Profiles existing bound methods (strategy helpers, plotter.plot, market_order, ...) without editing
+        # their source, by shadowing them on the instance
+        for name in names:
+            method = getattr(obj, name, None)
+            if callable(method):
+                setattr(obj, name, self.wrap(method, prefix + name))
+
+    def report(self):
+        total = sum(self.stacks.values()) or 1
+        own = {}
+        for stack, ns in self.stacks.items():
+            name = stack.rsplit(";", 1)[-1]
+            own[name] = own.get(name, 0) + ns
+        return {
+            name: {
+                "calls": h.count,
+                "total_ms": round(h.total / 1e6, 3),
+                "self_share": round(own.get(name, 0) / total, 4),
+                "mean_ns": round(h.total / h.count, 1) if h.count else 0.0,
+                "p50_ns": h.percentile(50),
+                "p90_ns": h.percentile(90),
+                "p99_ns": h.percentile(99),
+                "max_ns": h.max,
+            }
+            for name, h in sorted(self.histograms.items(), key=lambda item: -item[1].total)
+        }
+
+    def write_collapsed(self, path):
+        # Brendan Gregg's folded format ("a;b;c <weight>"), weights in ns of self time; feed it to
+        # flamegraph.pl or speedscope
+        with open(path, "w") as f:
+            for stack, ns in sorted(self.stacks.items()):
+                f.write(f"{stack} {ns}\n")
+
+    def write_report(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def reset(self):
+        self.histograms.clear()
+        self.stacks.clear()
+
+
+PROFILER = Profiler(enabled=os.environ.get("PROFILE", "") not in ("", "0"))
+section = PROFILER.section
+profiled = PROFILER.profiled
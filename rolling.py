@@ -0,0 +1,52 @@
+from collections import deque
+
+
+class RollingMax:
+    # Maximum of the last `size` values with amortized O(1) append and O(1) query (monotonic deque).
+    # Drop-in for the deque(maxlen=size) + max() pattern: append() the same way, read .value.
+    __slots__ = ("size", "_index", "_values", "_count")
+
+    def __init__(self, size):
+        self.size = size
+        self._index = deque()
+        self._values = deque()
+        self._count = 0
+
+    def append(self, value):
+        values = self._values
+        while values and values[-1] <= value:
+            values.pop()
+            self._index.pop()
+        values.append(value)
+        self._index.append(self._count)
+        self._count += 1
+        if self._index[0] <= self._count - 1 - self.size:
+            self._index.popleft()
+            values.popleft()
+
+    @property
+    def value(self):
+        return self._values[0]
+
+    @property
+    def is_ready(self):
+        return self._count >= self.size
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    def reset(self):
+        self._index.clear()
+        self._values.clear()
+        self._count = 0
+
+
+class RollingMin(RollingMax):
+    __slots__ = ()
+
+    def append(self, value):
+        super().append(-value)
+
+    @property
+    def value(self):
+        return -self._values[0]
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+
+from backtest.data import Bars
+from backtest.synthetic import MODELS, SESSIONS, Generator, generate
+
+# Sep 2019 - Feb 2021 of CFD-hours bars, covering the V-files' 2020 window plus warm-up
+SYNTHETIC = dict(model=MODELS["regime-jump"], session=SESSIONS["cfd"], start=datetime(2019, 9, 2), seed=1)
+SYNTHETIC_BARS = 12000
+
+
+@pytest.fixture(scope="session")
+def bars():
+    return Bars(*Generator(**SYNTHETIC).chunk(SYNTHETIC_BARS))
+
+
+@pytest.fixture(scope="session")
+def store(tmp_path_factory):
+    # The same bars as a bar store directory, for the tools that load their data by path
+    path = tmp_path_factory.mktemp("data") / "store"
+    generate(path, SYNTHETIC_BARS, **SYNTHETIC)
+    return str(path)
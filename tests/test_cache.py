@@ -0,0 +1,70 @@
+import os
+import time
+
+import numpy as np
+
+from backtest.cache import IndicatorCache, SignalCache
+from backtest.vector import HOUR, compute_indicator
+
+
+def counting(compute):
+    calls = []
+
+    def wrapped(*args):
+        calls.append(args[1:])
+        return compute(*args)
+    return wrapped, calls
+
+
+def test_indicator_cache_evicts_least_recently_used_and_reloads_from_disk(bars, tmp_path):
+    window = bars[:2000]
+    compute, calls = counting(compute_indicator)
+    # Room for two one-row series in memory
+    cache = IndicatorCache(compute, max_bytes=2 * 2000 * 8, directory=tmp_path)
+    sma10 = cache.get(window, "sma", (10,), HOUR)
+    cache.get(window, "sma", (20,), HOUR)
+    cache.get(window, "sma", (10,), HOUR)
+    cache.get(window, "sma", (30,), HOUR)
+    # sma 20 was the least recently used, so it went first
+    assert len(cache) == 2 and cache.hits == 1 and cache.misses == 3
+
+    again = cache.get(window, "sma", (20,), HOUR)
+    assert cache.disk_hits == 1 and len(calls) == 3
+    np.testing.assert_array_equal(again, compute_indicator(window, "sma", (20,), HOUR))
+    # Another process (a fresh cache over the same directory) loads rather than recomputes
+    other = IndicatorCache(compute, directory=tmp_path)
+    np.testing.assert_array_equal(other.get(window, "sma", (10,), HOUR), sma10)
+    assert other.disk_hits == 1 and len(calls) == 3
+    # Other bars are another key
+    cache.get(bars[:1000], "sma", (10,), HOUR)
+    assert len(calls) == 4
+
+
+def test_signal_cache_evicts_oldest_files_and_recomputes(bars, tmp_path):
+    computed = []
+
+    def compute(n):
+        # File times order the eviction; keep them apart on coarse filesystem clocks
+        time.sleep(0.02)
+
+        def run():
+            computed.append(n)
+            return {"mask": np.arange(10000) % n == 0}
+        return run
+
+    cache = SignalCache(tmp_path, max_bytes=25000, memory_items=1)
+    first = cache.get(bars, "entries", {"n": 2}, compute(2))
+    assert cache.get(bars, "entries", {"n": 2}, compute(2)) is first and cache.hits == 1
+    cache.get(bars, "entries", {"n": 3}, compute(3))
+    # Out of memory (one item), still on disk
+    np.testing.assert_array_equal(cache.get(bars, "entries", {"n": 2}, compute(2))["mask"], first["mask"])
+    assert cache.disk_hits == 1 and computed == [2, 3]
+
+    # Each entry is ~10 KB; the third passes the 25 KB budget and the oldest file goes
+    cache.get(bars, "entries", {"n": 5}, compute(5))
+    cache.get(bars, "entries", {"n": 7}, compute(7))
+    files = [name for name in os.listdir(tmp_path) if name.endswith(".npz")]
+    assert sum(os.path.getsize(tmp_path / name) for name in files) <= 25000
+    assert len(files) < 4
+    cache.get(bars, "entries", {"n": 3}, compute(3))
+    assert computed == [2, 3, 5, 7, 3]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from backtest.consolidators import DAY, WEEK, SessionCalendar, TradeBarConsolidator
+from backtest.lean import QCAlgorithm, Resolution, Symbol, TradeBar
+
+NEW_YORK_CFD = SessionCalendar(day_start=timedelta(hours=17))
+SYMBOL = Symbol("WTICOUSD")
+
+
+def hourly(start, closes):
+    return [TradeBar(start + timedelta(hours=i), SYMBOL, c, c + 1, c - 1, c, 10) for i, c in enumerate(closes)]
+
+
+def consolidate(period, calendar, bars):
+    consolidator = TradeBarConsolidator(period, calendar)
+    out = []
+    consolidator.data_consolidated += out.append
+    for bar in bars:
+        consolidator.update(bar)
+    return out
+
+
+def test_daily_bars_cut_at_the_session_rollover():
+    # Sunday 17:00 through Tuesday 18:00: the Monday session, then the Tuesday one
+    bars = hourly(datetime(2020, 1, 5, 17), range(50))
+    days = consolidate(DAY, NEW_YORK_CFD, bars)
+    assert [(d.time, d.end_time) for d in days] == [(datetime(2020, 1, 5, 17), datetime(2020, 1, 6, 17)),
+                                                   (datetime(2020, 1, 6, 17), datetime(2020, 1, 7, 17))]
+    monday = days[0]
+    assert (monday.open, monday.high, monday.low, monday.close, monday.volume) == (0, 24, -1, 23, 240)
+    assert NEW_YORK_CFD.session_date(monday.time) == datetime(2020, 1, 6).date()
+    # Midnight days cut the same hours differently
+    assert [d.time for d in consolidate(DAY, SessionCalendar(), bars)] == [datetime(2020, 1, 5), datetime(2020, 1, 6)]
+
+
+def test_intraday_and_weekly_buckets_follow_the_session():
+    bars = hourly(datetime(2020, 1, 5, 17), range(24 * 8))
+    four_hours = consolidate(timedelta(hours=4), NEW_YORK_CFD, bars)
+    assert [b.time.hour for b in four_hours[:6]] == [17, 21, 1, 5, 9, 13]
+    # The Sunday-evening open belongs to Monday's week
+    weeks = consolidate(WEEK, NEW_YORK_CFD, bars)
+    assert [(w.time, w.close) for w in weeks] == [(datetime(2020, 1, 5, 17), 167)]
+
+
+def test_daily_indicators_only_see_closed_sessions():
+    algorithm = QCAlgorithm()
+    algorithm.session_calendar = NEW_YORK_CFD
+    symbol = algorithm.add_cfd("WTICOUSD").symbol
+    sma = algorithm.sma(symbol, 2, Resolution.DAILY)
+    closes = []
+    for bar in hourly(datetime(2020, 1, 5, 17), range(24 * 3)):
+        for handler in algorithm._bar_handlers[symbol]:
+            handler(bar)
+        closes.append(sma.current.value if sma.is_ready else None)
+    # Ready once the second session closes (the first bar of the third arrives), on those two closes
+    assert closes[48] == (23 + 47) / 2
+    assert closes[47] is None
@@ -0,0 +1,24 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from backtest.data import parse_time
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1577836800", datetime(2020, 1, 1)),
+    ("20200101", datetime(2020, 1, 1)),
+    ("20200101 13:00", datetime(2020, 1, 1, 13)),
+    ("2020-01-01 13:00:00", datetime(2020, 1, 1, 13)),
+    ("2020-01-01T13:00:00", datetime(2020, 1, 1, 13)),
+])
+def test_parse_time(monkeypatch, text, expected):
+    # Epoch seconds are UTC whatever the machine's time zone
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        assert parse_time(text) == expected
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,30 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backtest import host
+from backtest.engine import load_algorithm, run
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def fills(orders):
+    return [(o.time, o.quantity, o.fill_price, o.tag) for o in orders]
+
+
+@pytest.mark.parametrize("names, start, end", [
+    (["V2", "V5"], None, None),
+    # V1 warms up 1000 bars, the others not at all
+    (["V1", "V3", "V5", "V6"], datetime(2020, 1, 1), datetime(2021, 1, 1)),
+])
+def test_hosted_runs_match_separate_runs(bars, names, start, end):
+    classes = [load_algorithm(ROOT / f"{name}.py") for name in names]
+    hosted = host.run(classes, bars, start, end)
+    assert hosted.shared.requested > len(hosted.shared.indicators)
+    for cls, result in zip(classes, hosted.results):
+        separate = run(cls, bars, start, end)
+        assert fills(result.orders) == fills(separate.orders)
+        assert result.equity == separate.equity
+        assert result.equity_times == separate.equity_times
+    assert any(result.orders for result in hosted.results)
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backtest import ta
+from backtest.indicators import (AverageDirectionalIndex, AverageTrueRange, BollingerBands, ExponentialMovingAverage,
+                                 MovingAverageConvergenceDivergence, RelativeStrengthIndex, SimpleMovingAverage,
+                                 WildersMovingAverage)
+from backtest.lean import Symbol, TradeBar
+
+N = 600
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(7)
+    close = 50 + np.cumsum(rng.normal(0, 0.3, N))
+    high = close + rng.random(N) * 0.5
+    low = close - rng.random(N) * 0.5
+    return high, low, close
+
+
+def stream(indicator, values, output=None):
+    # Values the indicator reports after each update, NaN until it is ready
+    output = output or (lambda ind: ind.current.value)
+    out = []
+    for value in values:
+        indicator.update(None, value)
+        out.append(output(indicator) if indicator.is_ready else np.nan)
+    return np.array(out)
+
+
+def stream_bars(indicator, high, low, close):
+    out = []
+    start = datetime(2020, 1, 1)
+    for i, (h, l, c) in enumerate(zip(high, low, close)):
+        indicator.update(TradeBar(start + timedelta(hours=i), Symbol("X"), c, h, l, c))
+        out.append(indicator.current.value if indicator.is_ready else np.nan)
+    return np.array(out)
+
+
+# Reference implementations written straight from LEAN's indicator definitions, one bar at a time
+
+
+def reference_sma(x, period):
+    return np.array([np.nan if i < period - 1 else np.mean(x[i - period + 1:i + 1]) for i in range(len(x))])
+
+
+def reference_smoothed(x, period, alpha):
+    # LEAN's EMA (alpha 2/(n+1)) and Wilder average (alpha 1/n): the SMA of the first `period` values, then
+    # value += alpha * (x - value)
+    out = np.full(len(x), np.nan)
+    value = np.mean(x[:period])
+    out[period - 1] = value
+    for i in range(period, len(x)):
+        value += alpha * (x[i] - value)
+        out[i] = value
+    return out
+
+
+def reference_rsi(close, period):
+    change = np.diff(close)
+    gain = reference_smoothed(np.maximum(change, 0), period, 1 / period)
+    loss = reference_smoothed(np.maximum(-change, 0), period, 1 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+    return np.concatenate(([np.nan], np.where(np.isnan(gain), np.nan, rsi)))
+
+
+def reference_true_range(high, low, close):
+    previous = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    tr[0] = high[0] - low[0]
+    return tr
+
+
+def reference_adx(high, low, close, period):
+    tr = reference_true_range(high, low, close)[1:]
+    up, down = np.diff(high), -np.diff(low)
+    plus = np.where((up > down) & (up > 0), up, 0.0)
+    minus = np.where((down > up) & (down > 0), down, 0.0)
+    dx = []
+    s_tr = s_plus = s_minus = 0.0
+    for i in range(len(tr)):
+        if i < period:
+            s_tr, s_plus, s_minus = s_tr + tr[i], s_plus + plus[i], s_minus + minus[i]
+        else:
+            s_tr = s_tr - s_tr / period + tr[i]
+            s_plus = s_plus - s_plus / period + plus[i]
+            s_minus = s_minus - s_minus / period + minus[i]
+        if i >= period - 1:
+            di_plus, di_minus = 100 * s_plus / s_tr, 100 * s_minus / s_tr
+            dx.append(100 * abs(di_plus - di_minus) / (di_plus + di_minus))
+    adx = reference_smoothed(np.array(dx), period, 1 / period)
+    return np.concatenate((np.full(period, np.nan), adx))
+
+
+def test_sma(prices):
+    close = prices[2]
+    np.testing.assert_allclose(stream(SimpleMovingAverage(30), close), reference_sma(close, 30), rtol=1e-12)
+    assert stream(SimpleMovingAverage(3), [1.0, 2.0, 3.0, 4.0, 5.0]).tolist()[2:] == [2.0, 3.0, 4.0]
+
+
+def test_ema(prices):
+    close = prices[2]
+    np.testing.assert_allclose(stream(ExponentialMovingAverage(26), close), reference_smoothed(close, 26, 2 / 27),
+                               rtol=1e-12)
+    np.testing.assert_allclose(stream(WildersMovingAverage(14), close), reference_smoothed(close, 14, 1 / 14),
+                               rtol=1e-12)
+
+
+def test_macd(prices):
+    close = prices[2]
+    fast, slow = reference_smoothed(close, 12, 2 / 13), reference_smoothed(close, 26, 2 / 27)
+    line = fast - slow
+    signal = np.concatenate((np.full(25, np.nan), reference_smoothed(line[25:], 9, 2 / 10)))
+    # LEAN's MACD is ready once its signal line is
+    np.testing.assert_allclose(stream(MovingAverageConvergenceDivergence(12, 26, 9), close),
+                               np.where(np.isnan(signal), np.nan, line), rtol=1e-9)
+    np.testing.assert_allclose(stream(MovingAverageConvergenceDivergence(12, 26, 9), close,
+                                      lambda m: m.signal.current.value), signal, rtol=1e-9)
+
+
+def test_rsi(prices):
+    close = prices[2]
+    np.testing.assert_allclose(stream(RelativeStrengthIndex(14), close), reference_rsi(close, 14), rtol=1e-9)
+
+
+def test_atr(prices):
+    high, low, close = prices
+    expected = reference_smoothed(reference_true_range(high, low, close), 14, 1 / 14)
+    np.testing.assert_allclose(stream_bars(AverageTrueRange(14), high, low, close), expected, rtol=1e-12)
+
+
+def test_adx(prices):
+    high, low, close = prices
+    np.testing.assert_allclose(stream_bars(AverageDirectionalIndex(14), high, low, close),
+                               reference_adx(high, low, close, 14), rtol=1e-9)
+
+
+def test_bollinger_bands(prices):
+    close = prices[2]
+    bands = BollingerBands(20, 2)
+    for i, value in enumerate(close):
+        bands.update(None, value)
+        if bands.is_ready:
+            window = close[i - 19:i + 1]
+            assert bands.middle_band.current.value == pytest.approx(window.mean(), rel=1e-12)
+            assert bands.upper_band.current.value == pytest.approx(window.mean() + 2 * window.std(), rel=1e-9)
+            assert bands.lower_band.current.value == pytest.approx(window.mean() - 2 * window.std(), rel=1e-9)
+
+
+def test_vectorized_matches_streaming(prices):
+    # backtest.ta must agree with the streaming indicators to the last bit, or the engines drift apart
+    high, low, close = prices
+    np.testing.assert_array_equal(stream(SimpleMovingAverage(30), close), ta.sma(close, 30))
+    np.testing.assert_array_equal(stream(ExponentialMovingAverage(26), close), ta.ema(close, 26))
+    np.testing.assert_array_equal(stream(MovingAverageConvergenceDivergence(12, 26, 9), close,
+                                         lambda m: m.signal.current.value), ta.macd(close, 12, 26, 9)[1])
+    np.testing.assert_array_equal(stream(RelativeStrengthIndex(14), close), ta.rsi(close, 14))
+    np.testing.assert_array_equal(stream_bars(AverageTrueRange(14), high, low, close), ta.atr(high, low, close, 14))
+    np.testing.assert_array_equal(stream_bars(AverageDirectionalIndex(14), high, low, close),
+                                  ta.adx(high, low, close, 14))
+
+
+@pytest.mark.parametrize("make", [lambda: SimpleMovingAverage(30), lambda: ExponentialMovingAverage(9),
+                                  lambda: WildersMovingAverage(14), lambda: RelativeStrengthIndex(14),
+                                  lambda: MovingAverageConvergenceDivergence(12, 26, 9)])
+def test_update_many_matches_update(prices, make):
+    close = prices[2]
+    batch, single = make(), make()
+    # Split mid-warm-up so the batch path resumes from partial state
+    out = batch.update_many(close[:5]) + batch.update_many(close[5:])
+    expected = []
+    for value in close:
+        single.update(None, value)
+        expected.append(single.current.value)
+    assert out == expected
+    assert (batch.samples, batch.current.value, batch.previous.value) == \
+        (single.samples, single.current.value, single.previous.value)
+
+
+@pytest.mark.parametrize("make", [lambda: AverageTrueRange(14), lambda: AverageDirectionalIndex(14)])
+def test_bar_update_many_matches_update(prices, make):
+    high, low, close = prices
+    batch, single = make(), make()
+    out = batch.update_many(high[:5], low[:5], close[:5]) + batch.update_many(high[5:], low[5:], close[5:])
+    expected = stream_bars(single, high, low, close)
+    np.testing.assert_array_equal(np.where(np.isnan(expected), np.nan, out), expected)
+    assert (batch.samples, batch.current.value) == (single.samples, single.current.value)
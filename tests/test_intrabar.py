@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtest.data import Bars
+from backtest.intrabar import IntrabarIndex, resample
+from backtest.synthetic import MODELS, SESSIONS, Generator
+from backtest.vector import PRESETS, TAG_SL, TAG_TIME, TAG_TP, backtest, entry_signals, indicators
+
+
+@pytest.fixture(scope="module")
+def minutes():
+    # Oct 2019 - mid 2020 of minute bars
+    return Bars(*Generator(MODELS["regime-jump"], SESSIONS["cfd"], datetime(2019, 10, 1), period=60,
+                           seed=2).chunk(300000))
+
+
+def replay(hours, minutes, params):
+    # Brute-force reference for V5/V6-style exits: every minute of every held hour, in time order, checked
+    # against the stop and target set at the previous hourly close; the hourly close then trails the stop
+    p = params
+    ind = indicators(hours, p)
+    long, short = entry_signals(hours, ind, p)
+    cash, trades, i, n = p.cash, [], 0, len(hours)
+    hour_of_minute = np.searchsorted(hours.time, minutes.time, side="right") - 1
+    while i < n:
+        if not (long[i] or short[i]):
+            i += 1
+            continue
+        side = 1 if long[i] else -1
+        price, atr = hours.close[i], ind["atr"][i]
+        quantity = side * round(cash * p.risk_per_trade / (atr * p.sizing_atr))
+        stop, target = price - side * atr * p.stop_atr, price + side * atr * p.tp_atr
+        cash -= quantity * price
+        exit_ = None
+        for j in range(i + 1, n):
+            for k in np.flatnonzero(hour_of_minute == j):
+                o, h, l = minutes.open[k], minutes.high[k], minutes.low[k]
+                if (l <= stop) if side > 0 else (h >= stop):
+                    exit_ = (j, min(o, stop) if side > 0 else max(o, stop), TAG_SL)
+                elif (h >= target) if side > 0 else (l <= target):
+                    exit_ = (j, max(o, target) if side > 0 else min(o, target), TAG_TP)
+                if exit_:
+                    break
+            if exit_:
+                break
+            c, a = hours.close[j], ind["atr"][j]
+            if j - i >= p.time_exit:
+                exit_ = (j, c, TAG_TIME)
+                break
+            stop = max(stop, c - a * p.trail_atr) if side > 0 else min(stop, c + a * p.trail_atr)
+            if (c >= target) if side > 0 else (c <= target):
+                exit_ = (j, c, TAG_TP)
+            elif (c <= stop) if side > 0 else (c >= stop):
+                exit_ = (j, c, TAG_SL)
+            if exit_:
+                break
+        if exit_ is None:
+            break
+        cash += quantity * exit_[1]
+        trades.append((i, *exit_))
+        i = exit_[0] + 1
+    return trades
+
+
+@pytest.mark.parametrize("name", ["V5", "V6"])
+def test_intrabar_exits_match_a_minute_replay(minutes, name):
+    hours = resample(minutes)
+    result = backtest(hours, PRESETS[name], intrabar=IntrabarIndex(hours, minutes))
+    t = result.trades
+    closed = [k for k, tag in enumerate(t.exit_tag) if tag != "Open"]
+    actual = [(int(t.entry_index[k]), int(t.exit_index[k]), float(t.exit_price[k]), t.exit_tag[k]) for k in closed]
+    expected = replay(hours, minutes, PRESETS[name])
+    assert len(expected) > 20
+    assert actual == expected
+    # Some exits happen inside the hour, at a level the hourly close never printed
+    assert any(price != hours.close[j] for _, j, price, _ in expected)
+
+
+def test_first_touch_fills_a_gap_at_the_open():
+    time = np.datetime64("2020-01-01T00:00") + np.arange(3) * np.timedelta64(60, "s")
+    minutes = Bars(time, [100, 100, 90], [101, 101, 91], [99, 99, 89], [100, 100, 90])
+    hours = resample(minutes)
+    index = IntrabarIndex(hours, minutes)
+    assert index.first_touch(0, 1, 95, 110) == (True, 90, 2)
+    assert index.first_touch(0, -1, 110, 95) == (False, 90, 2)
+    assert index.first_touch(0, 1, 80, 120) is None
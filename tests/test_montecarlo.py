@@ -0,0 +1,52 @@
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backtest.engine import load_algorithm, run
+from backtest.montecarlo import order_returns, simulate, trade_returns
+from backtest.vector import PRESETS, backtest
+
+ROOT = Path(__file__).resolve().parent.parent
+RETURNS = np.array([0.03, -0.01, 0.02, -0.04, 0.05, -0.02, 0.01, -0.3, 0.04])
+
+
+def naive_path(returns, ruin):
+    # Compounds one path trade by trade: (final return, max drawdown, ruined)
+    equity, peak, drawdown, ruined = 1.0, 1.0, 0.0, False
+    for r in returns:
+        equity *= 1 + r
+        peak = max(peak, equity)
+        drawdown = max(drawdown, 1 - equity / peak)
+        ruined |= equity <= 1 - ruin
+    return equity - 1, drawdown, ruined
+
+
+def test_bootstrap_paths_compound_the_drawn_trades():
+    result = simulate(RETURNS, paths=300, method="bootstrap", ruin=0.25, seed=3)
+    draws = np.random.default_rng(3).integers(0, len(RETURNS), size=(300, len(RETURNS)))
+    expected = np.array([naive_path(RETURNS[row], 0.25) for row in draws])
+    np.testing.assert_allclose(result.final_return, expected[:, 0], atol=1e-12)
+    np.testing.assert_allclose(result.max_drawdown, expected[:, 1], atol=1e-12)
+    np.testing.assert_array_equal(result.ruined, expected[:, 2].astype(bool))
+    assert 0 < result.ruined.mean() < 1
+
+
+def test_permutation_keeps_the_final_return_and_moves_the_drawdown():
+    result = simulate(RETURNS, paths=500, method="permutation", seed=1, chunk=64)
+    np.testing.assert_allclose(result.final_return, np.prod(1 + RETURNS) - 1, rtol=1e-12)
+    realized = naive_path(RETURNS, 0.5)[1]
+    assert result.max_drawdown.min() < realized < result.max_drawdown.max()
+    with pytest.raises(ValueError):
+        simulate(RETURNS, method="permutation", length=3)
+
+
+def test_shim_orders_give_the_vector_trade_returns(bars):
+    result = run(load_algorithm(ROOT / "V5.py"), bars)
+    algorithm = result.algorithm
+    window = bars.between(algorithm.start_date, algorithm.end_date + timedelta(days=1))
+    vector = backtest(window, PRESETS["V5"])
+    shim = order_returns(result.orders, PRESETS["V5"].cash)
+    assert len(shim) > 20
+    np.testing.assert_allclose(shim, trade_returns(vector.trades, PRESETS["V5"].cash), rtol=1e-9)
@@ -0,0 +1,122 @@
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from backtest import lean
+from backtest.engine import bar_step
+
+# brackets.py imports AlgorithmImports, which load_algorithm() resolves to the shim
+sys.modules.setdefault("AlgorithmImports", lean)
+from brackets import Bracket
+
+
+class Algorithm(lean.QCAlgorithm):
+    # Replays hand-built bars the way engine.run does: fills, indicators and trailing stops, then on_data
+    def __init__(self):
+        super().__init__()
+        self.set_cash(100000)
+        self.symbol = self.add_cfd("WTICOUSD").symbol
+        self.bracket = Bracket(self, self.symbol)
+        self._step = bar_step(self, self.symbol)
+        self._time = datetime(2020, 1, 1)
+
+    def on_order_event(self, order_event):
+        self.bracket.on_order_event(order_event)
+
+    def bar(self, open, high, low, close):
+        self._step(self._time, open, high, low, close, 0.0)
+        self._time += timedelta(hours=1)
+
+    @property
+    def fills(self):
+        return [(o.quantity, o.fill_price, o.tag) for o in self.orders]
+
+
+@pytest.fixture
+def algorithm():
+    algorithm = Algorithm()
+    algorithm.bar(100, 100, 100, 100)
+    return algorithm
+
+
+def test_stop_fills_at_its_level(algorithm):
+    algorithm.market_order(algorithm.symbol, 10)
+    algorithm.stop_market_order(algorithm.symbol, -10, 95, tag="Stop")
+    algorithm.bar(99, 100, 96, 97)
+    assert len(algorithm.orders) == 1
+    algorithm.bar(97, 98, 94, 96)
+    assert algorithm.fills[1:] == [(-10, 95, "Stop")]
+    assert algorithm.portfolio[algorithm.symbol].quantity == 0
+    assert not algorithm._resting
+
+
+def test_stop_gapped_through_fills_at_the_open(algorithm):
+    algorithm.market_order(algorithm.symbol, -10)
+    algorithm.stop_market_order(algorithm.symbol, 10, 104, tag="Stop")
+    algorithm.bar(106, 107, 105, 105)
+    assert algorithm.fills[1:] == [(10, 106, "Stop")]
+
+
+def test_limit_fills_at_its_level_or_a_better_open(algorithm):
+    algorithm.market_order(algorithm.symbol, 10)
+    algorithm.limit_order(algorithm.symbol, -4, 105, tag="Half")
+    algorithm.limit_order(algorithm.symbol, -6, 108, tag="Rest")
+    algorithm.bar(101, 106, 100, 104)
+    algorithm.bar(109, 110, 103, 104)
+    assert algorithm.fills[1:] == [(-4, 105, "Half"), (-6, 109, "Rest")]
+
+
+def test_trailing_stop_ratchets_up_never_down(algorithm):
+    algorithm.market_order(algorithm.symbol, 10)
+    ticket = algorithm.trailing_stop_order(algorithm.symbol, -10, 2, tag="Trail")
+    assert ticket.stop_price == 98
+    algorithm.bar(100, 103.5, 99, 103)
+    assert ticket.stop_price == 101
+    algorithm.bar(103, 103, 101.5, 102)
+    assert ticket.stop_price == 101
+    algorithm.bar(102, 102, 100, 100.5)
+    assert algorithm.fills[1:] == [(-10, 101, "Trail")]
+
+
+def test_bracket_trail_only_tightens(algorithm):
+    bracket = algorithm.bracket
+    bracket.open(10, 95)
+    bracket.trail(100, 3)
+    assert bracket.stop.stop_price == 97
+    bracket.trail(98, 3)
+    assert bracket.stop.stop_price == 97
+    short = Algorithm()
+    short.bar(100, 100, 100, 100)
+    short.bracket.open(-10, 105)
+    short.bracket.trail(100, 3)
+    short.bracket.trail(102, 3)
+    assert short.bracket.stop.stop_price == 103
+
+
+@pytest.mark.parametrize("bar, fill", [((101, 111, 100, 110), (-10, 110, "Take Profit")),
+                                       ((99, 100, 94, 95), (-10, 95, "Stop Loss")),
+                                       # Both legs in reach: the stop is checked first and cancels the target
+                                       ((100, 111, 94, 100), (-10, 95, "Stop Loss"))])
+def test_bracket_leg_fill_cancels_the_other(algorithm, bar, fill):
+    bracket = algorithm.bracket
+    bracket.open(10, 95, 110, tag="Entry")
+    stop, take_profit = bracket.stop, bracket.take_profit
+    algorithm.bar(*bar)
+    assert algorithm.fills == [(10, 100, "Entry"), fill]
+    assert not bracket.is_open
+    assert {stop.status, take_profit.status} == {lean.OrderStatus.FILLED, lean.OrderStatus.CANCELED}
+    assert not algorithm._resting
+    algorithm.bar(100, 120, 80, 100)
+    assert len(algorithm.orders) == 2
+
+
+def test_bracket_close_cancels_both_legs(algorithm):
+    bracket = algorithm.bracket
+    bracket.open(10, 95, 110)
+    stop, take_profit = bracket.stop, bracket.take_profit
+    bracket.close("Exit")
+    assert algorithm.fills[-1] == (-10, 100, "Exit")
+    assert stop.status == take_profit.status == lean.OrderStatus.CANCELED
+    algorithm.bar(100, 120, 80, 100)
+    assert len(algorithm.orders) == 2
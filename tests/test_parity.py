@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backtest.engine import load_algorithm, run
+from backtest.incremental import run_incremental
+from backtest.snapshot import Snapshot
+from backtest.vector import PRESETS, backtest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def fills(orders, after=None):
+    return [(o.time, o.quantity, o.fill_price, o.tag) for o in orders if after is None or o.time > after]
+
+
+@pytest.mark.parametrize("name", ["V3", "V4", "V5", "V6"])
+def test_shim_matches_vector(bars, name):
+    result = run(load_algorithm(ROOT / f"{name}.py"), bars)
+    algorithm = result.algorithm
+    vector = backtest(bars.between(algorithm.start_date, algorithm.end_date + timedelta(days=1)), PRESETS[name])
+
+    tags = []
+    for tag, quantity in zip(vector.trades.exit_tag, vector.trades.quantity):
+        tags += ["Long Entry" if quantity > 0 else "Short Entry"] + ([tag] if tag != "Open" else [])
+    assert [o.tag for o in result.orders] == tags
+    assert len(result.orders) > 20
+    np.testing.assert_allclose(result.equity, vector.equity, rtol=1e-12)
+
+
+@pytest.mark.parametrize("name", ["V2", "V4", "V6"])
+def test_resume_matches_full_run(bars, tmp_path, name):
+    cls = load_algorithm(ROOT / f"{name}.py")
+    full = run(cls, bars, snapshot_at=datetime(2020, 6, 1))
+    full.snapshot.save(tmp_path / "snapshot.bin")
+    snapshot = Snapshot.load(tmp_path / "snapshot.bin")
+    resumed = run(cls, bars, start=datetime(2020, 6, 1), snapshot=snapshot)
+
+    assert fills(resumed.orders, snapshot.time) == fills(full.orders, snapshot.time)
+    assert resumed.equity == full.equity[-len(resumed.equity):]
+
+
+@pytest.mark.parametrize("name", ["V3", "V5"])
+def test_incremental_extension_matches_full_run(bars, tmp_path, name):
+    cls = load_algorithm(ROOT / f"{name}.py")
+    full = run(cls, bars, end=datetime(2021, 1, 1))
+    _, resumed_from = run_incremental(cls, bars, tmp_path, end=datetime(2020, 7, 1))
+    assert resumed_from is None
+    extended, resumed_from = run_incremental(cls, bars, tmp_path, end=datetime(2021, 1, 1))
+    assert resumed_from is not None
+
+    assert fills(extended.orders) == fills(full.orders)
+    assert extended.equity == full.equity
+    expected, actual = full.summary(), extended.summary()
+    expected.pop("elapsed_s")
+    actual.pop("elapsed_s")
+    assert actual == expected
+
+
+def test_summaries_match_with_a_position_open(bars):
+    # Trade statistics count closed trades in both engines, so a position left open at the end must not
+    # shift trades, win rate or the order count
+    cls = load_algorithm(ROOT / "V6.py")
+    for day in range(1, 29):
+        end = datetime(2020, 10, day)
+        result = run(cls, bars, end=end)
+        if result.algorithm.portfolio[result.algorithm.symbol].quantity:
+            break
+    else:
+        pytest.fail("no open position at any end date tried")
+    shim = result.summary()
+    vector = backtest(bars.between(result.algorithm.start_date, end), PRESETS["V6"]).summary()
+    assert {name: shim[name] for name in vector if name in shim} == vector
@@ -0,0 +1,74 @@
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from backtest.engine import load_algorithm, run
+from profiler import Histogram, Profiler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    values = np.random.default_rng(0).lognormal(9, 1.5, 20000).astype(np.int64)
+    histogram = Histogram(bits=6)
+    for value in values.tolist():
+        histogram.record(value)
+    assert histogram.count == len(values) and histogram.total == int(values.sum())
+    assert histogram.max == int(values.max())
+    # Each bucket spans at most 1/32 of its lower bound, and reports that bound
+    for q in (50, 90, 99, 99.9):
+        exact = np.percentile(values, q, method="inverted_cdf")
+        assert exact / (1 + 2 ** -5) <= histogram.percentile(q) <= exact
+    small = Histogram(bits=6)
+    for value in (3, 7, 7, 40):
+        small.record(value)
+    assert [small.percentile(q) for q in (25, 50, 75, 100)] == [3, 7, 7, 40]
+
+
+class Clock:
+    # Advances by the step given for each reading
+    def __init__(self, steps):
+        self.steps = iter(steps)
+        self.now = 0
+
+    def __call__(self):
+        self.now += next(self.steps)
+        return self.now
+
+
+def test_nested_sections_split_self_time():
+    profiler = Profiler(enabled=True, clock=Clock([0, 10, 30, 5]))
+    with profiler.section("on_data"):
+        with profiler.section("entries"):
+            pass
+    # on_data: 45 ns in all, 30 of them inside entries
+    assert profiler.stacks == {"on_data;entries": 30, "on_data": 15}
+    report = profiler.report()
+    assert report["on_data"]["mean_ns"] == 45 and report["entries"]["calls"] == 1
+    assert report["entries"]["self_share"] == round(30 / 45, 4)
+
+
+def test_disabled_profiler_costs_nothing():
+    profiler = Profiler()
+
+    def handler():
+        return 1
+    assert profiler.profiled("x")(handler) is handler
+    assert profiler.section("a") is profiler.section("b")
+    with profiler.section("a"):
+        pass
+    assert not profiler.histograms
+
+
+def test_engine_run_attributes_time_to_strategy_methods(bars, tmp_path):
+    profiler = Profiler(enabled=True)
+    plain = run(load_algorithm(ROOT / "V4.py"), bars, end=datetime(2020, 3, 1))
+    profiled = run(load_algorithm(ROOT / "V4.py"), bars, end=datetime(2020, 3, 1), profiler=profiler)
+    assert [o.tag for o in profiled.orders] == [o.tag for o in plain.orders]
+    report = profiler.report()
+    assert report["on_data"]["calls"] == profiled.bars
+    assert any(name.startswith("update ") for name in report)
+    profiler.write_collapsed(tmp_path / "stacks.folded")
+    lines = (tmp_path / "stacks.folded").read_text().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sum(profiler.stacks.values())
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from pathlib import Path
+
+from backtest.engine import load_algorithm, run
+from backtest.results import ResultStore
+from backtest.vector import PRESETS, backtest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_shim_and_vector_runs_answer_the_same_query(bars, tmp_path):
+    store = ResultStore(tmp_path)
+    shim = run(load_algorithm(ROOT / "V5.py"), bars)
+    algorithm = shim.algorithm
+    window = bars.between(algorithm.start_date, algorithm.end_date + timedelta(days=1))
+    store.add_backtest(shim)
+    store.add_vector("V5", backtest(window, PRESETS["V5"]))
+    store.add_vector("V5", backtest(window, PRESETS["V5"].replace(adx_threshold=15)))
+    store.add_vector("V6", backtest(window, PRESETS["V6"]))
+
+    rows = store.query("strategy == V5", "adx_threshold >= 20")
+    assert sorted(row["engine"] for row in rows) == ["shim", "vector"]
+    assert len({row["params_hash"] for row in rows}) == 1
+    by_engine = {row["engine"]: row for row in rows}
+    assert by_engine["shim"]["metrics.trades"] == by_engine["vector"]["metrics.trades"]
+    # Shim runs store the order log, vector runs the trades
+    orders = store.load(by_engine["shim"]["key"])
+    assert list(orders["tag"]) == [o.tag for o in shim.orders]
+    trades = store.load(by_engine["vector"]["key"])
+    assert len(trades["quantity"]) * 2 - sum(tag == "Open" for tag in trades["tag"]) == len(shim.orders)
+
+    # A fresh store reads the persisted index
+    assert len(ResultStore(tmp_path).query("strategy == V5")) == 3
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from backtest.rules import compile_rule
+from backtest.vector import PRESETS, compile_entry_rules
+
+ENV = {"adx": np.array([10.0, 30.0, np.nan]), "close": np.array([1.0, 2.0, 3.0]), "sma": np.array([2.0, 1.0, 2.0])}
+
+
+def test_mask():
+    rule = compile_rule("adx > 20 and close > sma or not close < 3", set(ENV))
+    assert rule.mask(ENV).tolist() == [False, True, True]
+
+
+@pytest.mark.parametrize("text", ["adx", "adx + 1", "adx and close > 1", "not adx", "close > 1 or sma",
+                                  "1 < 2", "close > 1 and 1 < 2", "close >", "close > foo"])
+def test_rejected_at_compile_time(text):
+    with pytest.raises(ValueError):
+        compile_rule(text, set(ENV))
+
+
+def test_entry_rules_check_names():
+    assert len(compile_entry_rules(PRESETS["V3"])) == 2
+    with pytest.raises(ValueError, match="unknown names"):
+        compile_entry_rules(PRESETS["V6"].replace(long_rule="close > daily_ema"))
+
+
+def test_mask_matches_per_bar_python(bars):
+    # The compiled mask against the same rule evaluated bar by bar with Python's own operators
+    env = {"close": bars.close[:500], "open": bars.open[:500], "high": bars.high[:500]}
+    rule = compile_rule("close > open and not high - close > 0.2 or close * 2 < open + open - 0.1", set(env))
+    expected = [(c > o and not h - c > 0.2) or c * 2 < o + o - 0.1
+                for c, o, h in zip(env["close"], env["open"], env["high"])]
+    assert rule.mask(env).tolist() == expected
@@ -0,0 +1,41 @@
+import io
+import json
+from datetime import datetime
+from multiprocessing.dummy import Pool
+
+from backtest.search import Search
+from backtest.sweep import DEFAULT_SPACE, grid, init_worker, worker
+from backtest.vector import PRESETS
+
+
+def test_every_rung_ranks_configs_that_traded(store, tmp_path):
+    configs = [PRESETS["V6"].replace(**c) for c in grid(DEFAULT_SPACE)]
+    init_worker(store, datetime(2020, 1, 1), datetime(2021, 1, 1), str(tmp_path))
+    out = io.StringIO()
+    # A one-thread pool shares the state init_worker set up in this process
+    with Pool(1) as pool:
+        search = Search(pool, len(worker()[0]), out)
+        search.halving(configs, 4)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert search.finished
+    for rung in range(4):
+        ran = [row for row in rows if row["rung"] == rung]
+        assert ran and all(row["metrics"]["trades"] for row in ran)
+    # Survivors are picked by score, not by their place in the grid
+    promoted = {row["key"] for row in rows if row["rung"] == 1}
+    assert len(promoted) == 36
+    assert promoted != {params.digest() for params in configs[:36]}
+
+
+def test_tied_rung_drops_nothing(store, tmp_path):
+    # A one-bar budget closes no trades, so every config scores 0 on the first rungs
+    configs = [PRESETS["V5"].replace(tp_atr=tp) for tp in (3, 4, 5, 6, 8, 10, 12, 14, 16)]
+    init_worker(store, datetime(2020, 1, 1), datetime(2021, 1, 1), str(tmp_path))
+    out = io.StringIO()
+    with Pool(1) as pool:
+        search = Search(pool, 0, out)
+        search.halving(configs, 3)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [sum(row["rung"] == rung for row in rows) for rung in range(3)] == [9, 9, 9]
+    assert all(row["pruned"] is None for row in rows)
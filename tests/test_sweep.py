@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backtest.results import load_results
+from backtest.sweep import grid, run_sweep
+from backtest.vector import PRESETS, backtest
+
+START, END = datetime(2020, 1, 1), datetime(2021, 1, 1)
+SPACE = {"adx_threshold": [20, 25], "tp_atr": [3, 8], "time_exit": [24, 48]}
+
+
+def test_sweep_matches_direct_backtests(store, bars, tmp_path):
+    out = tmp_path / "sweep.jsonl"
+    base = PRESETS["V5"]
+    assert run_sweep(store, grid(SPACE), out, base, START, END, workers=2) == 8
+    rows = load_results(out)
+    assert len(rows) == 8
+    window = bars.between(START, END)
+    for row in rows:
+        params = base.replace(**{name: row["params"][name] for name in SPACE})
+        assert row["key"] == params.digest()
+        expected = backtest(window, params).summary()
+        actual = dict(row["metrics"])
+        actual.pop("elapsed_s")
+        assert actual == json.loads(json.dumps(expected))
+
+
+def test_sweep_resumes_only_over_the_same_data(store, tmp_path):
+    out = tmp_path / "sweep.jsonl"
+    base = PRESETS["V4"]
+    configs = list(grid(SPACE))
+    assert run_sweep(store, configs[:3], out, base, START, END, workers=1) == 3
+    # Finished configs are skipped on resume
+    assert run_sweep(store, configs, out, base, START, END, workers=1) == 5
+    assert run_sweep(store, configs, out, base, START, END, workers=1) == 0
+    with pytest.raises(ValueError, match="other data or dates"):
+        run_sweep(store, configs, out, base, START, datetime(2020, 7, 1), workers=1)
+    assert len(load_results(out)) == 8
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtest import universe
+from backtest.data import Bars
+from backtest.synthetic import MODELS, SESSIONS, Generator
+from backtest.vector import PRESETS, backtest, entry_signals, indicators
+
+START, END = datetime(2020, 1, 1), datetime(2021, 1, 1)
+
+
+@pytest.mark.parametrize("name", ["V3", "V4", "V5", "V6"])
+def test_one_symbol_matches_the_vector_engine(bars, name):
+    window = bars.between(START, END)
+    expected = backtest(window, PRESETS[name])
+    result = universe.backtest({"WTICOUSD": window}, PRESETS[name])
+    trades = result.trades["WTICOUSD"]
+    np.testing.assert_array_equal(trades.entry_index, expected.trades.entry_index)
+    np.testing.assert_array_equal(trades.exit_index, expected.trades.exit_index)
+    assert list(trades.exit_tag) == list(expected.trades.exit_tag)
+    np.testing.assert_allclose(result.equity, expected.equity, rtol=1e-12)
+
+
+def test_symbols_keep_their_own_signals_and_share_one_account(bars):
+    params = PRESETS["V6"]
+    first = bars.between(START, END)
+    other = Bars(*Generator(MODELS["regime"], SESSIONS["cfd"], datetime(2019, 9, 2), seed=5).chunk(12000))
+    # Every tenth bar missing: the grid is the union of both markets' bar times
+    other = other.between(START, END)
+    keep = np.arange(len(other)) % 10 != 3
+    other = Bars(other.time[keep], other.open[keep], other.high[keep], other.low[keep], other.close[keep])
+    u = universe.Universe({"A": first, "B": other}, params)
+    assert len(u) == len(np.union1d(first.time, other.time))
+
+    for s, bars_ in enumerate((first, other)):
+        rows = np.searchsorted(u.time, bars_.time)
+        long, short = entry_signals(bars_, indicators(bars_, params), params)
+        np.testing.assert_array_equal(u.long[rows, s], long)
+        np.testing.assert_array_equal(u.short[rows, s], short)
+        assert not u.long[~u.present[:, s], s].any()
+
+    result = universe.simulate(u)
+    assert all(len(trades) for trades in result.trades.values())
+    # Cash only moves through the trades: the end equity is the start plus every trade's profit
+    profit = 0.0
+    for trades in result.trades.values():
+        profit += float(np.sum(trades.quantity * (trades.exit_price - trades.entry_price)))
+    assert result.equity[-1] == pytest.approx(params.cash + profit, abs=1e-6)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backtest.vector import PRESETS, backtest
+from backtest.walkforward import folds, score, summarize, walk_forward
+
+DAY = timedelta(days=1)
+
+
+def test_out_of_sample_windows_tile_the_timeline():
+    start, end = datetime(2020, 1, 1), datetime(2020, 12, 31)
+    rolling = folds(start, end, 90 * DAY, 30 * DAY)
+    assert rolling[0] == (start, start + 90 * DAY, start + 120 * DAY)
+    assert all(a[2] == b[1] for a, b in zip(rolling, rolling[1:]))
+    assert all(split - begin == 90 * DAY for begin, split, _ in rolling)
+    assert rolling[-1][2] == end
+    anchored = folds(start, end, 90 * DAY, 30 * DAY, anchored=True)
+    assert {begin for begin, _, _ in anchored} == {start}
+    assert [split for _, split, _ in anchored] == [split for _, split, _ in rolling]
+    # A step shorter than the out-of-sample span overlaps the windows
+    assert len(folds(start, end, 90 * DAY, 30 * DAY, step=15 * DAY)) == 2 * len(rolling) - 1
+
+
+def test_folds_pick_the_in_sample_best_and_stitch_their_out_of_sample_runs(store, bars):
+    configs = [PRESETS["V5"].replace(tp_atr=tp, adx_threshold=adx) for tp in (3, 8) for adx in (15, 25)]
+    windows = folds(datetime(2020, 1, 1), datetime(2021, 1, 1), 120 * DAY, 60 * DAY)
+    results, times, equity = walk_forward(store, configs, windows, "net_return", workers=2)
+    assert [r["fold"] for r in results] == list(range(len(windows)))
+
+    for result, (start, split, stop) in zip(results, windows):
+        scores = [score(backtest(bars.between(start, split), p).summary(), "net_return") for p in configs]
+        assert result["params"] == configs[int(np.argmax(scores))].as_dict()
+        assert result["in_sample_metrics"]["net_return"] == max(scores)
+
+    # One curve over the out-of-sample bars, each fold compounding on where the previous one ended
+    expected_times = np.concatenate([bars.between(split, stop).time for _, split, stop in windows])
+    np.testing.assert_array_equal(times, expected_times)
+    growth = np.prod([1 + r["out_of_sample_metrics"]["net_return"] for r in results])
+    cash = configs[0].cash
+    assert equity[-1] == pytest.approx(cash * growth, rel=1e-5)
+    assert summarize(results, equity, cash)["fold_returns"] == [r["out_of_sample_metrics"]["net_return"]
+                                                                for r in results]